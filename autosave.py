@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+后台自动存档
+在调用线程上只做内存快照，编码和写盘交给后台线程完成。短时间内的多次
+存档请求会合并成一次写入，界面主循环不会因磁盘I/O卡顿。
+"""
+
+import copy
+import threading
+import time
+
+import save_format
+
+
+class 自动存档服务:
+    """写后式自动存档服务"""
+
+    def __init__(self, 存档系统, 节日系统=None, 存档名="autosave.save", 合并间隔=0.5,
+                 最长延迟=2.0):
+        """初始化自动存档服务
+
+        参数:
+            存档系统(存档系统): 负责写入存档文件
+            节日系统(节日系统): 节日数据会一并写入存档的扩展数据
+            存档名(str): 自动存档文件名
+            合并间隔(float): 收到请求后等待的秒数，期间的新请求会合并为一次写入
+            最长延迟(float): 从第一个未写入的请求算起最多等待的秒数，
+                请求持续不断时也会按这个间隔写入
+        """
+        self.存档系统 = 存档系统
+        self.节日系统 = 节日系统
+        self.存档名 = 存档名
+        self.合并间隔 = 合并间隔
+        self.最长延迟 = 最长延迟
+
+        self._条件 = threading.Condition()
+        self._待写快照 = None
+        self._请求时间 = 0.0
+        self._首次请求时间 = 0.0
+        self._写入中 = False
+        self._停止 = False
+        self._线程 = None
+
+        self.请求次数 = 0
+        self.写入次数 = 0
+        self.最近错误 = None
+
+    def 快照(self, 玩家, 当前日期=None):
+        """复制存档所需的全部状态
+
+        参数:
+            玩家(玩家角色): 玩家对象
+            当前日期(date): 游戏内日期，为None时使用玩家记录的日期
+
+        返回:
+            dict: 与玩家对象不再共享可变数据的存档数据
+        """
+        数据 = save_format.提取存档数据(玩家)
+        if 当前日期 is not None:
+            数据["当前日期"] = 当前日期.toordinal()
+        if self.节日系统 is not None:
+            数据["扩展"] = {"节日数据": copy.deepcopy(self.节日系统.节日数据)}
+        return 数据
+
+    def 请求存档(self, 玩家, 当前日期=None):
+        """请求一次自动存档，立即返回
+
+        参数:
+            玩家(玩家角色): 玩家对象
+            当前日期(date): 游戏内日期
+        """
+        数据 = self.快照(玩家, 当前日期)
+        with self._条件:
+            if self._待写快照 is None:
+                self._首次请求时间 = time.monotonic()
+            self._待写快照 = 数据
+            self._请求时间 = time.monotonic()
+            self.请求次数 += 1
+            self._确保线程运行()
+            self._条件.notify()
+
+    def 刷新(self, 超时=None):
+        """等待所有已请求的存档写入完成
+
+        参数:
+            超时(float): 最长等待秒数，None表示一直等待
+
+        返回:
+            bool: 是否全部写入完成
+        """
+        截止时间 = None if 超时 is None else time.monotonic() + 超时
+        with self._条件:
+            # 跳过合并等待，尽快写入
+            self._请求时间 = 0.0
+            self._条件.notify_all()
+            while self._待写快照 is not None or self._写入中:
+                剩余 = None if 截止时间 is None else 截止时间 - time.monotonic()
+                if 剩余 is not None and 剩余 <= 0:
+                    return False
+                self._条件.wait(剩余)
+        return True
+
+    def 停止(self, 超时=None):
+        """写完剩余存档后停止后台线程
+
+        参数:
+            超时(float): 最长等待秒数
+
+        返回:
+            bool: 是否全部写入完成
+        """
+        完成 = self.刷新(超时)
+        with self._条件:
+            self._停止 = True
+            self._条件.notify_all()
+        if self._线程 is not None:
+            self._线程.join(超时)
+            self._线程 = None
+        return 完成
+
+    def _确保线程运行(self):
+        """首次请求时启动后台线程（调用时需持有锁）"""
+        if self._线程 is None or not self._线程.is_alive():
+            self._停止 = False
+            self._线程 = threading.Thread(target=self._写入循环, name="自动存档", daemon=True)
+            self._线程.start()
+
+    def _写入循环(self):
+        """后台线程：等待请求，合并后写入最新的快照"""
+        while True:
+            with self._条件:
+                while self._待写快照 is None and not self._停止:
+                    self._条件.wait()
+                if self._待写快照 is None:
+                    return
+                # 合并窗口内的新请求会替换待写快照并顺延写入时间，
+                # 但顺延不超过第一个请求之后的最长延迟
+                while True:
+                    剩余 = min(self._请求时间 + self.合并间隔,
+                             self._首次请求时间 + self.最长延迟) - time.monotonic()
+                    if 剩余 <= 0 or self._停止:
+                        break
+                    self._条件.wait(剩余)
+                数据 = self._待写快照
+                self._待写快照 = None
+                self._写入中 = True
+
+            try:
+                self.存档系统.写入存档数据(数据, self.存档名)
+                self.写入次数 += 1
+                self.最近错误 = None
+            except (OSError, save_format.存档格式错误) as e:
+                self.最近错误 = e
+                print(f"自动存档失败: {e}")
+            finally:
+                with self._条件:
+                    self._写入中 = False
+                    self._条件.notify_all()
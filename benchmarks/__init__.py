@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""性能基准脚本，在项目根目录用 python -m benchmarks.<脚本名> 运行"""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源基准：比较每个界面各自解码缩放背景图与资源管理器共享的耗时
+
+模拟启动时三处加载背景（GUI、GUI基础类、主菜单界面）以及之后多次切换界面
+重新初始化主菜单，并打印资源管理器的内存报告。
+
+用法:
+    python -m benchmarks.bench_assets [--切换次数 N]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from gui_assets import 资源管理器
+
+背景路径 = "picture/back_ground_picture.png"
+尺寸 = (800, 600)
+
+
+def 旧实现(切换次数):
+    """原来的做法：每处各自解码、转换、缩放"""
+    a = pygame.transform.scale(pygame.image.load(背景路径).convert(), 尺寸)
+    b = pygame.transform.scale(pygame.image.load(背景路径), 尺寸)
+    for _ in range(切换次数 + 1):
+        c = pygame.transform.scale(pygame.image.load(背景路径).convert_alpha(), 尺寸)
+    return a, b, c
+
+
+def 新实现(管理器, 切换次数):
+    a = 管理器.缩放(背景路径, 尺寸)
+    b = 管理器.缩放(背景路径, 尺寸)
+    for _ in range(切换次数 + 1):
+        c = 管理器.缩放(背景路径, 尺寸, 透明=True)
+    底部 = 管理器.区域(背景路径, (0, 尺寸[1] - 100, 尺寸[0], 100), 尺寸)
+    return a, b, c, 底部
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片资源管理基准")
+    parser.add_argument("--切换次数", type=int, default=10, help="重新初始化主菜单的次数")
+    参数 = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode(尺寸)
+
+    开始 = time.perf_counter()
+    旧实现(参数.切换次数)
+    旧耗时 = (time.perf_counter() - 开始) * 1000
+
+    管理器 = 资源管理器()
+    开始 = time.perf_counter()
+    新实现(管理器, 参数.切换次数)
+    新耗时 = (time.perf_counter() - 开始) * 1000
+
+    print(f"启动加载3处 + 切换界面{参数.切换次数}次")
+    print(f"{'各自加载':<10}{旧耗时:>10.1f} ms  解码 {参数.切换次数 + 3} 次")
+    print(f"{'资源管理器':<10}{新耗时:>10.1f} ms  解码 {管理器.解码次数} 次，缩放 {管理器.缩放次数} 次")
+    print("内存报告:")
+    for 项 in 管理器.内存报告():
+        print(f"  {os.path.relpath(项['路径'])}: 原始尺寸 {项['原始尺寸']}，缩放版本 {项['缩放版本']}，"
+              f"区域视图 {项['区域视图']}，{项['字节'] / 1024 / 1024:.1f} MiB")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自动存档基准：比较同步存档与后台自动存档对帧耗时的影响
+
+模拟一个每帧都可能改变游戏状态的界面循环，每隔若干帧请求一次存档，
+统计帧耗时分位数。有pygame时使用dummy视频驱动真实地绘制和翻转画面。
+
+用法:
+    python -m benchmarks.bench_autosave [--帧数 N] [--存档间隔 N]
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    PYGAME_AVAILABLE = True
+except ImportError:
+    PYGAME_AVAILABLE = False
+
+from autosave import 自动存档服务
+from benchmarks.bench_save_format import 构造玩家
+from holidays_system import 节日系统
+from save_system import 存档系统
+
+
+def 分位数(数据, 百分比):
+    有序 = sorted(数据)
+    return 有序[min(len(有序) - 1, int(len(有序) * 百分比 / 100))]
+
+
+def 运行帧循环(帧数, 存档间隔, 存档函数):
+    """运行帧循环并返回每帧耗时（毫秒）"""
+    屏幕 = None
+    if PYGAME_AVAILABLE:
+        pygame.init()
+        屏幕 = pygame.display.set_mode((800, 600))
+
+    帧耗时 = []
+    for 帧 in range(帧数):
+        开始 = time.perf_counter()
+        if 屏幕 is not None:
+            pygame.event.pump()
+            屏幕.fill((帧 % 256, 80, 120))
+            pygame.display.flip()
+        if 帧 % 存档间隔 == 0:
+            存档函数()
+        帧耗时.append((time.perf_counter() - 开始) * 1000)
+
+    if PYGAME_AVAILABLE:
+        pygame.quit()
+    return 帧耗时
+
+
+def 运行基准(帧数, 存档间隔, 收藏品数量, 事件数量):
+    玩家 = 构造玩家(收藏品数量, 事件数量)
+    当前日期 = datetime.date(2005, 9, 1)
+    节日 = 节日系统(数据保存路径=None)
+
+    结果 = {}
+    with tempfile.TemporaryDirectory() as 目录:
+        存档 = 存档系统(目录)
+
+        def 同步存档():
+            存档.保存游戏(玩家, "sync.save", 扩展={"节日数据": 节日.节日数据})
+
+        结果["同步"] = (运行帧循环(帧数, 存档间隔, 同步存档), 帧数 // 存档间隔 + 1)
+
+        服务 = 自动存档服务(存档, 节日, 存档名="autosave.save", 合并间隔=0.05)
+        帧耗时 = 运行帧循环(帧数, 存档间隔, lambda: 服务.请求存档(玩家, 当前日期))
+        服务.停止()
+        结果["后台"] = (帧耗时, 服务.写入次数)
+
+    print(f"帧数 {帧数}，每 {存档间隔} 帧存档一次，pygame: {'是' if PYGAME_AVAILABLE else '否'}")
+    print(f"{'模式':<6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}{'写入次数':>10}")
+    for 名称, (帧耗时, 写入次数) in 结果.items():
+        print(f"{名称:<6}{statistics.median(帧耗时):>10.3f}{分位数(帧耗时, 95):>10.3f}"
+              f"{分位数(帧耗时, 99):>10.3f}{max(帧耗时):>10.3f}{写入次数:>10}")
+    return 结果
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自动存档帧耗时基准")
+    parser.add_argument("--帧数", type=int, default=600)
+    parser.add_argument("--存档间隔", type=int, default=5)
+    parser.add_argument("--收藏品", type=int, default=60)
+    parser.add_argument("--事件", type=int, default=200)
+    参数 = parser.parse_args()
+    运行基准(参数.帧数, 参数.存档间隔, 参数.收藏品, 参数.事件)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+内容包基准：在临时目录生成一个大内容包，比较直接读取JSON与按年代加载缓存
+
+依次测量：首次编译（读取JSON并写缓存）、每次启动都读取整个JSON、从缓存
+只加载一个年代，以及常驻一个年代与常驻全部内容的序列化体积。
+
+用法:
+    python -m benchmarks.bench_content_packs [--每年代事件 N]
+"""
+
+import argparse
+import json
+import marshal
+import os
+import shutil
+import tempfile
+import time
+
+import content_packs
+from random_events import ERA_RANGES
+
+
+def 生成内容包(目录, 每年代事件):
+    """生成一个每个年代都有大量随机事件和年份事件的内容包"""
+    包 = {"名称": "基准", "年代": {}}
+    for 年代, (第一年, 最后一年) in ERA_RANGES.items():
+        包["年代"][年代] = {
+            "随机事件": [{
+                "id": f"基准_{年代}_{序号}",
+                "type": ("经济", "健康", "校园")[序号 % 3],
+                "title": f"基准事件{序号}",
+                "description": "这是一段用于基准测试的事件描述。" * 4,
+                "base_probability": 0.05,
+                "choices": [{"text": "选项", "outcome": "结果", "attribute_changes": {"快乐": 1}}],
+            } for 序号 in range(每年代事件)],
+            "历史事件": {str(年份): [f"基准{年份}事件{序号}" for 序号 in range(每年代事件 // 50)]
+                        for 年份 in range(第一年, 最后一年 + 1)},
+        }
+    os.makedirs(目录, exist_ok=True)
+    with open(os.path.join(目录, "基准.json"), "w", encoding="utf-8") as f:
+        json.dump(包, f, ensure_ascii=False)
+
+
+def 计时(函数):
+    开始 = time.perf_counter()
+    结果 = 函数()
+    return (time.perf_counter() - 开始) * 1000, 结果
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内容包按年代加载基准")
+    parser.add_argument("--每年代事件", type=int, default=5000, help="每个年代生成的随机事件数")
+    参数 = parser.parse_args()
+
+    临时目录 = tempfile.mkdtemp()
+    try:
+        内容目录 = os.path.join(临时目录, "content")
+        缓存文件 = os.path.join(临时目录, "content_packs.bin")
+        生成内容包(内容目录, 参数.每年代事件)
+        包大小 = os.path.getsize(os.path.join(内容目录, "基准.json"))
+
+        编译耗时, _ = 计时(lambda: content_packs.内容包管理器(内容目录, 缓存文件).获取年代("1996-2000"))
+        全部耗时, 全部内容 = 计时(lambda: content_packs.编译内容包(content_packs._包文件列表(内容目录)))
+        管理器 = content_packs.内容包管理器(内容目录, 缓存文件)
+        单年代耗时, 单年代 = 计时(lambda: 管理器.获取年代("1996-2000"))
+
+        print(f"内容包 {包大小 / 1024 / 1024:.1f} MiB，每年代 {参数.每年代事件} 个随机事件")
+        print(f"{'首次编译并加载一个年代':<16}{编译耗时:>10.1f} ms")
+        print(f"{'每次读取整个JSON':<16}{全部耗时:>10.1f} ms")
+        print(f"{'从缓存加载一个年代':<16}{单年代耗时:>10.1f} ms")
+        print(f"常驻内容（marshal体积）: 一个年代 {len(marshal.dumps(单年代)) / 1024:.0f} KiB，"
+              f"全部 {len(marshal.dumps(全部内容)) / 1024:.0f} KiB")
+    finally:
+        shutil.rmtree(临时目录)
+
+
+if __name__ == "__main__":
+    main()
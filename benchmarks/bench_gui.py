@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+GUI渲染基准：在SDL dummy视频驱动下回放固定场景，无需显示器
+
+每个场景使用确定性时钟（每帧固定前进1/60秒）和脚本化的鼠标输入，
+逐帧调用处理事件、更新和绘制，统计帧率、帧耗时分位数和分配次数，
+结果可以输出为JSON，在不同版本之间比较。
+
+场景:
+    菜单静止、界面过渡、粒子爆发、收藏品翻页、属性界面（gui.GUI）
+    管理器菜单、管理器淡入淡出/滑动/缩放（GUI管理器，无法导入时跳过）
+
+用法:
+    python -m benchmarks.bench_gui [--帧数 N] [--场景 名称 ...] [--输出 结果.json] [--基线 旧结果.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import gui_fonts
+from gui import GUI
+
+帧间隔 = 1000 / 60
+
+
+def 分位数(数据, 百分比):
+    有序 = sorted(数据)
+    return 有序[min(len(有序) - 1, int(len(有序) * 百分比 / 100))]
+
+
+class 确定性时钟:
+    """每次推进固定毫秒数的时钟，替换GUI的获取时间"""
+
+    def __init__(self):
+        self.毫秒 = 0
+
+    def __call__(self):
+        return int(self.毫秒)
+
+    def 推进(self, 毫秒=帧间隔):
+        self.毫秒 += 毫秒
+
+
+class 脚本输入:
+    """脚本化的鼠标：替换pygame.mouse.get_pos并生成对应的事件"""
+
+    def __init__(self):
+        self.位置 = (0, 0)
+        self._原函数 = pygame.mouse.get_pos
+
+    def __enter__(self):
+        pygame.mouse.get_pos = lambda: self.位置
+        return self
+
+    def __exit__(self, *异常):
+        pygame.mouse.get_pos = self._原函数
+
+    def 移动(self, 位置):
+        self.位置 = tuple(位置)
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=self.位置, rel=(0, 0), buttons=(0, 0, 0))]
+
+    def 点击(self, 位置):
+        return self.移动(位置) + [
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=self.位置, button=1),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=self.位置, button=1),
+        ]
+
+
+class 分配计数:
+    """统计一段代码中创建的pygame表面、文本缓存未命中、内存块净增和垃圾回收次数
+
+    只统计直接调用pygame.Surface构造的表面，字体渲染和变换函数返回的表面不计入。
+    """
+
+    def __enter__(self):
+        self.表面 = 0
+        self._原表面类 = pygame.Surface
+        计数 = self
+
+        class 计数表面(self._原表面类):
+            def __init__(self, *参数, **关键字参数):
+                计数.表面 += 1
+                super().__init__(*参数, **关键字参数)
+
+        pygame.Surface = 计数表面
+        self._文本未命中 = gui_fonts.默认文本缓存.未命中
+        self._内存块 = sys.getallocatedblocks()
+        self._gc次数 = sum(s["collections"] for s in gc.get_stats())
+        return self
+
+    def __exit__(self, *异常):
+        pygame.Surface = self._原表面类
+        self.结果 = {
+            "表面": self.表面,
+            "文本未命中": gui_fonts.默认文本缓存.未命中 - self._文本未命中,
+            "内存块净增": sys.getallocatedblocks() - self._内存块,
+            "gc次数": sum(s["collections"] for s in gc.get_stats()) - self._gc次数,
+        }
+
+
+def 汇总(帧耗时, 分配, 其他=None):
+    总毫秒 = sum(帧耗时)
+    结果 = {
+        "帧数": len(帧耗时),
+        "fps": len(帧耗时) / 总毫秒 * 1000 if 总毫秒 else 0.0,
+        "p50_ms": statistics.median(帧耗时),
+        "p95_ms": 分位数(帧耗时, 95),
+        "p99_ms": 分位数(帧耗时, 99),
+        "最大_ms": max(帧耗时),
+        "分配": 分配,
+    }
+    结果.update(其他 or {})
+    return 结果
+
+
+# ---------------------------------------------------------------- gui.GUI 场景
+
+def 新建GUI(时钟):
+    gui = GUI()
+    gui.获取时间 = 时钟
+    稳定(gui, 时钟)
+    return gui
+
+
+def 稳定(gui, 时钟, 最多帧数=600):
+    """推进到没有过渡、粒子和消息为止"""
+    for _ in range(最多帧数):
+        if not gui.需要动画():
+            return
+        gui.更新(帧间隔)
+        gui.绘制()
+        时钟.推进()
+
+
+def 回放GUI(gui, 时钟, 帧数, 每帧输入):
+    """逐帧回放脚本，返回场景结果"""
+    帧耗时 = []
+    gui.损伤.重置统计()
+    with 分配计数() as 计数:
+        for 帧 in range(帧数):
+            事件列表 = 每帧输入(帧)
+            开始 = time.perf_counter_ns()
+            gui.处理事件(事件列表)
+            gui.更新(帧间隔)
+            gui.绘制()
+            帧耗时.append((time.perf_counter_ns() - 开始) / 1e6)
+            时钟.推进()
+    return 汇总(帧耗时, 计数.结果, {"平均呈现像素": gui.损伤.统计()["平均每帧像素"]})
+
+
+def 场景_菜单静止(帧数, rng):
+    时钟 = 确定性时钟()
+    gui = 新建GUI(时钟)
+    with 脚本输入():
+        return 回放GUI(gui, 时钟, 帧数, lambda 帧: [])
+
+
+def 场景_界面过渡(帧数, rng):
+    时钟 = 确定性时钟()
+    gui = 新建GUI(时钟)
+    目标 = ["设置", "主菜单"]
+
+    def 输入(帧):
+        if not gui.过渡中:
+            gui.切换界面(目标[0])
+            目标.reverse()
+        return []
+
+    with 脚本输入():
+        return 回放GUI(gui, 时钟, 帧数, 输入)
+
+
+def 场景_粒子爆发(帧数, rng):
+    时钟 = 确定性时钟()
+    gui = 新建GUI(时钟)
+    if gui.粒子系统 is None:
+        return {"跳过": "粒子系统需要numpy"}
+
+    def 输入(帧):
+        if 帧 % 30 == 0:
+            x, y = rng.randint(100, 700), rng.randint(100, 500)
+            for _ in range(500):
+                gui.添加粒子(x, y, rng.choice([(255, 200, 80), (120, 200, 255), (255, 120, 160)]),
+                          rng.randint(1, 4), rng.uniform(500, 1500),
+                          rng.uniform(-150, 150), rng.uniform(-150, 150))
+        return []
+
+    with 脚本输入():
+        return 回放GUI(gui, 时钟, 帧数, 输入)
+
+
+def 场景_收藏品翻页(帧数, rng):
+    时钟 = 确定性时钟()
+    gui = 新建GUI(时钟)
+    gui.切换界面("收藏品", 使用过渡=False)
+    界面 = gui.当前界面
+    # 每个类别放足够多的收藏品，保证能翻页
+    界面.收藏品数据 = {类别: [f"{类别}{i + 1}" for i in range(40)] for 类别 in 界面.类别列表}
+    稳定(gui, 时钟)
+
+    按钮 = {组件.文本: 组件.矩形.center for 组件 in 界面.组件列表 if hasattr(组件, "文本")}
+    脚本 = ["下一页"] * 4 + ["上一页"] * 4 + ["卡片"] + ["下一页"] * 2 + ["玩具"]
+
+    with 脚本输入() as 鼠标:
+        def 输入(帧):
+            # 每10帧点击一次，中间几帧鼠标在按钮间移动
+            if 帧 % 10 == 0:
+                return 鼠标.点击(按钮[脚本[帧 // 10 % len(脚本)]])
+            if 帧 % 10 == 5:
+                return 鼠标.移动((rng.randint(0, 799), rng.randint(0, 599)))
+            return []
+        return 回放GUI(gui, 时钟, 帧数, 输入)
+
+
+def 场景_属性界面(帧数, rng):
+    时钟 = 确定性时钟()
+    gui = 新建GUI(时钟)
+    gui.切换界面("角色属性", 使用过渡=False)
+    稳定(gui, 时钟)
+
+    with 脚本输入() as 鼠标:
+        def 输入(帧):
+            # 鼠标沿对角线来回扫过，经过返回按钮时产生悬停变化
+            t = 帧 % 120 / 120
+            return 鼠标.移动((int(800 * t), int(600 * t)))
+        return 回放GUI(gui, 时钟, 帧数, 输入)
+
+
+# ---------------------------------------------------------------- GUI管理器 场景
+
+def 导入管理器():
+    from gui_modules.gui_manager import GUI管理器
+    from gui_modules.gui_main_menu import 主菜单界面
+    from gui_modules.gui_base import GUI界面
+    return GUI管理器, 主菜单界面, GUI界面
+
+
+def 新建管理器(时钟):
+    GUI管理器, 主菜单界面, GUI界面 = 导入管理器()
+
+    class 纯色界面(GUI界面):
+        def 准备(self, 参数=None):
+            super().准备(参数)
+            self.主缓冲区.fill((60, 90, 140, 255))
+
+    管理器 = GUI管理器()
+    管理器.获取时间 = 时钟
+    管理器.注册界面(主菜单界面())
+    管理器.注册界面(纯色界面("纯色"))
+    管理器.切换到界面("主菜单")
+    return 管理器
+
+
+def 回放管理器(管理器, 时钟, 帧数, 每帧):
+    帧耗时 = []
+    with 分配计数() as 计数:
+        for 帧 in range(帧数):
+            开始 = time.perf_counter_ns()
+            每帧(帧)
+            帧耗时.append((time.perf_counter_ns() - 开始) / 1e6)
+            时钟.推进()
+    return 汇总(帧耗时, 计数.结果)
+
+
+def 场景_管理器菜单(帧数, rng):
+    时钟 = 确定性时钟()
+    管理器 = 新建管理器(时钟)
+    with 脚本输入():
+        return 回放管理器(管理器, 时钟, 帧数, lambda 帧: 管理器._更新界面())
+
+
+def 管理器切换场景(类型):
+    def 场景(帧数, rng):
+        时钟 = 确定性时钟()
+        管理器 = 新建管理器(时钟)
+        目标 = ["纯色", "主菜单"]
+
+        def 每帧(帧):
+            if not 管理器.切换动画["进行中"]:
+                管理器.切换到界面(目标[0], 动画=类型)
+                目标.reverse()
+            管理器._处理界面切换动画()
+
+        with 脚本输入():
+            return 回放管理器(管理器, 时钟, 帧数, 每帧)
+    return 场景
+
+
+GUI场景 = {
+    "菜单静止": 场景_菜单静止,
+    "界面过渡": 场景_界面过渡,
+    "粒子爆发": 场景_粒子爆发,
+    "收藏品翻页": 场景_收藏品翻页,
+    "属性界面": 场景_属性界面,
+}
+
+管理器场景 = {
+    "管理器菜单": 场景_管理器菜单,
+    "管理器淡入淡出": 管理器切换场景("淡入淡出"),
+    "管理器滑动": 管理器切换场景("滑动"),
+    "管理器缩放": 管理器切换场景("缩放"),
+}
+
+
+def 运行基准(帧数, 场景名称=None, 种子=0):
+    pygame.init()
+    结果 = {
+        "环境": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "SDL": ".".join(map(str, pygame.get_sdl_version())),
+            "视频驱动": os.environ["SDL_VIDEODRIVER"],
+            "帧数": 帧数,
+            "种子": 种子,
+        },
+        "场景": {},
+    }
+
+    try:
+        导入管理器()
+        管理器错误 = None
+    except ImportError as e:
+        管理器错误 = f"无法导入GUI管理器: {e}"
+
+    全部场景 = dict(GUI场景, **管理器场景)
+    for 名称, 场景 in 全部场景.items():
+        if 场景名称 and 名称 not in 场景名称:
+            continue
+        if 名称 in 管理器场景 and 管理器错误:
+            结果["场景"][名称] = {"跳过": 管理器错误}
+            continue
+        try:
+            结果["场景"][名称] = 场景(帧数, random.Random(种子))
+        except Exception as e:
+            结果["场景"][名称] = {"错误": f"{type(e).__name__}: {e}"}
+
+    pygame.quit()
+    return 结果
+
+
+def 打印结果(结果, 基线=None):
+    基线场景 = (基线 or {}).get("场景", {})
+    print(f"{'场景':<10}{'fps':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'表面':>8}{'内存块':>8}  备注")
+    for 名称, 项 in 结果["场景"].items():
+        if "fps" not in 项:
+            print(f"{名称:<10}  {项.get('跳过') or 项.get('错误')}")
+            continue
+        备注 = ""
+        旧 = 基线场景.get(名称, {})
+        if "p50_ms" in 旧 and 旧["p50_ms"]:
+            备注 = f"p50 x{项['p50_ms'] / 旧['p50_ms']:.2f}，fps x{项['fps'] / 旧['fps']:.2f}（相对基线）"
+        分配 = 项["分配"]
+        print(f"{名称:<10}{项['fps']:>10.1f}{项['p50_ms']:>10.3f}{项['p95_ms']:>10.3f}"
+              f"{项['p99_ms']:>10.3f}{分配['表面']:>8}{分配['内存块净增']:>8}  {备注}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无窗口GUI渲染基准")
+    parser.add_argument("--帧数", type=int, default=300, help="每个场景回放的帧数")
+    parser.add_argument("--场景", nargs="+", help="只运行这些场景")
+    parser.add_argument("--种子", type=int, default=0)
+    parser.add_argument("--输出", help="把结果写入JSON文件")
+    parser.add_argument("--基线", help="与之前输出的JSON比较")
+    参数 = parser.parse_args()
+
+    结果 = 运行基准(参数.帧数, 参数.场景, 参数.种子)
+    基线 = None
+    if 参数.基线:
+        with open(参数.基线, encoding="utf-8") as f:
+            基线 = json.load(f)
+    打印结果(结果, 基线)
+
+    if 参数.输出:
+        with open(参数.输出, "w", encoding="utf-8") as f:
+            json.dump(结果, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+空闲基准：画面静止时主循环每分钟消耗的CPU时间
+
+分别以每帧全屏重绘、逐帧刷新（只重绘变化区域）和空闲模式运行GUI主循环，
+停在主菜单上不做任何输入，用进程CPU时间除以墙钟时间换算成每空闲分钟的
+CPU秒数。GUI基础类可用时同样测量等待按键。
+
+注意：SDL的dummy视频驱动不支持阻塞等待，SDL内部会每毫秒轮询一次，
+因此无窗口环境下测得的空闲CPU时间是上限，真实视频驱动下接近零。
+
+用法:
+    python -m benchmarks.bench_idle [--秒数 N]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from gui import GUI
+
+
+def 测量(运行函数):
+    """运行函数并返回 (墙钟秒数, 每空闲分钟CPU秒数)"""
+    墙钟开始 = time.perf_counter()
+    CPU开始 = time.process_time()
+    运行函数()
+    墙钟 = time.perf_counter() - 墙钟开始
+    CPU = time.process_time() - CPU开始
+    return 墙钟, CPU / 墙钟 * 60
+
+
+class 全屏重绘GUI(GUI):
+    """每帧都把整个屏幕标记为脏，模拟原来每帧重绘全部内容的主循环"""
+
+    def 绘制(self):
+        self.标记脏()
+        super().绘制()
+
+
+def 测量主循环(秒数, 空闲模式, 类=GUI):
+    gui = 类()
+    gui.空闲模式 = 空闲模式
+    # 先走完启动时的过渡并画完首帧，只统计静止阶段
+    while gui.需要动画():
+        gui.更新(16)
+        gui.绘制()
+    gui.添加定时器(int(秒数 * 1000), gui.退出)
+    墙钟, 每分钟CPU = 测量(gui.运行)
+    return 墙钟, 每分钟CPU, gui.空闲等待次数
+
+
+def 测量等待按键(秒数):
+    try:
+        from gui_modules.gui_base import GUI基础类
+    except ImportError as e:
+        print(f"跳过等待按键：{e}")
+        return None
+    界面 = GUI基础类()
+    点击 = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(0, 0))
+    pygame.time.set_timer(点击, int(秒数 * 1000), loops=1)
+    结果 = 测量(界面.等待按键)
+    pygame.quit()
+    return 结果
+
+
+def main():
+    parser = argparse.ArgumentParser(description="空闲CPU占用基准")
+    parser.add_argument("--秒数", type=float, default=5.0, help="每种模式空闲运行的时间")
+    参数 = parser.parse_args()
+
+    print(f"视频驱动: {os.environ['SDL_VIDEODRIVER']}")
+    print(f"{'场景':<12}{'墙钟(s)':>10}{'CPU(s/空闲分钟)':>18}{'空闲等待次数':>14}")
+    for 名称, 空闲模式, 类 in (("主循环-全屏重绘", False, 全屏重绘GUI),
+                           ("主循环-逐帧", False, GUI),
+                           ("主循环-空闲", True, GUI)):
+        墙钟, 每分钟CPU, 等待次数 = 测量主循环(参数.秒数, 空闲模式, 类)
+        print(f"{名称:<12}{墙钟:>10.2f}{每分钟CPU:>18.3f}{等待次数:>14}")
+
+    结果 = 测量等待按键(参数.秒数)
+    if 结果:
+        墙钟, 每分钟CPU = 结果
+        print(f"{'等待按键':<12}{墙钟:>10.2f}{每分钟CPU:>18.3f}{'-':>14}")
+
+
+if __name__ == "__main__":
+    main()
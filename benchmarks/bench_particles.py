@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+粒子基准：比较逐粒子创建表面的旧实现与NumPy粒子引擎的每帧耗时
+
+用法:
+    python -m benchmarks.bench_particles [--粒子数 N ...] [--帧数 N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from gui_particles import 粒子系统
+
+宽度, 高度 = 800, 600
+
+
+def 随机粒子参数(数量):
+    return (
+        [random.uniform(0, 宽度) for _ in range(数量)],
+        [random.uniform(0, 高度) for _ in range(数量)],
+        [random.choice([(255, 200, 80), (120, 200, 255), (255, 120, 160)]) for _ in range(数量)],
+        [random.randint(1, 4) for _ in range(数量)],
+        [random.uniform(2000, 5000) for _ in range(数量)],
+        [random.uniform(-40, 40) for _ in range(数量)],
+        [random.uniform(-40, 40) for _ in range(数量)],
+    )
+
+
+def 旧实现帧(粒子列表, 表面, 时间增量):
+    """原GUI.更新粒子和GUI.绘制粒子的做法"""
+    已移除 = []
+    for i, 粒子 in enumerate(粒子列表):
+        粒子['x'] += 粒子['速度x'] * 时间增量 / 1000
+        粒子['y'] += 粒子['速度y'] * 时间增量 / 1000
+        粒子['剩余寿命'] -= 时间增量
+        if 粒子['剩余寿命'] <= 0:
+            已移除.append(i)
+    for i in reversed(已移除):
+        del 粒子列表[i]
+
+    for 粒子 in 粒子列表:
+        透明度 = int(255 * (粒子['剩余寿命'] / 粒子['寿命']))
+        大小 = 粒子['大小']
+        粒子表面 = pygame.Surface((大小 * 2, 大小 * 2), pygame.SRCALPHA)
+        pygame.draw.circle(粒子表面, 粒子['颜色'] + (透明度,), (大小, 大小), 大小)
+        表面.blit(粒子表面, (int(粒子['x']) - 大小, int(粒子['y']) - 大小))
+
+
+def 测量(数量, 帧数):
+    表面 = pygame.Surface((宽度, 高度))
+    x, y, 颜色, 大小, 寿命, 速度x, 速度y = 随机粒子参数(数量)
+
+    粒子列表 = [
+        {'x': x[i], 'y': y[i], '颜色': 颜色[i], '大小': 大小[i], '寿命': 寿命[i],
+         '剩余寿命': 寿命[i], '速度x': 速度x[i], '速度y': 速度y[i]}
+        for i in range(数量)
+    ]
+    开始 = time.perf_counter()
+    for _ in range(帧数):
+        旧实现帧(粒子列表, 表面, 16)
+    旧耗时 = (time.perf_counter() - 开始) / 帧数 * 1000
+
+    系统 = 粒子系统()
+    系统.批量发射(x, y, 颜色, 大小, 寿命, 速度x, 速度y)
+    开始 = time.perf_counter()
+    for _ in range(帧数):
+        系统.更新(16)
+        系统.绘制(表面)
+    新耗时 = (time.perf_counter() - 开始) / 帧数 * 1000
+    return 旧耗时, 新耗时
+
+
+def main():
+    parser = argparse.ArgumentParser(description="粒子引擎基准")
+    parser.add_argument("--粒子数", type=int, nargs="+", default=[300, 1000, 10000])
+    parser.add_argument("--帧数", type=int, default=60)
+    参数 = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((宽度, 高度))
+    print(f"{'粒子数':>8}{'旧实现(ms/帧)':>16}{'粒子引擎(ms/帧)':>18}")
+    for 数量 in 参数.粒子数:
+        旧耗时, 新耗时 = 测量(数量, 参数.帧数)
+        print(f"{数量:>8}{旧耗时:>16.2f}{新耗时:>18.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
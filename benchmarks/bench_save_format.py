@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+存档格式基准：比较pickle与二进制存档格式的体积和读写耗时
+
+用法:
+    python -m benchmarks.bench_save_format [--次数 N] [--收藏品 N] [--事件 N]
+"""
+
+import argparse
+import datetime
+import pickle
+import time
+
+import save_format
+from player import 玩家角色
+
+
+def 构造玩家(收藏品数量, 事件数量):
+    """构造一个存档内容较多的玩家"""
+    玩家 = 玩家角色("基准测试")
+    玩家.当前年份 = 2005
+    玩家._更新章节()
+    玩家.当前日期 = datetime.date(2005, 9, 1)
+    for 序号 in range(收藏品数量):
+        玩家.添加收藏品(f"收藏品{序号}")
+    for 序号 in range(事件数量):
+        事件名 = f"事件{序号}"
+        玩家.记录已触发事件(事件名)
+        玩家.记录事件选择(事件名, 序号 % 4)
+    return 玩家
+
+
+def 计时(函数, 次数):
+    """返回单次调用的平均耗时（微秒）"""
+    开始 = time.perf_counter()
+    for _ in range(次数):
+        函数()
+    return (time.perf_counter() - 开始) / 次数 * 1e6
+
+
+def 运行基准(次数, 收藏品数量, 事件数量):
+    玩家 = 构造玩家(收藏品数量, 事件数量)
+
+    pickle数据 = pickle.dumps(玩家)
+    二进制数据 = save_format.编码存档(save_format.提取存档数据(玩家))
+
+    结果 = {
+        "pickle": {
+            "大小": len(pickle数据),
+            "保存": 计时(lambda: pickle.dumps(玩家), 次数),
+            "加载": 计时(lambda: pickle.loads(pickle数据), 次数),
+        },
+        "二进制": {
+            "大小": len(二进制数据),
+            "保存": 计时(lambda: save_format.编码存档(save_format.提取存档数据(玩家)), 次数),
+            "加载": 计时(lambda: save_format.读取存档(二进制数据), 次数),
+        },
+        "pickle导入": {
+            "大小": len(pickle数据),
+            "保存": 0.0,
+            "加载": 计时(lambda: save_format.读取存档(pickle数据), 次数),
+        },
+    }
+
+    print(f"收藏品 {收藏品数量} 件，事件 {事件数量} 个，每项 {次数} 次")
+    print(f"{'格式':<10}{'大小(字节)':>12}{'保存(µs)':>12}{'加载(µs)':>12}")
+    for 名称, 数据 in 结果.items():
+        print(f"{名称:<10}{数据['大小']:>12}{数据['保存']:>12.1f}{数据['加载']:>12.1f}")
+    return 结果
+
+
+def main():
+    parser = argparse.ArgumentParser(description="存档格式基准")
+    parser.add_argument("--次数", type=int, default=2000)
+    parser.add_argument("--收藏品", type=int, default=60)
+    parser.add_argument("--事件", type=int, default=200)
+    参数 = parser.parse_args()
+    运行基准(参数.次数, 参数.收藏品, 参数.事件)
+
+
+if __name__ == "__main__":
+    main()
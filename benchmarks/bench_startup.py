@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动基准：文本模式从启动进程到出现第一个输入提示的耗时
+
+多次以文本模式启动main.py，读取标准输出直到出现第一个输入提示，取墙钟
+时间的中位数；再用 -X importtime 启动一次，列出导入耗时最多的模块，并检查
+文本模式没有导入图形界面相关的重型模块。超出预算时以状态码1退出。
+
+用法:
+    python -m benchmarks.bench_startup [--次数 N] [--预算 毫秒] [--前 N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+仓库目录 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 文本模式第一个输入提示
+提示文本 = "输入选项编号".encode("utf-8")
+
+# 文本模式启动时不应导入的模块
+禁止导入 = ("pygame", "numpy", "gui", "gui_modules", "chinese_calendar")
+
+
+def 启动到提示(导入计时=False):
+    """启动main.py直到出现第一个输入提示
+
+    返回:
+        tuple: (毫秒数, -X importtime的输出；未开启时为None)
+    """
+    命令 = [sys.executable]
+    if 导入计时:
+        命令 += ["-X", "importtime"]
+    命令.append("main.py")
+    环境 = dict(os.environ, PYTHONIOENCODING="utf-8")
+    环境.setdefault("TERM", "dumb")
+
+    # importtime输出可能超过管道缓冲区，写到临时文件，避免子进程阻塞在提示之前
+    with tempfile.TemporaryFile() as 错误输出:
+        开始 = time.perf_counter()
+        进程 = subprocess.Popen(命令, cwd=仓库目录, env=环境, stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, stderr=错误输出)
+        已读 = b""
+        while 提示文本 not in 已读:
+            块 = os.read(进程.stdout.fileno(), 4096)
+            if not 块:
+                进程.wait()
+                raise RuntimeError(f"main.py在出现输入提示前退出（状态码{进程.returncode}）")
+            已读 += 块
+        耗时 = (time.perf_counter() - 开始) * 1000
+        进程.kill()
+        进程.communicate()
+        错误输出.seek(0)
+        导入输出 = 错误输出.read().decode("utf-8", "replace") if 导入计时 else None
+    return 耗时, 导入输出
+
+
+def 解析导入耗时(输出):
+    """解析 -X importtime 的输出
+
+    返回:
+        list: [(模块名, 自身微秒, 累计微秒)]
+    """
+    结果 = []
+    for 行 in 输出.splitlines():
+        if not 行.startswith("import time:") or "imported package" in 行:
+            continue
+        自身, 累计, 名称 = 行[len("import time:"):].split("|")
+        结果.append((名称.strip(), int(自身), int(累计)))
+    return 结果
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文本模式冷启动基准")
+    parser.add_argument("--次数", type=int, default=7, help="计时运行次数，取中位数")
+    parser.add_argument("--预算", type=float, default=150.0, help="启动到首个输入提示的预算（毫秒）")
+    parser.add_argument("--前", type=int, default=10, help="列出导入耗时最多的模块数")
+    参数 = parser.parse_args()
+
+    # 第一次运行会编译.pyc，不计入
+    启动到提示()
+    耗时列表 = [启动到提示()[0] for _ in range(参数.次数)]
+    中位数 = statistics.median(耗时列表)
+
+    _, 导入输出 = 启动到提示(导入计时=True)
+    模块列表 = 解析导入耗时(导入输出)
+    总导入 = sum(自身 for _, 自身, _ in 模块列表) / 1000
+
+    print(f"启动到首个输入提示: 中位数 {中位数:.1f} ms（最小 {min(耗时列表):.1f}，"
+          f"最大 {max(耗时列表):.1f}，{参数.次数} 次），预算 {参数.预算:.0f} ms")
+    print(f"导入 {len(模块列表)} 个模块，自身耗时合计 {总导入:.1f} ms（含importtime开销）")
+    print(f"{'模块':<28}{'自身(ms)':>10}{'累计(ms)':>10}")
+    for 名称, 自身, 累计 in sorted(模块列表, key=lambda m: m[1], reverse=True)[:参数.前]:
+        print(f"{名称:<28}{自身 / 1000:>10.2f}{累计 / 1000:>10.2f}")
+
+    失败 = []
+    已导入 = {名称.split(".")[0] for 名称, _, _ in 模块列表}
+    多余 = [名称 for 名称 in 禁止导入 if 名称 in 已导入]
+    if 多余:
+        失败.append(f"文本模式导入了 {', '.join(多余)}")
+    if 中位数 > 参数.预算:
+        失败.append(f"启动耗时 {中位数:.1f} ms 超出预算 {参数.预算:.0f} ms")
+    for 原因 in 失败:
+        print(f"失败: {原因}")
+    sys.exit(1 if 失败 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+内容扩展包
+content目录下的每个JSON文件是一个内容包，按年代分节提供随机事件、历史事件、
+年代特色和事件详情。所有内容包编译成一个按年代分段的marshal缓存文件，
+以内容包的修改时间和内容哈希为键，任何一个包改动后自动重新编译。
+游戏只加载当前年代的那一段，临近下一个年代时在后台线程预取，
+内容包再大也不会拖慢启动或常驻全部内容。
+
+内容包格式:
+    {
+        "名称": "青岛记忆",
+        "年代": {
+            "1996-2000": {
+                "随机事件": [{"id": ..., "type": "校园", "title": ..., ...}],
+                "历史事件": {"1997": ["事件名", ...]},
+                "年代特色": {"1997": ["特色", ...]},
+                "事件详情": {"事件名": {"描述": ..., "选项": [...]}}
+            }
+        }
+    }
+随机事件的字段与RandomEventSystem事件池相同，"era"可以省略。
+"""
+
+import datetime
+import marshal
+import os
+import sys
+import tempfile
+import threading
+
+from random_events import ERA_BY_YEAR, ERA_RANGES
+
+内容目录 = "content"
+缓存路径 = os.path.join("data", "content_packs.bin")
+缓存版本 = 1
+
+# 距离下一个年代还有这么多天时开始在后台预取
+预取提前天数 = 60
+
+# 缓存文件开头记录文件头长度的字节数
+_头长度字节 = 8
+
+
+def 空年代内容():
+    """一个年代没有扩展内容时的结构"""
+    return {"随机事件": [], "历史事件": {}, "年代特色": {}, "事件详情": {}}
+
+
+def _包文件列表(目录):
+    """按文件名排序的内容包路径，目录不存在时为空"""
+    try:
+        名称列表 = sorted(名称 for 名称 in os.listdir(目录) if 名称.endswith(".json"))
+    except OSError:
+        return []
+    return [os.path.join(目录, 名称) for 名称 in 名称列表]
+
+
+def _目录状态(包文件):
+    """缓存格式、Python版本以及各内容包的大小和修改时间，一致时不必计算哈希"""
+    状态 = [缓存版本, list(sys.version_info[:2]), marshal.version]
+    for 路径 in 包文件:
+        信息 = os.stat(路径)
+        状态 += [os.path.basename(路径), 信息.st_size, 信息.st_mtime_ns]
+    return 状态
+
+
+def _目录指纹(包文件):
+    """内容包内容的哈希，修改时间变了但内容没变（如重新检出）时仍可沿用缓存"""
+    import hashlib
+    哈希 = hashlib.blake2b(repr([缓存版本, list(sys.version_info[:2]), marshal.version]).encode(),
+                         digest_size=16)
+    for 路径 in 包文件:
+        with open(路径, "rb") as f:
+            哈希.update(os.path.basename(路径).encode() + b"\0" + f.read())
+    return 哈希.hexdigest()
+
+
+def _合并年代节(结果, 年代, 节, 包名):
+    """把一个内容包的某个年代节合并进结果，格式错误的条目打印提示后跳过"""
+    第一年, 最后一年 = ERA_RANGES[年代]
+    内容 = 结果.setdefault(年代, 空年代内容())
+    for 事件 in 节.get("随机事件", []):
+        if "id" not in 事件 or "type" not in 事件 or "base_probability" not in 事件:
+            print(f"内容包'{包名}'中{年代}的随机事件缺少id、type或base_probability，已跳过")
+            continue
+        内容["随机事件"].append(dict(事件, era=年代))
+    for 键 in ("历史事件", "年代特色"):
+        for 年份文本, 列表 in 节.get(键, {}).items():
+            年份 = int(年份文本)
+            if not 第一年 <= 年份 <= 最后一年:
+                print(f"内容包'{包名}'中{年份}年的{键}不属于{年代}，已跳过")
+                continue
+            内容[键].setdefault(年份, []).extend(列表)
+    内容["事件详情"].update(节.get("事件详情", {}))
+
+
+def 编译内容包(包文件):
+    """读取并合并所有内容包
+
+    参数:
+        包文件(list): 内容包路径，按此顺序合并
+
+    返回:
+        dict: 年代 -> {"随机事件", "历史事件", "年代特色", "事件详情"}，
+              历史事件和年代特色以整数年份为键
+    """
+    import json
+
+    结果 = {}
+    for 路径 in 包文件:
+        包名 = os.path.basename(路径)
+        try:
+            with open(路径, "r", encoding="utf-8") as f:
+                包 = json.load(f)
+            for 年代, 节 in 包.get("年代", {}).items():
+                if 年代 not in ERA_RANGES:
+                    print(f"内容包'{包名}'中的年代'{年代}'不存在，已跳过")
+                    continue
+                _合并年代节(结果, 年代, 节, 包名)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"读取内容包'{包名}'失败: {e}")
+    return 结果
+
+
+def _写入缓存(路径, 头, 各段):
+    """写入缓存文件：文件头长度、marshal文件头、各年代数据段；失败时只打印提示
+
+    参数:
+        路径(str): 缓存文件路径
+        头(dict): 状态和指纹，索引由本函数填写
+        各段(dict): 年代 -> marshal字节
+
+    返回:
+        tuple: (文件头, 数据段起点)，写入失败时数据段起点为None
+    """
+    索引 = {}
+    偏移 = 0
+    for 年代, 数据 in 各段.items():
+        索引[年代] = (偏移, len(数据))
+        偏移 += len(数据)
+    头 = dict(头, 索引=索引)
+    头数据 = marshal.dumps(头)
+    try:
+        目录 = os.path.dirname(路径)
+        if 目录:
+            os.makedirs(目录, exist_ok=True)
+        # 每次写入使用独立的临时文件，几个进程同时编译时不会互相覆盖
+        文件描述符, 临时路径 = tempfile.mkstemp(dir=目录 or None, suffix=".tmp")
+        try:
+            with os.fdopen(文件描述符, "wb") as f:
+                f.write(len(头数据).to_bytes(_头长度字节, "little"))
+                f.write(头数据)
+                for 数据 in 各段.values():
+                    f.write(数据)
+            os.replace(临时路径, 路径)
+        except OSError:
+            os.remove(临时路径)
+            raise
+    except OSError as e:
+        print(f"写入内容包缓存失败: {e}")
+        return 头, None
+    return 头, _头长度字节 + len(头数据)
+
+
+class 内容包管理器:
+    """按年代延迟加载内容包，可以在后台线程预取下一个年代"""
+
+    def __init__(self, 目录=内容目录, 缓存文件=缓存路径):
+        """初始化内容包管理器，不读取任何文件
+
+        参数:
+            目录(str): 内容包所在目录
+            缓存文件(str): 编译后的缓存文件路径
+        """
+        self.目录 = 目录
+        self.缓存文件 = 缓存文件
+        # 加载和编译都在锁内进行，主线程需要的年代正在预取时等待预取完成
+        self._锁 = threading.Lock()
+        # 年代 -> (偏移, 长度)，None表示还没有检查缓存
+        self._索引 = None
+        self._数据起点 = 0
+        # 缓存写入失败时把各年代数据段留在内存中
+        self._内存段 = None
+        # 已加载的年代 -> 内容
+        self._年代 = {}
+        self._预取线程 = {}
+        self.加载次数 = 0
+
+    def _准备索引(self):
+        """检查缓存是否可用，必要时重新编译（调用时已持有锁）"""
+        if self._索引 is not None:
+            return
+        包文件 = _包文件列表(self.目录)
+        if not 包文件:
+            self._索引 = {}
+            return
+        状态 = _目录状态(包文件)
+        try:
+            with open(self.缓存文件, "rb") as f:
+                头长度 = int.from_bytes(f.read(_头长度字节), "little")
+                头 = marshal.loads(f.read(头长度))
+                数据起点 = _头长度字节 + 头长度
+                if 头["状态"] != 状态:
+                    if 头["指纹"] != _目录指纹(包文件):
+                        raise ValueError("内容包已改动")
+                    # 内容没变只是修改时间变了，更新文件头，下次不必再计算哈希
+                    各段 = {年代: f.read(长度) for 年代, (_, 长度) in 头["索引"].items()}
+                    头 = None
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            各段 = {年代: marshal.dumps(内容) for 年代, 内容 in 编译内容包(包文件).items()}
+            头 = None
+        if 头 is None:
+            头, 数据起点 = _写入缓存(self.缓存文件, {"状态": 状态, "指纹": _目录指纹(包文件)}, 各段)
+            if 数据起点 is None:
+                self._内存段 = 各段
+        self._索引 = 头["索引"]
+        self._数据起点 = 数据起点
+
+    def _读取年代(self, 年代):
+        """从缓存中读取一个年代的数据段（调用时已持有锁）"""
+        self._准备索引()
+        if 年代 not in self._索引:
+            return 空年代内容()
+        if self._内存段 is not None:
+            return marshal.loads(self._内存段[年代])
+        偏移, 长度 = self._索引[年代]
+        try:
+            with open(self.缓存文件, "rb") as f:
+                f.seek(self._数据起点 + 偏移)
+                return marshal.loads(f.read(长度))
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            print(f"读取内容包缓存失败: {e}")
+            return 空年代内容()
+
+    def 获取年代(self, 年代):
+        """获取一个年代的扩展内容，第一次获取时从缓存加载
+
+        参数:
+            年代(str): 年代区间，如'1996-2000'
+
+        返回:
+            dict: {"随机事件", "历史事件", "年代特色", "事件详情"}
+        """
+        内容 = self._年代.get(年代)
+        if 内容 is not None:
+            return 内容
+        with self._锁:
+            内容 = self._年代.get(年代)
+            if 内容 is None:
+                内容 = self._年代[年代] = self._读取年代(年代)
+                self.加载次数 += 1
+        return 内容
+
+    def 预取(self, 年代):
+        """在后台线程加载一个年代，已加载或正在加载时什么也不做
+
+        参数:
+            年代(str): 年代区间
+        """
+        if 年代 in self._年代:
+            return
+        线程 = self._预取线程.get(年代)
+        if 线程 is not None and 线程.is_alive():
+            return
+        线程 = threading.Thread(target=self.获取年代, args=(年代,), name=f"预取内容包{年代}", daemon=True)
+        self._预取线程[年代] = 线程
+        线程.start()
+
+    def 临近边界预取(self, 日期):
+        """日期临近下一个年代时预取下一个年代
+
+        参数:
+            日期(datetime.date): 当前游戏日期
+
+        返回:
+            str: 开始预取（或已经加载）的下一个年代，还不临近边界时返回None
+        """
+        年代 = ERA_BY_YEAR.get(日期.year)
+        if 年代 is None:
+            return None
+        下一个年代 = ERA_BY_YEAR.get(ERA_RANGES[年代][1] + 1)
+        if 下一个年代 is None:
+            return None
+        边界 = datetime.date(ERA_RANGES[下一个年代][0], 1, 1)
+        if (边界 - 日期).days > 预取提前天数:
+            return None
+        self.预取(下一个年代)
+        return 下一个年代
+
+    def 释放(self, 年代):
+        """卸载一个年代的内容
+
+        返回:
+            dict: 被卸载的内容，没有加载时返回None
+        """
+        return self._年代.pop(年代, None)
+
+    def 已加载(self):
+        """返回已加载的年代列表"""
+        return list(self._年代)
+
+    def 年份事件(self, 年份):
+        """扩展包中指定年份的历史事件"""
+        年代 = ERA_BY_YEAR.get(年份)
+        if 年代 is None:
+            return []
+        return self.获取年代(年代)["历史事件"].get(年份, [])
+
+    def 年份特色(self, 年份):
+        """扩展包中指定年份的年代特色"""
+        年代 = ERA_BY_YEAR.get(年份)
+        if 年代 is None:
+            return []
+        return self.获取年代(年代)["年代特色"].get(年份, [])
+
+    def 事件详情(self, 事件名):
+        """在已加载的年代中查找事件详情，找不到时返回None"""
+        for 内容 in list(self._年代.values()):
+            详情 = 内容["事件详情"].get(事件名)
+            if 详情 is not None:
+                return 详情
+        return None
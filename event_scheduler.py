@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+事件调度器
+把节日、年代/年份交界和随机事件窗口合并成一个按日期排序的队列，
+时间推进时可以直接跳到下一个可能发生事情的日期，而不是逐日检查。
+"""
+
+import datetime
+import heapq
+import random
+
+from random_events import ERA_RANGES
+
+# 队列中的事件类型
+类型_节日 = "节日"
+类型_新年 = "新年"
+类型_新年代 = "新年代"
+类型_随机事件 = "随机事件"
+
+# 随机事件窗口内每天触发的概率，与游戏引擎.检查随机事件一致
+随机事件触发概率 = 0.3
+
+# 各年代的起始年份
+年代起始年份 = {起始年份: 年代 for 年代, (起始年份, _) in ERA_RANGES.items()}
+
+
+class 事件调度器:
+    """按日期合并多个事件来源的优先队列"""
+
+    def __init__(self, 节日系统, 随机事件系统, 开始日期, 结束日期, rng=random):
+        """初始化事件调度器
+
+        参数:
+            节日系统(节日系统): 提供节日日历
+            随机事件系统(RandomEventSystem): 提供随机事件窗口判断
+            开始日期(date): 从这一天之后开始调度（不含当天）
+            结束日期(date): 调度的最后一天
+            rng: 随机数生成器，用于预先掷出随机事件的触发概率
+        """
+        self.节日系统 = 节日系统
+        self.随机事件系统 = 随机事件系统
+        self.开始日期 = 开始日期
+        self.结束日期 = 结束日期
+        self.rng = rng
+        self._队列 = heapq.merge(self._节日来源(), self._年份来源(), self._随机事件来源())
+        self._下一项 = next(self._队列, None)
+
+    def _节日来源(self):
+        日期 = self.开始日期
+        while True:
+            日期, 节日名 = self.节日系统.下一个节日(日期)
+            if 日期 > self.结束日期:
+                return
+            yield 日期.toordinal(), 类型_节日, 节日名
+
+    def _年份来源(self):
+        for 年份 in range(self.开始日期.year + 1, self.结束日期.year + 1):
+            序数 = datetime.date(年份, 1, 1).toordinal()
+            if 年份 in 年代起始年份:
+                yield 序数, 类型_新年代, 年代起始年份[年份]
+            yield 序数, 类型_新年, 年份
+
+    def _随机事件来源(self):
+        """逐日判断随机事件窗口，并预先掷出30%的触发概率
+
+        窗口内未通过概率判断的日子，以及事件已经全部触发过的年代，
+        在逐日推进时也不会发生随机事件，可以直接跳过。
+        """
+        事件系统 = self.随机事件系统
+        for 年份 in range(self.开始日期.year, self.结束日期.year + 1):
+            if not 事件系统.has_available_events(事件系统.get_era(年份)):
+                continue
+            起始 = max(self.开始日期.toordinal() + 1, datetime.date(年份, 1, 1).toordinal())
+            结束 = min(self.结束日期, datetime.date(年份, 12, 31)).toordinal()
+            for 序数 in 事件系统.event_window_days(起始, 结束):
+                if self.rng.random() < 随机事件触发概率:
+                    yield 序数, 类型_随机事件, 年份
+
+    def 下一个(self):
+        """取出下一个有事件的日期
+
+        返回:
+            tuple: (日期, {事件类型: 名称}) ，没有更多事件时返回None
+        """
+        事件系统 = self.随机事件系统
+        while self._下一项 is not None:
+            序数 = self._下一项[0]
+            事件 = {}
+            while self._下一项 is not None and self._下一项[0] == 序数:
+                _, 类型, 名称 = self._下一项
+                事件[类型] = 名称
+                self._下一项 = next(self._队列, None)
+            # 调度器跨多次跳转沿用时，年代的随机事件可能在掷出这一天之后才全部触发
+            年份 = 事件.get(类型_随机事件)
+            if 年份 is not None and not 事件系统.has_available_events(事件系统.get_era(年份)):
+                del 事件[类型_随机事件]
+            if 事件:
+                return datetime.date.fromordinal(序数), 事件
+        return None
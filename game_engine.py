@@ -6,35 +6,50 @@ import datetime
 import config
 from player import 玩家角色
 from save_system import 存档系统
+from autosave import 自动存档服务
+import save_format
 import events_data
 import ui
 from holidays_system import 节日系统
 import holiday_events
 from random_events import RandomEventSystem
-import math
+from event_scheduler import 事件调度器, 类型_随机事件
+import warm_start
+import content_packs
 import sys
 
-try:
-    from gui import 创建图形界面
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
-    print("警告：图形界面初始化失败，将使用文本界面")
+
+def _导入图形界面():
+    """导入图形界面模块（连带pygame），只在选择图形界面时调用
+
+    返回:
+        function: 创建图形界面的函数，导入失败时返回None
+    """
+    try:
+        from gui import 创建图形界面
+    except ImportError:
+        print("警告：图形界面初始化失败，将使用文本界面")
+        return None
+    return 创建图形界面
 
 class 游戏引擎:
     """游戏引擎，协调各个模块工作"""
     
-    def __init__(self, 使用高级界面=False, 使用图形界面=False):
+    def __init__(self, 使用高级界面=False, 使用图形界面=False, 界面=None):
         """初始化游戏引擎
         
         参数:
             使用高级界面(bool): 是否使用高级界面
             使用图形界面(bool): 是否使用图形界面
+            界面: 外部提供的界面实例（如无头模拟界面），指定时忽略前两个参数
         """
-        # 选择界面类型
-        self.使用图形界面 = 使用图形界面 and GUI_AVAILABLE
+        # 选择界面类型；图形界面模块只在需要时导入，文本模式不加载pygame
+        创建图形界面 = _导入图形界面() if 使用图形界面 and 界面 is None else None
+        self.使用图形界面 = 创建图形界面 is not None
         
-        if self.使用图形界面:
+        if 界面 is not None:
+            self.界面 = 界面
+        elif self.使用图形界面:
             self.界面 = 创建图形界面()
             self.界面.设置回调(self.处理界面回调)
         else:
@@ -42,12 +57,26 @@ class 游戏引擎:
             
         self.存档系统 = 存档系统()
         self.节日系统 = 节日系统()
+        self.自动存档 = 自动存档服务(self.存档系统, self.节日系统)
         self.玩家 = None
         self.运行中 = False
         self.当前日期 = None
+        self._预判随机事件日期 = None
+        # 跳到下一个事件到达的日期，调度器已经为这一天掷过随机事件的触发概率
+        self._已预判日期 = None
+        # (调度器, 到达日期, 玩家)：从上次跳到的日期继续跳时沿用同一个调度器
+        self._调度器 = None
+        
+        # 事件池和节日表从热启动快照恢复，源数据改变时快照自动重建
+        快照 = warm_start.热启动()
+        节日系统.日历.预置(快照["节日表"])
         
         # 初始化随机事件系统
-        self.random_event_system = RandomEventSystem()
+        self.random_event_system = RandomEventSystem(event_pools=快照["事件池"])
+        
+        # 内容扩展包按年代延迟加载，只保留当前年代，临近下一个年代时在后台预取
+        self.内容包 = content_packs.内容包管理器()
+        self._内容年代 = None
     
     def 开始新游戏(self):
         """开始新游戏"""
@@ -99,25 +128,42 @@ class 游戏引擎:
     
     def 加载游戏(self):
         """加载游戏存档"""
-        存档列表 = self.存档系统.列出存档()
-        
-        if not 存档列表:
-            self.界面.显示文本("没有找到游戏存档。")
-            self.界面.等待按键()
-            return False
-        
-        选项 = [f"{文件名} - {时间} ({大小}KB)" for 文件名, 时间, 大小 in 存档列表]
-        选项.append("返回")
-        
-        选择 = self.界面.输入选择(选项, "选择要加载的存档:")
-        
-        if 选择 == len(选项) - 1:  # 选择了"返回"
-            return False
+        while True:
+            存档列表 = self.存档系统.列出存档信息()
             
-        存档名 = 存档列表[选择][0]
-        self.玩家 = self.存档系统.加载游戏(存档名)
+            if not 存档列表:
+                self.界面.显示文本("没有找到游戏存档。")
+                self.界面.等待按键()
+                return False
+            
+            选项 = [
+                # 旧pickle存档在加载前没有名字和年份
+                f"{信息['文件名']} - 旧存档 - {信息['修改时间']} ({信息['大小'] // 1024}KB)"
+                if 信息['章节'] == "旧存档" else
+                f"{信息['名字']} - {信息['年份']}年 {信息['章节']} - {信息['修改时间']} ({信息['大小'] // 1024}KB)"
+                for 信息 in 存档列表
+            ]
+            选项 += ["刷新", "返回"]
+            
+            选择 = self.界面.输入选择(选项, "选择要加载的存档:")
+            
+            if 选择 == len(选项) - 1:  # 选择了"返回"
+                return False
+            if 选择 == len(选项) - 2:  # 在游戏外改动过存档时重新核对
+                self.存档系统.刷新索引()
+                continue
+            break
+            
+        存档名 = 存档列表[选择]["文件名"]
+        存档数据 = self.存档系统.加载存档数据(存档名)
+        self.玩家 = save_format.还原玩家(存档数据) if 存档数据 else None
         
         if self.玩家:
+            # 存档中附带的节日记录（旧存档没有）
+            节日数据 = 存档数据["扩展"].get("节日数据")
+            if 节日数据:
+                self.节日系统.载入节日数据(节日数据)
+            
             self.界面.显示加载成功(self.玩家.名字, self.玩家.当前年份)
             
             # 恢复游戏日期（默认为该年1月1日）
@@ -142,7 +188,7 @@ class 游戏引擎:
         # 保存当前日期到玩家对象    
         self.玩家.当前日期 = self.当前日期
             
-        存档路径 = self.存档系统.保存游戏(self.玩家)
+        存档路径 = self.存档系统.保存游戏(self.玩家, 扩展={"节日数据": self.节日系统.节日数据})
         self.界面.显示保存成功(self.玩家.名字, self.玩家.当前年份)
         self.界面.等待按键()
         return True
@@ -150,26 +196,7 @@ class 游戏引擎:
     def 主循环(self):
         """游戏主循环"""
         while self.运行中:
-            # 检查当前是否是节日
-            是否节日, 节日名 = self.节日系统.是否节日(
-                self.当前日期.year, 
-                self.当前日期.month, 
-                self.当前日期.day
-            )
-            
-            # 显示当前日期和节日信息
-            日期信息 = f"{self.当前日期.year}年{self.当前日期.month}月{self.当前日期.day}日"
-            if 是否节日:
-                日期信息 += f" 【{节日名}】"
-            
-            # 首先检查是否有节日事件需要触发
-            if 是否节日 and not self.节日系统.是否已触发节日(self.当前日期.year, 节日名):
-                self.触发节日事件(节日名)
-                # 标记该节日已触发
-                self.节日系统.标记节日已触发(self.当前日期.year, 节日名)
-            
-            # 检查随机事件
-            self.检查随机事件()
+            日期信息 = self.处理当日事件()
             
             # 正常菜单选择
             选择 = self.界面.显示主菜单(self.玩家.获取基本信息(), 日期信息)
@@ -190,12 +217,55 @@ class 游戏引擎:
                 self.保存游戏()
             elif 选择 == 6:  # 退出游戏
                 self.运行中 = False
+                self.自动存档.刷新()
                 self.界面.显示文本("感谢游玩《九零后时光机》！", 1)
+            
+            if self.运行中:
+                # 后台写入，不阻塞主循环
+                self.自动存档.请求存档(self.玩家, self.当前日期)
+    
+    def 处理当日事件(self):
+        """处理当前日期的节日事件和随机事件
+        
+        返回:
+            str: 当前日期描述，节日当天附带节日名称
+        """
+        self._同步内容年代()
+        
+        # 检查当前是否是节日
+        是否节日, 节日名 = self.节日系统.是否节日(
+            self.当前日期.year, 
+            self.当前日期.month, 
+            self.当前日期.day
+        )
+        
+        # 显示当前日期和节日信息
+        日期信息 = f"{self.当前日期.year}年{self.当前日期.month}月{self.当前日期.day}日"
+        if 是否节日:
+            日期信息 += f" 【{节日名}】"
+        
+        # 首先检查是否有节日事件需要触发
+        if 是否节日 and not self.节日系统.是否已触发节日(self.当前日期.year, 节日名):
+            # 节日事件中的多次记录合并为一次写入
+            with self.节日系统.批量修改():
+                self.触发节日事件(节日名)
+                # 标记该节日已触发
+                self.节日系统.标记节日已触发(self.当前日期.year, 节日名)
+        
+        # 检查随机事件（跳到事件日期时已经预先掷过触发概率，没通过的不再重掷）
+        if self._预判随机事件日期 == self.当前日期:
+            self._预判随机事件日期 = None
+            self.触发当日随机事件()
+        elif self._已预判日期 != self.当前日期:
+            self.检查随机事件()
+        self._已预判日期 = None
+        
+        return 日期信息
     
     def 探索当前时间(self):
         """探索当前年份的特色和事件"""
         当前年份 = self.玩家.当前年份
-        年份特色 = events_data.获取年份特色(当前年份)
+        年份特色 = events_data.获取年份特色(当前年份) + self.内容包.年份特色(当前年份)
         
         if not 年份特色:
             self.界面.显示文本("这一年的记忆还不太清晰...")
@@ -211,7 +281,7 @@ class 游戏引擎:
             return
             
         # 根据选择触发随机事件
-        可用事件 = self.玩家.获取未触发事件(events_data.获取年份事件(当前年份))
+        可用事件 = self.玩家.获取未触发事件(self._年份事件(当前年份))
         
         if 可用事件:
             # 一定概率触发事件
@@ -231,7 +301,7 @@ class 游戏引擎:
         参数:
             事件名(str): 要触发的事件名称
         """
-        事件详情 = events_data.获取事件详情(事件名)
+        事件详情 = events_data.获取事件详情(事件名) or self.内容包.事件详情(事件名)
         
         if not 事件详情:
             self.界面.显示文本(f"事件 '{事件名}' 数据未定义。")
@@ -241,7 +311,7 @@ class 游戏引擎:
         self.界面.显示事件(事件名, 事件详情["描述"])
         
         选项 = [选项["描述"] for 选项 in 事件详情["选项"]]
-        选择索引 = self.界面.输入选择(选项, "你的选择是:")
+        选择索引 = self.界面.输入选择(选项, "你的选择是:", 选项数据=事件详情["选项"])
         
         # 记录事件已触发
         self.玩家.记录已触发事件(事件名)
@@ -282,7 +352,7 @@ class 游戏引擎:
         self.界面.显示节日(节日名, f"【{事件名}】\n{事件详情['描述']}")
         
         选项 = [选项["描述"] for 选项 in 事件详情["选项"]]
-        选择索引 = self.界面.输入选择(选项, "你的选择是:")
+        选择索引 = self.界面.输入选择(选项, "你的选择是:", 选项数据=事件详情["选项"])
         
         # 应用结果
         选择结果 = 事件详情["选项"][选择索引]
@@ -334,9 +404,25 @@ class 游戏引擎:
         
         self.界面.等待按键()
     
+    def _年份事件(self, 年份):
+        """内置和扩展包中指定年份的历史事件"""
+        return events_data.获取年份事件(年份) + self.内容包.年份事件(年份)
+    
+    def _同步内容年代(self):
+        """进入新年代时换入该年代扩展包中的随机事件、卸载上一个年代的，临近下一个年代时预取"""
+        年代 = self.确定当前年代()
+        if 年代 != self._内容年代:
+            if self._内容年代 is not None:
+                旧内容 = self.内容包.释放(self._内容年代)
+                if 旧内容:
+                    self.random_event_system.remove_events(事件['id'] for 事件 in 旧内容["随机事件"])
+            self.random_event_system.add_events(self.内容包.获取年代(年代)["随机事件"])
+            self._内容年代 = 年代
+        self.内容包.临近边界预取(self.当前日期)
+    
     def 时间推进(self):
         """推进游戏时间"""
-        选项 = ["前进一天", "前进一周", "前进一个月", "直接到下一年", "返回"]
+        选项 = ["前进一天", "前进一周", "前进一个月", "直接到下一年", "跳到下一个事件", "返回"]
         选择 = self.界面.输入选择(选项, "时间推进方式:")
         
         if 选择 == 0:  # 前进一天
@@ -369,7 +455,7 @@ class 游戏引擎:
                 self.界面.显示时间推进(self.玩家.当前年份, self.玩家.当前章节)
                 
                 # 检查是否触发年份事件
-                事件列表 = events_data.获取年份事件(self.玩家.当前年份)
+                事件列表 = self._年份事件(self.玩家.当前年份)
                 未触发事件 = self.玩家.获取未触发事件(事件列表)
                 
                 if 未触发事件:
@@ -380,9 +466,60 @@ class 游戏引擎:
             else:
                 self.界面.显示文本("你已经到达了游戏的最后一年。")
                 
-        elif 选择 == 4:  # 返回
+        elif 选择 == 4:  # 跳到下一个事件
+            事件 = self.跳到下一个事件()
+            if 事件 is None:
+                self.界面.显示文本("之后不会再有新的事件了。")
+            else:
+                self.界面.显示文本(f"时间推进到: {self.当前日期.year}年{self.当前日期.month}月{self.当前日期.day}日")
+            
+        elif 选择 == 5:  # 返回
             return
             
+        self._同步年份()
+        self.界面.等待按键()
+    
+    def 推进日期(self, 天数):
+        """将当前日期向后推进指定天数，并同步玩家年份
+        
+        参数:
+            天数(int): 推进的天数
+        """
+        self.当前日期 += datetime.timedelta(days=天数)
+        self._同步年份()
+    
+    def 跳到下一个事件(self):
+        """跳到下一个可能发生事件的日期（节日、跨年或随机事件）
+        
+        跳过的日子在逐日推进时也不会发生任何事件。随机事件日期的触发概率
+        已经预先掷过，到达后由处理当日事件直接触发。
+        
+        返回:
+            dict: 到达日期的事件 {事件类型: 名称}，之后没有事件时返回None
+        """
+        # 日期被手动推进或换了玩家（读档、新游戏）时才需要重新建立队列
+        if (self._调度器 is not None and self._调度器[1] == self.当前日期
+                and self._调度器[2] is self.玩家):
+            调度器 = self._调度器[0]
+        else:
+            结束日期 = datetime.date(config.ENDING_YEAR, 12, 31)
+            调度器 = 事件调度器(self.节日系统, self.random_event_system, self.当前日期, 结束日期)
+        下一个 = 调度器.下一个()
+        if 下一个 is None:
+            self._调度器 = None
+            return None
+        
+        日期, 事件 = 下一个
+        self._调度器 = (调度器, 日期, self.玩家)
+        self.当前日期 = 日期
+        self._已预判日期 = 日期
+        if 类型_随机事件 in 事件:
+            self._预判随机事件日期 = 日期
+        self._同步年份()
+        return 事件
+    
+    def _同步年份(self):
+        """当前日期跨年后推进玩家年份，并在刚好跨年时可能触发年度事件"""
         # 检查年份是否需要变更
         if self.当前日期.year != self.玩家.当前年份:
             # 判断是否超过游戏结束年份
@@ -399,14 +536,12 @@ class 游戏引擎:
                 
                 # 可能触发年度事件(只在刚好跨年时触发)
                 if 原年份 + 1 == self.玩家.当前年份:
-                    事件列表 = events_data.获取年份事件(self.玩家.当前年份)
+                    事件列表 = self._年份事件(self.玩家.当前年份)
                     未触发事件 = self.玩家.获取未触发事件(事件列表)
                     
                     if 未触发事件 and random.random() < 0.8:
                         事件名 = random.choice(未触发事件)
                         self.触发事件(事件名)
-        
-        self.界面.等待按键()
     
     def 显示节日收藏(self):
         """显示节日收藏品和记录"""
@@ -469,6 +604,18 @@ class 游戏引擎:
         Returns:
             bool: 是否触发了随机事件
         """
+        # 噪声值（有一定连续性）超过阈值的日子才检查
+        if self.random_event_system.is_event_window(self.当前日期.toordinal()) and random.random() < 0.3:  # 30%概率检查通过时触发
+            return self.触发当日随机事件()
+        
+        return False
+    
+    def 触发当日随机事件(self):
+        """按当前日期的季节和年代触发随机事件
+        
+        Returns:
+            bool: 是否成功触发事件
+        """
         # 获取当前季节
         月份 = self.当前日期.month
         if 3 <= 月份 <= 5:
@@ -480,21 +627,10 @@ class 游戏引擎:
         else:
             季节 = '冬'
             
-        # 获取当前年代
-        年代 = self.确定当前年代()
-        
-        # 生成噪声值（0-1之间的随机值，但有一定的连续性）
-        日期数值 = self.当前日期.toordinal()
-        噪声值 = abs(math.sin(日期数值 * 0.1 + self.random_event_system.noise_seed)) 
-        
-        # 确定阈值（基础阈值加上季节修正）
-        阈值 = self.random_event_system.threshold
+        # 获取当前年代，超出游戏年份时为'未知年代'，没有可选的随机事件
+        年代 = self.random_event_system.get_era(self.当前日期.year)
         
-        # 如果噪声值超过阈值，则触发随机事件
-        if 噪声值 > 阈值 and random.random() < 0.3:  # 30%概率检查通过时触发
-            return self.触发随机事件(年代, 季节)
-        
-        return False
+        return self.触发随机事件(年代, 季节)
     
     def 触发随机事件(self, 年代, 季节):
         """触发随机事件
@@ -506,23 +642,20 @@ class 游戏引擎:
         Returns:
             bool: 是否成功触发事件
         """
-        # 获取适合当前年代和季节的事件
-        可用事件列表 = self.random_event_system.get_suitable_events(年代, 季节, self.玩家)
+        # 按季节和玩家属性加权，从当前年代的事件池中选择一个事件
+        事件 = self.random_event_system.select_event_for_era(年代, self.玩家, 季节)
         
-        if not 可用事件列表:
+        if not 事件:
             return False
-            
-        # 随机选择一个事件
-        事件 = random.choice(可用事件列表)
         
         # 显示事件信息
         self.界面.显示文本(f"【{事件['title']}】\n{事件['description']}")
         
         # 如果事件有选项，则显示选项
-        if '选项' in 事件 and 事件['选项']:
-            选项列表 = [选项['text'] for 选项 in 事件['选项']]
-            选择索引 = self.界面.输入选择(选项列表, "你的选择是:")
-            选择结果 = 事件['选项'][选择索引]
+        if 事件.get('choices'):
+            选项列表 = [选项['text'] for 选项 in 事件['choices']]
+            选择索引 = self.界面.输入选择(选项列表, "你的选择是:", 选项数据=事件['choices'])
+            选择结果 = 事件['choices'][选择索引]
             
             # 显示选择结果
             self.界面.显示事件结果(选择结果['outcome'])
@@ -534,7 +667,7 @@ class 游戏引擎:
             self.应用事件效果(事件.get('effects', {}))
             
         # 添加到已触发事件
-        self.random_event_system.triggered_events.add(事件['id'])
+        self.random_event_system.trigger_event(事件['id'])
         
         # 检查是否有收藏品
         if '收藏品' in 事件:
@@ -639,7 +772,12 @@ class 游戏引擎:
             elif 选择 == 5:  # 退出游戏
                 self.运行中 = False
                 self.界面.运行中 = False
+                self.自动存档.刷新()
                 sys.exit(0)
+            
+            if 选择 in (0, 3):
+                # 后台写入，界面循环不等待磁盘
+                self.自动存档.请求存档(self.玩家, self.当前日期)
     
     def 获取玩家信息(self):
         """获取玩家基本信息用于界面显示
@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import heapq
+import itertools
 import pygame
 import sys
+from gui_assets import 缩放图片
+from gui_damage import 损伤跟踪器
+from gui_fonts import 渲染文本, 预加载字体
+from gui_particles import 粒子系统, NUMPY_AVAILABLE
+from gui_profiler import 帧分析器
 from gui_base import 按钮, 标签, 滑块, 复选框, 单选按钮
-from gui_main import 主菜单界面
-from gui_collection import 收藏品界面
-from gui_attributes import 角色属性界面
-from gui_settings import 设置界面
+from gui_registry import 界面注册表, 预热延迟, 预热间隔
 
 class GUI:
     """游戏GUI管理器"""
@@ -29,26 +33,32 @@ class GUI:
         self.原始屏幕尺寸 = (宽度, 高度)
         self.屏幕 = pygame.display.set_mode((宽度, 高度))
         
+        # 预加载界面用到的字体，避免首帧卡顿
+        预加载字体()
+        
         # 游戏引擎引用
         self.游戏引擎 = 游戏引擎
         
-        # 主缓冲区 - 用于双缓冲渲染
+        # 主缓冲区 - 保存上一帧合成好的画面，只重绘其中变化的区域
         self.主缓冲区 = pygame.Surface((宽度, 高度))
         
-        # 脏矩形列表 - 用于记录需要更新的屏幕区域
-        self.脏矩形列表 = []
+        # 损伤跟踪 - 记录本帧变化的区域，合并后只重绘和提交这些区域
+        self.损伤 = 损伤跟踪器(宽度, 高度)
+        self.损伤.添加全屏()
+        
+        # 上一帧粒子、消息等覆盖层占据的区域，下一帧需要先擦除
+        self._覆盖层矩形 = []
         
         try:
-            # 加载背景图片
-            self.背景图片 = pygame.image.load("picture/back_ground_picture.png").convert()
-            self.背景图片 = pygame.transform.scale(self.背景图片, (宽度, 高度))
+            # 加载背景图片（资源管理器中解码和缩放各只做一次）
+            self.背景图片 = 缩放图片("picture/back_ground_picture.png", (宽度, 高度))
         except:
             print("无法加载背景图片，使用默认背景")
             self.背景图片 = None
         
-        # 粒子系统
-        self.粒子列表 = []
-        self.粒子效果启用 = True
+        # 粒子系统（需要numpy）
+        self.粒子系统 = 粒子系统() if NUMPY_AVAILABLE else None
+        self.粒子效果启用 = NUMPY_AVAILABLE
         
         # 过渡效果
         self.过渡中 = False
@@ -56,35 +66,67 @@ class GUI:
         self.过渡持续时间 = 500  # 毫秒
         self.过渡类型 = None  # 'fade_in', 'fade_out'
         self.过渡回调 = None
+        # 过渡期间界面画面不变，捕获一次快照后每帧只合成快照和覆盖层
+        self._过渡快照 = None
+        self._过渡快照有效 = False
+        self._过渡覆盖表面 = None
         
         # 消息系统
         self.消息列表 = []
         self.消息持续时间 = 3000  # 毫秒
         
-        # 创建并存储界面
-        self.界面 = {}
+        # 时钟 - 用于控制帧率；获取时间返回毫秒，测试和基准可以替换成确定性的时钟
+        self.时钟 = pygame.time.Clock()
+        self.获取时间 = pygame.time.get_ticks
+        self.运行中 = False
+        
+        # 空闲模式 - 没有动画时阻塞等待输入或定时器，而不是按60帧空转
+        self.空闲模式 = True
+        self.空闲等待次数 = 0
+        self._定时器 = []  # (到期时间, 序号, 回调) 组成的最小堆
+        self._定时器序号 = itertools.count()
+        
+        # 帧性能分析器，调用启用性能分析后才会创建
+        self.分析器 = None
+        
+        # 界面注册表 - 第一次切换到界面时才导入模块并创建
+        self.界面 = 界面注册表(self._创建界面)
         self.当前界面 = None
+        self.当前界面名称 = None
         self.初始化界面()
         
+        # 空闲时在主菜单上逐个预热其他界面，设为False关闭
+        self.空闲预热 = True
+        self._最后输入时间 = 0
+        self.添加定时器(预热延迟, self._预热界面)
+        
         # 设置主菜单为初始界面
         self.切换界面("主菜单")
-        
-        # 时钟 - 用于控制帧率
-        self.时钟 = pygame.time.Clock()
-        self.运行中 = False
     
     def 初始化界面(self):
-        """初始化所有界面"""
-        self.界面 = {
-            "主菜单": 主菜单界面(self),
-            "收藏品": 收藏品界面(self),
-            "角色属性": 角色属性界面(self),
-            "设置": 设置界面(self)
-        }
-        
-        # 初始化每个界面
-        for 界面名称, 界面实例 in self.界面.items():
-            界面实例.初始化()
+        """登记所有界面，别名是各界面切换时使用的名称"""
+        self.界面.注册("主菜单", "gui_main", "主菜单界面")
+        self.界面.注册("收藏品", "gui_collection", "收藏品界面", 别名=("收藏品界面",))
+        self.界面.注册("角色属性", "gui_attributes", "角色属性界面", 别名=("角色属性界面", "属性界面"))
+        self.界面.注册("设置", "gui_settings", "设置界面", 别名=("设置界面",))
+        self.界面.注册("游戏主界面", "gui_game_main", "游戏主界面")
+        self.界面.注册("时间探索", "gui_time_explore", "时间探索界面", 别名=("时间探索界面",))
+    
+    def _创建界面(self, 界面类):
+        """创建并初始化界面实例，由界面注册表在第一次用到时调用"""
+        界面实例 = 界面类(self)
+        界面实例.初始化()
+        return 界面实例
+    
+    def _预热界面(self):
+        """定时器回调：停在主菜单且一段时间没有输入时创建一个尚未创建的界面"""
+        if not self.界面.待创建():
+            return
+        空闲 = (self.空闲预热 and not self.过渡中 and self.当前界面名称 == "主菜单"
+              and self.获取时间() - self._最后输入时间 >= 预热延迟)
+        if 空闲:
+            self.界面.预热一个()
+        self.添加定时器(预热间隔 if 空闲 else 预热延迟, self._预热界面)
     
     def 切换界面(self, 界面名称, 使用过渡=True):
         """切换到指定的界面
@@ -93,9 +135,14 @@ class GUI:
             界面名称: 要切换到的界面名称
             使用过渡: 是否使用过渡效果
         """
-        if 界面名称 not in self.界面:
-            print(f"错误：界面 '{界面名称}' 不存在")
+        目标界面 = self.界面.获取(界面名称)
+        if 目标界面 is None:
             return
+        界面名称 = self.界面.规范名称(界面名称)
+        
+        if 使用过渡:
+            # 停用前捕获当前画面，淡出期间只合成这张快照
+            self._捕获过渡快照()
         
         # 如果当前有界面，停用它
         if self.当前界面:
@@ -104,14 +151,16 @@ class GUI:
         if 使用过渡:
             # 使用过渡效果
             def 过渡完成回调():
-                self.当前界面 = self.界面[界面名称]
+                self.当前界面 = 目标界面
+                self.当前界面名称 = 界面名称
                 self.当前界面.激活()
                 self.开始过渡('fade_in')
             
             self.开始过渡('fade_out', 过渡完成回调)
         else:
             # 不使用过渡效果，直接切换
-            self.当前界面 = self.界面[界面名称]
+            self.当前界面 = 目标界面
+            self.当前界面名称 = 界面名称
             self.当前界面.激活()
     
     def 开始过渡(self, 类型, 完成回调=None):
@@ -160,16 +209,17 @@ class GUI:
             # 淡入效果 - 从黑色到透明
             透明度 = int(255 * (1 - 进度))
         
-        # 创建一个覆盖整个屏幕的黑色半透明表面
-        覆盖表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-        覆盖表面.set_alpha(透明度)
-        覆盖表面.fill((0, 0, 0))
+        # 黑色覆盖表面只创建一次，每帧只改透明度
+        if self._过渡覆盖表面 is None or self._过渡覆盖表面.get_size() != 屏幕.get_size():
+            self._过渡覆盖表面 = pygame.Surface(屏幕.get_size())
+            self._过渡覆盖表面.fill((0, 0, 0))
+        self._过渡覆盖表面.set_alpha(透明度)
         
         # 将覆盖表面绘制到屏幕上
-        屏幕.blit(覆盖表面, (0, 0))
+        屏幕.blit(self._过渡覆盖表面, (0, 0))
         
-        # 记录脏矩形
-        self.脏矩形列表.append(pygame.Rect(0, 0, self.屏幕宽度, self.屏幕高度))
+        # 整个屏幕都被覆盖
+        self._记录覆盖层(屏幕.get_rect())
     
     def 添加粒子(self, x, y, 颜色, 大小, 寿命, 速度x, 速度y):
         """添加一个粒子到粒子系统
@@ -184,16 +234,7 @@ class GUI:
         if not self.粒子效果启用:
             return
         
-        self.粒子列表.append({
-            'x': x,
-            'y': y,
-            '颜色': 颜色,
-            '大小': 大小,
-            '寿命': 寿命,
-            '剩余寿命': 寿命,
-            '速度x': 速度x,
-            '速度y': 速度y
-        })
+        self.粒子系统.发射(x, y, 颜色, 大小, 寿命, 速度x, 速度y)
     
     def 更新粒子(self, 时间增量):
         """更新所有粒子
@@ -201,25 +242,10 @@ class GUI:
         参数:
             时间增量: 上一帧到当前帧的时间间隔（毫秒）
         """
-        if not self.粒子效果启用 or not self.粒子列表:
+        if not self.粒子效果启用:
             return
         
-        已移除 = []
-        for i, 粒子 in enumerate(self.粒子列表):
-            # 更新粒子位置
-            粒子['x'] += 粒子['速度x'] * 时间增量 / 1000
-            粒子['y'] += 粒子['速度y'] * 时间增量 / 1000
-            
-            # 更新粒子生命
-            粒子['剩余寿命'] -= 时间增量
-            
-            # 如果粒子寿命已尽，标记为移除
-            if 粒子['剩余寿命'] <= 0:
-                已移除.append(i)
-        
-        # 从后向前移除粒子，以避免索引错误
-        for i in reversed(已移除):
-            del self.粒子列表[i]
+        self.粒子系统.更新(时间增量)
     
     def 绘制粒子(self, 屏幕):
         """绘制所有粒子
@@ -227,28 +253,13 @@ class GUI:
         参数:
             屏幕: Pygame屏幕对象
         """
-        if not self.粒子效果启用 or not self.粒子列表:
+        if not self.粒子效果启用:
             return
         
-        for 粒子 in self.粒子列表:
-            # 计算粒子透明度
-            透明度 = int(255 * (粒子['剩余寿命'] / 粒子['寿命']))
-            颜色 = 粒子['颜色'] + (透明度,)
-            
-            # 绘制粒子
-            位置 = (int(粒子['x']), int(粒子['y']))
-            大小 = 粒子['大小']
-            
-            # 创建一个粒子表面
-            粒子表面 = pygame.Surface((大小*2, 大小*2), pygame.SRCALPHA)
-            pygame.draw.circle(粒子表面, 颜色, (大小, 大小), 大小)
-            
-            # 将粒子表面绘制到屏幕上
-            屏幕.blit(粒子表面, (位置[0]-大小, 位置[1]-大小))
-            
-            # 记录脏矩形
-            粒子矩形 = pygame.Rect(位置[0]-大小, 位置[1]-大小, 大小*2, 大小*2)
-            self.脏矩形列表.append(粒子矩形)
+        # 记录包含所有粒子的区域
+        粒子矩形 = self.粒子系统.绘制(屏幕)
+        if 粒子矩形:
+            self._记录覆盖层(粒子矩形)
     
     def 显示消息(self, 文本, 持续时间=None):
         """显示一条消息
@@ -262,8 +273,7 @@ class GUI:
         
         self.消息列表.append({
             '文本': 文本,
-            '剩余时间': 持续时间,
-            '字体': pygame.font.Font(None, 24)
+            '剩余时间': 持续时间
         })
     
     def 更新消息(self, 时间增量):
@@ -302,8 +312,11 @@ class GUI:
                 continue
             
             # 渲染消息文本
-            文本渲染 = 消息['字体'].render(消息['文本'], True, (255, 255, 255))
-            文本渲染.set_alpha(透明度)
+            文本渲染 = 渲染文本(消息['文本'], (255, 255, 255), 24)
+            if 透明度 < 255:
+                # 缓存中的表面是共享的，淡出时在副本上设置透明度
+                文本渲染 = 文本渲染.copy()
+                文本渲染.set_alpha(透明度)
             
             # 计算消息位置
             x位置 = (self.屏幕宽度 - 文本渲染.get_width()) // 2
@@ -318,21 +331,60 @@ class GUI:
             # 绘制消息文本
             屏幕.blit(文本渲染, (x位置, y位置))
             
-            # 记录脏矩形
-            self.脏矩形列表.append(背景矩形)
+            # 记录消息区域
+            self._记录覆盖层(背景矩形)
             
             y位置 += 文本渲染.get_height() + 15
     
-    def 清屏(self):
-        """清空屏幕并绘制背景"""
-        # 清空主缓冲区
+    def 标记脏(self, 矩形=None):
+        """报告一块需要重绘的区域
+        
+        参数:
+            矩形: 变化的区域，None表示整个屏幕
+        """
+        self.损伤.添加(矩形)
+        # 界面内容变了，过渡快照需要重新捕获
+        self._过渡快照有效 = False
+    
+    def _记录覆盖层(self, 矩形):
+        """记录本帧覆盖层绘制的区域，本帧提交它，下一帧擦除它"""
+        矩形 = pygame.Rect(矩形)
+        self._覆盖层矩形.append(矩形)
+        self.损伤.添加(矩形)
+    
+    def 清屏(self, 矩形=None):
+        """在主缓冲区中恢复背景
+        
+        参数:
+            矩形: 只恢复这块区域，None表示整个屏幕
+        """
+        if 矩形 is None:
+            矩形 = self.主缓冲区.get_rect()
         if self.背景图片:
-            self.主缓冲区.blit(self.背景图片, (0, 0))
+            self.主缓冲区.blit(self.背景图片, 矩形, 矩形)
         else:
-            self.主缓冲区.fill((30, 30, 50))
+            self.主缓冲区.fill((30, 30, 50), 矩形)
+    
+    def 重绘区域(self, 矩形列表):
+        """在主缓冲区中恢复背景并重绘界面，绘制被裁剪在给定区域内
         
-        # 整个屏幕需要更新
-        self.脏矩形列表.append(pygame.Rect(0, 0, self.屏幕宽度, self.屏幕高度))
+        参数:
+            矩形列表: 需要重绘的区域
+        """
+        for 矩形 in 矩形列表:
+            self.主缓冲区.set_clip(矩形)
+            self.清屏(矩形)
+            if self.当前界面:
+                self.当前界面.绘制(self.主缓冲区)
+        self.主缓冲区.set_clip(None)
+    
+    def _捕获过渡快照(self):
+        """完整重绘一次当前界面，并保存为过渡期间使用的快照"""
+        self.重绘区域([self.主缓冲区.get_rect()])
+        if self._过渡快照 is None or self._过渡快照.get_size() != self.主缓冲区.get_size():
+            self._过渡快照 = pygame.Surface(self.主缓冲区.get_size())
+        self._过渡快照.blit(self.主缓冲区, (0, 0))
+        self._过渡快照有效 = True
     
     def 创建按钮(self, x, y, 宽度, 高度, 文本, 点击回调=None):
         """创建一个按钮
@@ -418,8 +470,7 @@ class GUI:
             颜色: 文本颜色
             对齐: 对齐方式 ("左", "中", "右")
         """
-        字体 = pygame.font.Font(None, 字体大小)
-        文本渲染 = 字体.render(文本, True, 颜色)
+        文本渲染 = 渲染文本(文本, 颜色, 字体大小)
         
         if 对齐 == "中":
             x = x - 文本渲染.get_width() // 2
@@ -428,32 +479,100 @@ class GUI:
         
         屏幕.blit(文本渲染, (x, y))
         
-        # 记录脏矩形
-        文本矩形 = pygame.Rect(x, y, 文本渲染.get_width(), 文本渲染.get_height())
-        self.脏矩形列表.append(文本矩形)
+        return pygame.Rect(x, y, 文本渲染.get_width(), 文本渲染.get_height())
     
     def 进入全屏(self):
         """切换到全屏模式"""
         self.屏幕 = pygame.display.set_mode(self.原始屏幕尺寸, pygame.FULLSCREEN)
+        self.标记脏()
     
     def 退出全屏(self):
         """退出全屏模式"""
         self.屏幕 = pygame.display.set_mode(self.原始屏幕尺寸)
+        self.标记脏()
+    
+    def 启用性能分析(self, CSV路径=None, 容量=600):
+        """开始按阶段记录每帧耗时，并在屏幕左上角显示帧耗时分位数（F3切换显示）
+        
+        参数:
+            CSV路径: 主循环退出时导出CSV的路径，None表示不导出
+            容量: 保留最近多少帧的记录
+        
+        返回:
+            帧分析器实例
+        """
+        # 使用界面的时钟，替换成确定性时钟后叠加层的刷新也随之确定
+        self.分析器 = 帧分析器(容量, CSV路径, lambda: self.获取时间())
+        return self.分析器
+    
+    def 添加定时器(self, 延迟, 回调):
+        """在一段时间后调用回调，空闲等待会在到期时醒来
+        
+        参数:
+            延迟: 延迟时间（毫秒）
+            回调: 到期时调用的函数
+        """
+        到期时间 = self.获取时间() + 延迟
+        heapq.heappush(self._定时器, (到期时间, next(self._定时器序号), 回调))
+    
+    def 更新定时器(self):
+        """调用所有已到期的定时器回调"""
+        当前时间 = self.获取时间()
+        while self._定时器 and self._定时器[0][0] <= 当前时间:
+            _, _, 回调 = heapq.heappop(self._定时器)
+            回调()
+    
+    def 需要动画(self):
+        """是否有过渡、粒子、消息或未绘制的变化需要继续逐帧刷新"""
+        return (self.过渡中
+                or bool(self.消息列表)
+                or (self.粒子效果启用 and self.粒子系统.数量 > 0)
+                or self.损伤.有损伤()
+                or bool(self._覆盖层矩形))
+    
+    def 等待事件(self):
+        """空闲时阻塞，直到有输入事件或下一个定时器到期
+        
+        返回:
+            list: 等到的事件列表（定时器到期时可能为空）
+        """
+        self.空闲等待次数 += 1
+        if self._定时器:
+            超时 = self._定时器[0][0] - self.获取时间()
+            if 超时 <= 0:
+                # 定时器已经到期：不阻塞（pygame 2中wait(0)会一直等到有事件）
+                return pygame.event.get()
+            事件 = pygame.event.wait(超时)
+        else:
+            事件 = pygame.event.wait()
+        if 事件.type == pygame.NOEVENT:
+            return []
+        return [事件] + pygame.event.get()
     
-    def 处理事件(self):
+    def 处理事件(self, 事件列表=None):
         """处理所有Pygame事件
         
+        参数:
+            事件列表: 要处理的事件，None表示从事件队列中取出
+        
         返回:
             布尔值，False表示应该退出游戏
         """
-        for 事件 in pygame.event.get():
+        if 事件列表 is None:
+            事件列表 = pygame.event.get()
+        for 事件 in 事件列表:
             if 事件.type == pygame.QUIT:
                 return False
             
+            if 事件.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                self._最后输入时间 = self.获取时间()
+            
             # 处理按键事件
             if 事件.type == pygame.KEYDOWN:
                 if 事件.key == pygame.K_ESCAPE:
                     return False
+                if 事件.key == pygame.K_F3 and self.分析器:
+                    self.分析器.显示叠加层 = not self.分析器.显示叠加层
             
             # 将事件传递给当前界面
             if self.当前界面:
@@ -467,6 +586,9 @@ class GUI:
         参数:
             时间增量: 上一帧到当前帧的时间间隔（毫秒）
         """
+        # 调用到期的定时器
+        self.更新定时器()
+        
         # 更新当前界面
         if self.当前界面:
             self.当前界面.更新(时间增量)
@@ -481,63 +603,93 @@ class GUI:
         self.更新消息(时间增量)
     
     def 绘制(self):
-        """绘制GUI到屏幕"""
-        # 清屏并绘制背景
-        self.清屏()
+        """绘制GUI到屏幕
         
-        # 绘制当前界面
-        if self.当前界面:
-            self.当前界面.绘制(self.主缓冲区)
+        只有本帧变化的区域会恢复背景、重绘并提交到显示器，
+        画面静止时不提交任何像素。
+        """
+        # 擦除上一帧的覆盖层
+        for 矩形 in self._覆盖层矩形:
+            self.损伤.添加(矩形)
+        self._覆盖层矩形 = []
         
-        # 绘制粒子
-        self.绘制粒子(self.主缓冲区)
+        # 在损伤区域内恢复背景并重绘界面；过渡期间直接从快照恢复
+        损伤矩形 = self.损伤.合并()
+        if not self.过渡中:
+            self.重绘区域(损伤矩形)
+        elif not self._过渡快照有效:
+            self._捕获过渡快照()
+        else:
+            for 矩形 in 损伤矩形:
+                self.主缓冲区.blit(self._过渡快照, 矩形, 矩形)
         
-        # 绘制消息
+        # 覆盖层直接画在重绘好的画面上，并把所占区域加入损伤
+        self.绘制粒子(self.主缓冲区)
         self.绘制消息(self.主缓冲区)
-        
-        # 绘制过渡效果
         self.绘制过渡(self.主缓冲区)
         
-        # 将主缓冲区内容复制到屏幕上
-        # 使用脏矩形更新而不是全屏更新
-        if self.脏矩形列表:
-            # 将主缓冲区的内容按照脏矩形列表更新到屏幕上
-            for 矩形 in self.脏矩形列表:
+        分析器 = self.分析器
+        if 分析器:
+            叠加层矩形 = 分析器.绘制叠加层(self.主缓冲区)
+            if 叠加层矩形:
+                self._记录覆盖层(叠加层矩形)
+            分析器.记录("绘制")
+        
+        # 只把合并后的区域提交到显示器
+        矩形列表 = self.损伤.结束帧()
+        if 矩形列表:
+            for 矩形 in 矩形列表:
                 self.屏幕.blit(self.主缓冲区, 矩形, 矩形)
-            
-            # 更新显示
-            pygame.display.update(self.脏矩形列表)
-            
-            # 清空脏矩形列表
-            self.脏矩形列表.clear()
-        else:
-            # 如果没有脏矩形，则更新整个屏幕
-            self.屏幕.blit(self.主缓冲区, (0, 0))
-            pygame.display.flip()
+            pygame.display.update(矩形列表)
+        
+        if 分析器:
+            分析器.记录("提交")
     
     def 运行(self):
-        """运行GUI主循环"""
+        """运行GUI主循环
+        
+        有动画时按60帧刷新；画面静止且开启空闲模式时阻塞等待输入或定时器，
+        不占用CPU。
+        """
         self.运行中 = True
-        最后时间 = pygame.time.get_ticks()
+        最后时间 = self.获取时间()
         
         while self.运行中:
+            if self.空闲模式 and not self.需要动画():
+                # 阻塞等待，醒来后不把等待的时间计入动画
+                事件列表 = self.等待事件()
+                最后时间 = self.获取时间()
+            else:
+                # 限制帧率
+                self.时钟.tick(60)
+                事件列表 = None
+            
             # 计算时间增量
-            当前时间 = pygame.time.get_ticks()
+            当前时间 = self.获取时间()
             时间增量 = 当前时间 - 最后时间
             最后时间 = 当前时间
             
-            # 限制帧率
-            self.时钟.tick(60)
+            分析器 = self.分析器
+            if 分析器:
+                分析器.开始帧(type(self.当前界面).__name__ if self.当前界面 else "")
             
             # 处理事件
-            self.运行中 = self.处理事件()
+            if not self.处理事件(事件列表):
+                self.运行中 = False
+            if 分析器:
+                分析器.记录("处理事件")
             
             # 更新GUI
             self.更新(时间增量)
+            if 分析器:
+                分析器.记录("更新")
             
             # 绘制GUI
             self.绘制()
         
+        if self.分析器:
+            self.分析器.导出CSV()
+        
         # 清理并退出
         pygame.quit()
     
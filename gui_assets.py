@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+图片资源管理
+每个图片文件只解码一次，并转换成显示格式保存；按目标尺寸缓存缩放后的版本，
+按区域缓存子表面视图。多个界面共用同一张背景时不再重复解码和缩放。
+"""
+
+import os
+
+import pygame
+
+
+class 资源管理器:
+    """解码一次、按尺寸缓存的图片资源管理器
+
+    返回的表面由所有调用方共享，不能在上面绘制；需要修改时先复制。
+    """
+
+    def __init__(self):
+        # (绝对路径, 透明) -> 原始尺寸的表面
+        self._原图 = {}
+        # (绝对路径, 透明, 尺寸, 平滑) -> 缩放后的表面
+        self._缩放 = {}
+        # (绝对路径, 透明, 尺寸, 区域) -> 子表面
+        self._区域 = {}
+        # 绝对路径 -> 加载失败时的异常，避免每次都重新尝试
+        self._失败 = {}
+        # 窗口创建前加载、还没有转换成显示格式的原图键
+        self._未转换 = set()
+        self.解码次数 = 0
+        self.缩放次数 = 0
+
+    def _转换(self, 键, 表面):
+        """转换成显示格式；还没有创建窗口时保持原样，之后再补做"""
+        if pygame.display.get_surface() is None:
+            self._未转换.add(键)
+            return 表面
+        self._未转换.discard(键)
+        return 表面.convert_alpha() if 键[1] else 表面.convert()
+
+    def _补做转换(self):
+        """窗口创建后，把之前加载的原图转换成显示格式，由它们派生的缓存作废"""
+        if not self._未转换 or pygame.display.get_surface() is None:
+            return
+        for 键 in list(self._未转换):
+            self._原图[键] = self._转换(键, self._原图[键])
+            for 缓存 in (self._缩放, self._区域):
+                for 旧键 in [k for k in 缓存 if k[:2] == 键]:
+                    del 缓存[旧键]
+
+    def 加载(self, 路径, 透明=False):
+        """加载图片，同一文件只解码一次
+
+        参数:
+            路径(str): 图片路径
+            透明(bool): 是否保留透明通道（convert_alpha），否则使用convert
+
+        返回:
+            pygame.Surface: 原始尺寸的图片
+
+        异常:
+            FileNotFoundError或pygame.error: 图片不存在或无法解码，之后的调用直接抛出同一异常
+        """
+        self._补做转换()
+        绝对路径 = os.path.abspath(路径)
+        键 = (绝对路径, 透明)
+        表面 = self._原图.get(键)
+        if 表面 is not None:
+            return 表面
+
+        if 绝对路径 in self._失败:
+            raise self._失败[绝对路径]
+
+        # 同一文件的另一种透明模式已经解码过时直接转换，不再读文件
+        另一种 = self._原图.get((绝对路径, not 透明))
+        if 另一种 is not None:
+            表面 = self._转换(键, 另一种)
+        else:
+            try:
+                表面 = pygame.image.load(绝对路径)
+            except (FileNotFoundError, pygame.error) as e:
+                self._失败[绝对路径] = e
+                raise
+            self.解码次数 += 1
+            表面 = self._转换(键, 表面)
+        self._原图[键] = 表面
+        return 表面
+
+    def 缩放(self, 路径, 尺寸, 透明=False, 平滑=False):
+        """获取缩放到指定尺寸的图片，每个尺寸只缩放一次
+
+        参数:
+            路径(str): 图片路径
+            尺寸(tuple): 目标 (宽, 高)
+            透明(bool): 是否保留透明通道
+            平滑(bool): 是否使用smoothscale
+
+        返回:
+            pygame.Surface: 缩放后的图片
+        """
+        self._补做转换()
+        尺寸 = (int(尺寸[0]), int(尺寸[1]))
+        键 = (os.path.abspath(路径), 透明, 尺寸, 平滑)
+        表面 = self._缩放.get(键)
+        if 表面 is None:
+            原图 = self.加载(路径, 透明)
+            if 原图.get_size() == 尺寸:
+                表面 = 原图
+            else:
+                缩放函数 = pygame.transform.smoothscale if 平滑 else pygame.transform.scale
+                表面 = 缩放函数(原图, 尺寸)
+                self.缩放次数 += 1
+            self._缩放[键] = 表面
+        return 表面
+
+    def 区域(self, 路径, 矩形, 尺寸=None, 透明=False):
+        """获取图片某个区域的子表面视图，与整图共享像素，不复制内存
+
+        参数:
+            路径(str): 图片路径
+            矩形: 区域，坐标相对于（缩放后的）图片
+            尺寸(tuple): 先缩放到这个尺寸再取区域，None表示原始尺寸
+            透明(bool): 是否保留透明通道
+
+        返回:
+            pygame.Surface: 子表面
+        """
+        self._补做转换()
+        矩形 = pygame.Rect(矩形)
+        键 = (os.path.abspath(路径), 透明, None if 尺寸 is None else tuple(尺寸), tuple(矩形))
+        子表面 = self._区域.get(键)
+        if 子表面 is None:
+            整图 = self.加载(路径, 透明) if 尺寸 is None else self.缩放(路径, 尺寸, 透明)
+            子表面 = self._区域[键] = 整图.subsurface(矩形)
+        return 子表面
+
+    def 内存报告(self):
+        """统计每个资源占用的像素内存
+
+        返回:
+            list: 每个文件一项，包含路径、原始尺寸、缩放版本数、区域视图数和字节数，
+                  按字节数从大到小排列；子表面与整图共享像素，不计字节
+        """
+        报告 = {}
+
+        def 项(路径):
+            return 报告.setdefault(路径, {"路径": 路径, "原始尺寸": None, "缩放版本": 0, "区域视图": 0, "字节": 0})
+
+        已计表面 = set()
+
+        def 计入(记录, 表面):
+            if id(表面) not in 已计表面:
+                已计表面.add(id(表面))
+                记录["字节"] += 表面.get_width() * 表面.get_height() * 表面.get_bytesize()
+
+        for (路径, _), 表面 in self._原图.items():
+            记录 = 项(路径)
+            记录["原始尺寸"] = 表面.get_size()
+            计入(记录, 表面)
+        for (路径, _, _, _), 表面 in self._缩放.items():
+            记录 = 项(路径)
+            记录["缩放版本"] += 1
+            计入(记录, 表面)
+        for (路径, _, _, _) in self._区域:
+            项(路径)["区域视图"] += 1
+        return sorted(报告.values(), key=lambda r: r["字节"], reverse=True)
+
+    def 清空(self):
+        """释放所有缓存的图片"""
+        self._原图.clear()
+        self._缩放.clear()
+        self._区域.clear()
+        self._失败.clear()
+        self._未转换.clear()
+
+
+# 进程内共享的默认资源管理器
+默认资源管理器 = 资源管理器()
+
+
+def 加载图片(路径, 透明=False):
+    """使用默认资源管理器加载图片，参数见资源管理器.加载"""
+    return 默认资源管理器.加载(路径, 透明)
+
+
+def 缩放图片(路径, 尺寸, 透明=False, 平滑=False):
+    """使用默认资源管理器获取缩放后的图片，参数见资源管理器.缩放"""
+    return 默认资源管理器.缩放(路径, 尺寸, 透明, 平滑)
+
+
+def 图片区域(路径, 矩形, 尺寸=None, 透明=False):
+    """使用默认资源管理器获取图片区域，参数见资源管理器.区域"""
+    return 默认资源管理器.区域(路径, 矩形, 尺寸, 透明)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import pygame
+from gui_fonts import 渲染文本
 from gui_base import 界面基类
 
 class 角色属性界面(界面基类):
@@ -52,6 +53,7 @@ class 角色属性界面(界面基类):
                     "心情": 90
                 }
             }
+        self.请求重绘()
     
     def 返回主菜单(self):
         """返回主菜单"""
@@ -68,8 +70,7 @@ class 角色属性界面(界面基类):
             宽度: 属性条宽度
             高度: 属性条高度
         """
-        字体 = pygame.font.Font(None, 28)
-        名称文本 = 字体.render(f"{名称}: {值}", True, (255, 255, 255))
+        名称文本 = 渲染文本(f"{名称}: {值}", (255, 255, 255), 28)
         屏幕.blit(名称文本, (x, y))
         
         # 绘制属性条背景
@@ -93,22 +94,19 @@ class 角色属性界面(界面基类):
         屏幕高度 = 屏幕.get_height()
         
         # 绘制标题
-        标题字体 = pygame.font.Font(None, 48)
-        标题文本 = 标题字体.render("角色属性", True, (255, 255, 255))
+        标题文本 = 渲染文本("角色属性", (255, 255, 255), 48)
         标题位置 = ((屏幕宽度 - 标题文本.get_width()) // 2, 20)
         屏幕.blit(标题文本, 标题位置)
         
         if not self.属性数据:
             # 如果没有数据，显示提示
-            提示字体 = pygame.font.Font(None, 36)
-            提示文本 = 提示字体.render("无法获取角色属性数据", True, (200, 200, 200))
+            提示文本 = 渲染文本("无法获取角色属性数据", (200, 200, 200), 36)
             提示位置 = ((屏幕宽度 - 提示文本.get_width()) // 2, 屏幕高度 // 2)
             屏幕.blit(提示文本, 提示位置)
             return
         
         # 绘制基本信息
         基本信息 = self.属性数据.get("基本信息", {})
-        信息字体 = pygame.font.Font(None, 32)
         y位置 = 80
         
         # 创建信息卡片背景
@@ -119,16 +117,16 @@ class 角色属性界面(界面基类):
         年级 = 基本信息.get("年级", "未知")
         零花钱 = 基本信息.get("零花钱", 0)
         
-        姓名文本 = 信息字体.render(f"姓名: {姓名}", True, (255, 255, 255))
+        姓名文本 = 渲染文本(f"姓名: {姓名}", (255, 255, 255), 32)
         屏幕.blit(姓名文本, (100, y位置 + 20))
         
-        年龄文本 = 信息字体.render(f"年龄: {年龄}岁", True, (255, 255, 255))
+        年龄文本 = 渲染文本(f"年龄: {年龄}岁", (255, 255, 255), 32)
         屏幕.blit(年龄文本, (100, y位置 + 60))
         
-        年级文本 = 信息字体.render(f"年级: {年级}", True, (255, 255, 255))
+        年级文本 = 渲染文本(f"年级: {年级}", (255, 255, 255), 32)
         屏幕.blit(年级文本, (屏幕宽度 // 2, y位置 + 20))
         
-        零花钱文本 = 信息字体.render(f"零花钱: {零花钱}元", True, (255, 255, 255))
+        零花钱文本 = 渲染文本(f"零花钱: {零花钱}元", (255, 255, 255), 32)
         屏幕.blit(零花钱文本, (屏幕宽度 // 2, y位置 + 60))
         
         # 绘制属性条
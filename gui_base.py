@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import pygame
+from gui_fonts import 获取字体, 渲染文本
 
 class 界面基类:
     """界面基类，所有界面类的父类"""
@@ -24,6 +25,7 @@ class 界面基类:
         """激活此界面"""
         self.活跃 = True
         self.更新组件状态()
+        self.请求重绘()
     
     def 停用(self):
         """停用此界面"""
@@ -43,10 +45,27 @@ class 界面基类:
         """
         self.组件列表.append(组件)
         组件.活跃 = self.活跃
+        组件.损伤回调 = self.请求重绘
+        self.请求重绘(组件.矩形)
     
     def 清空组件(self):
         """清空所有界面组件"""
         self.组件列表.clear()
+        self.请求重绘()
+    
+    def 请求重绘(self, 矩形=None):
+        """报告界面上一块区域的内容发生了变化
+        
+        只有活跃界面的变化会显示出来，停用的界面忽略此调用。
+        
+        参数:
+            矩形: 变化的区域，None表示整个界面
+        """
+        if not self.活跃:
+            return
+        标记脏 = getattr(self.gui, "标记脏", None)
+        if 标记脏:
+            标记脏(矩形)
     
     def 处理事件(self, 事件):
         """处理Pygame事件
@@ -111,6 +130,13 @@ class 界面组件基类:
         self.活跃 = True
         self.悬停 = False
         self.点击 = False
+        # 由所属界面设置，组件外观变化时用它报告需要重绘的区域
+        self.损伤回调 = None
+    
+    def 请求重绘(self):
+        """报告组件外观发生了变化"""
+        if self.损伤回调:
+            self.损伤回调(self.矩形)
     
     def 处理事件(self, 事件):
         """处理Pygame事件
@@ -130,14 +156,17 @@ class 界面组件基类:
         
         # 处理鼠标进入和离开事件
         if not 之前悬停 and self.悬停:
+            self.请求重绘()
             self.当鼠标进入()
         elif 之前悬停 and not self.悬停:
+            self.请求重绘()
             self.当鼠标离开()
         
         # 处理鼠标按下事件
         if 事件.type == pygame.MOUSEBUTTONDOWN and 事件.button == 1:
             if self.悬停:
                 self.点击 = True
+                self.请求重绘()
                 self.当鼠标按下()
                 return True
         
@@ -145,6 +174,8 @@ class 界面组件基类:
         elif 事件.type == pygame.MOUSEBUTTONUP and 事件.button == 1:
             之前点击 = self.点击
             self.点击 = False
+            if 之前点击:
+                self.请求重绘()
             if 之前点击 and self.悬停:
                 self.当鼠标释放()
                 return True
@@ -199,8 +230,8 @@ class 按钮(界面组件基类):
         super().__init__(x, y, 宽度, 高度)
         self.文本 = 文本
         self.点击回调 = 点击回调
-        self.字体 = pygame.font.Font(None, 28)
-        self.文本渲染 = self.字体.render(文本, True, (255, 255, 255))
+        self.字体 = 获取字体(None, 28)
+        self.文本渲染 = 渲染文本(文本, (255, 255, 255), 28)
         self.文本位置 = (
             x + (宽度 - self.文本渲染.get_width()) // 2,
             y + (高度 - self.文本渲染.get_height()) // 2
@@ -252,8 +283,8 @@ class 标签(界面组件基类):
             字体大小: 字体大小
             颜色: 文本颜色
         """
-        self.字体 = pygame.font.Font(None, 字体大小)
-        self.文本渲染 = self.字体.render(文本, True, 颜色)
+        self.字体 = 获取字体(None, 字体大小)
+        self.文本渲染 = 渲染文本(文本, 颜色, 字体大小)
         super().__init__(x, y, self.文本渲染.get_width(), self.文本渲染.get_height())
         self.文本 = 文本
         self.颜色 = 颜色
@@ -313,6 +344,7 @@ class 滑块(界面组件基类):
         if 新值 != self.值:
             self.值 = 新值
             self.更新滑块位置()
+            self.请求重绘()
             if self.变化回调:
                 self.变化回调(int(self.值))
     
@@ -384,8 +416,8 @@ class 复选框(界面组件基类):
             选中: 是否选中
             变化回调: 状态变化时调用的函数
         """
-        self.字体 = pygame.font.Font(None, 28)
-        self.文本渲染 = self.字体.render(文本, True, (255, 255, 255))
+        self.字体 = 获取字体(None, 28)
+        self.文本渲染 = 渲染文本(文本, (255, 255, 255), 28)
         self.复选框大小 = 24
         宽度 = self.复选框大小 + 10 + self.文本渲染.get_width()
         高度 = max(self.复选框大小, self.文本渲染.get_height())
@@ -455,8 +487,8 @@ class 单选按钮(界面组件基类):
             选中: 是否选中
             变化回调: 状态变化时调用的函数
         """
-        self.字体 = pygame.font.Font(None, 28)
-        self.文本渲染 = self.字体.render(文本, True, (255, 255, 255))
+        self.字体 = 获取字体(None, 28)
+        self.文本渲染 = 渲染文本(文本, (255, 255, 255), 28)
         self.按钮大小 = 24
         宽度 = self.按钮大小 + 10 + self.文本渲染.get_width()
         高度 = max(self.按钮大小, self.文本渲染.get_height())
@@ -482,6 +514,7 @@ class 单选按钮(界面组件基类):
             if self.组名 in 单选按钮.组选中状态:
                 之前按钮 = 单选按钮.组选中状态[self.组名]
                 之前按钮.选中 = False
+                之前按钮.请求重绘()
             
             # 选中当前按钮
             self.选中 = True
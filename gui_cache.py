@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+预渲染表面的LRU缓存
+文本缓存和按钮精灵缓存共用的实现：按键缓存渲染结果，超过容量时淘汰最久未用的表面，
+并统计命中率。
+"""
+
+from collections import OrderedDict
+
+
+class 表面缓存:
+    """有容量上限的LRU表面缓存
+
+    返回的表面由缓存共享，调用方不能在上面绘制；需要改透明度等属性时先复制。
+    """
+
+    def __init__(self, 容量=512):
+        """初始化表面缓存
+
+        参数:
+            容量(int): 最多缓存的表面数量
+        """
+        self.容量 = 容量
+        self._缓存 = OrderedDict()
+        self.命中 = 0
+        self.未命中 = 0
+
+    def 查找(self, 键):
+        """查找键对应的表面并计入命中或未命中
+
+        参数:
+            键: 可哈希的外观描述
+
+        返回:
+            pygame.Surface: 缓存的表面，未命中时返回None
+        """
+        表面 = self._缓存.get(键)
+        if 表面 is None:
+            self.未命中 += 1
+            return None
+        self._缓存.move_to_end(键)
+        self.命中 += 1
+        return 表面
+
+    def 放入(self, 键, 表面):
+        """缓存一个表面，超过容量时淘汰最久未用的表面
+
+        参数:
+            键: 可哈希的外观描述
+            表面(pygame.Surface): 渲染结果
+
+        返回:
+            pygame.Surface: 放入的表面
+        """
+        self._缓存[键] = 表面
+        if len(self._缓存) > self.容量:
+            self._缓存.popitem(last=False)
+        return 表面
+
+    def 获取(self, 键, 渲染函数):
+        """获取键对应的表面，未命中时调用渲染函数生成并缓存
+
+        参数:
+            键: 可哈希的外观描述，包含影响绘制结果的全部参数
+            渲染函数: 无参数函数，返回pygame.Surface
+
+        返回:
+            pygame.Surface: 预渲染的表面
+        """
+        表面 = self.查找(键)
+        if 表面 is None:
+            表面 = self.放入(键, 渲染函数())
+        return 表面
+
+    def 清空(self):
+        """清空缓存和计数"""
+        self._缓存.clear()
+        self.命中 = 0
+        self.未命中 = 0
+
+    def 统计(self):
+        """返回缓存统计
+
+        返回:
+            dict: 条目数、容量、命中、未命中和命中率
+        """
+        总数 = self.命中 + self.未命中
+        return {
+            "条目数": len(self._缓存),
+            "容量": self.容量,
+            "命中": self.命中,
+            "未命中": self.未命中,
+            "命中率": self.命中 / 总数 if 总数 else 0.0,
+        }
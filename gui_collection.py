@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import pygame
+from gui_fonts import 渲染文本
 from gui_base import 界面基类
 
 class 收藏品界面(界面基类):
@@ -51,6 +52,7 @@ class 收藏品界面(界面基类):
                 "零食": ["大大泡泡糖", "旺旺雪饼", "五角星冰棍", "太空人糖"],
                 "科技": ["BP机", "随身听", "小灵通", "初代MP3"]
             }
+        self.请求重绘()
     
     def 返回主菜单(self):
         """返回主菜单"""
@@ -64,11 +66,13 @@ class 收藏品界面(界面基类):
         """
         self.当前类别 = 类别
         self.当前页码 = 0  # 重置页码
+        self.请求重绘()
     
     def 上一页(self):
         """显示上一页收藏品"""
         if self.当前页码 > 0:
             self.当前页码 -= 1
+            self.请求重绘()
     
     def 下一页(self):
         """显示下一页收藏品"""
@@ -76,6 +80,7 @@ class 收藏品界面(界面基类):
         最大页数 = (len(当前类别收藏品) - 1) // self.每页显示数量
         if self.当前页码 < 最大页数:
             self.当前页码 += 1
+            self.请求重绘()
     
     def 绘制(self, 屏幕):
         """绘制收藏品界面
@@ -90,8 +95,7 @@ class 收藏品界面(界面基类):
         屏幕高度 = 屏幕.get_height()
         
         # 绘制标题
-        标题字体 = pygame.font.Font(None, 48)
-        标题文本 = 标题字体.render(f"收藏品 - {self.当前类别}", True, (255, 255, 255))
+        标题文本 = 渲染文本(f"收藏品 - {self.当前类别}", (255, 255, 255), 48)
         标题位置 = ((屏幕宽度 - 标题文本.get_width()) // 2, 20)
         屏幕.blit(标题文本, 标题位置)
         
@@ -104,7 +108,6 @@ class 收藏品界面(界面基类):
         当前页收藏品 = 当前类别收藏品[开始索引:结束索引]
         
         # 绘制收藏品
-        收藏品字体 = pygame.font.Font(None, 32)
         收藏品区域起始y = 140
         收藏品项目高度 = 50
         
@@ -113,19 +116,17 @@ class 收藏品界面(界面基类):
             pygame.draw.rect(屏幕, (50, 50, 70), (50, 收藏品区域起始y + i * 收藏品项目高度, 屏幕宽度 - 100, 收藏品项目高度 - 5), 0, 5)
             
             # 绘制收藏品名称
-            收藏品文本 = 收藏品字体.render(收藏品名称, True, (255, 255, 255))
+            收藏品文本 = 渲染文本(收藏品名称, (255, 255, 255), 32)
             屏幕.blit(收藏品文本, (70, 收藏品区域起始y + i * 收藏品项目高度 + 15))
         
         # 显示页码信息
         总页数 = max(1, (len(当前类别收藏品) - 1) // self.每页显示数量 + 1)
-        页码字体 = pygame.font.Font(None, 24)
-        页码文本 = 页码字体.render(f"第 {self.当前页码 + 1}/{总页数} 页", True, (200, 200, 200))
+        页码文本 = 渲染文本(f"第 {self.当前页码 + 1}/{总页数} 页", (200, 200, 200), 24)
         屏幕.blit(页码文本, ((屏幕宽度 - 页码文本.get_width()) // 2, 屏幕高度 - 30))
         
         # 如果没有收藏品，显示提示信息
         if not 当前页收藏品:
-            提示字体 = pygame.font.Font(None, 36)
-            提示文本 = 提示字体.render("你还没有收集到任何此类别的收藏品。探索世界，收集童年珍贵物品吧！", True, (200, 200, 200))
+            提示文本 = 渲染文本("你还没有收集到任何此类别的收藏品。探索世界，收集童年珍贵物品吧！", (200, 200, 200), 36)
             提示位置 = ((屏幕宽度 - 提示文本.get_width()) // 2, 屏幕高度 // 2)
             屏幕.blit(提示文本, 提示位置)
         
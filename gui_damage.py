@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+损伤跟踪
+组件和覆盖层报告本帧真正变化的屏幕区域，跟踪器把重叠或相邻的矩形合并成
+少量互不相交的矩形，只有这些区域需要恢复背景、重绘并提交到显示器。
+同时统计每帧提交的像素数，便于在无窗口环境下检查渲染开销。
+"""
+
+from collections import deque
+
+import pygame
+
+
+class 损伤跟踪器:
+    """收集并合并每帧的脏矩形"""
+
+    def __init__(self, 宽度, 高度, 合并间距=8, 全屏比例=0.6, 最大矩形数=16, 历史帧数=600):
+        """初始化损伤跟踪器
+
+        参数:
+            宽度, 高度: 屏幕尺寸，所有矩形都会被裁剪到屏幕内
+            合并间距(int): 两个矩形间隔不超过此像素数时视为相邻并合并
+            全屏比例(float): 合并后面积超过屏幕的这个比例时直接按全屏处理
+            最大矩形数(int): 合并后矩形数超过此值时直接按全屏处理
+            历史帧数(int): 保留最近多少帧的像素统计
+        """
+        self.屏幕矩形 = pygame.Rect(0, 0, 宽度, 高度)
+        self.合并间距 = 合并间距
+        self.全屏比例 = 全屏比例
+        self.最大矩形数 = 最大矩形数
+        self._待处理 = []
+        self._全屏 = False
+
+        # 统计
+        self.帧数 = 0
+        self.总像素 = 0
+        self.上帧像素 = 0
+        self.每帧像素 = deque(maxlen=历史帧数)
+
+    def 调整尺寸(self, 宽度, 高度):
+        """屏幕尺寸变化后调用，并标记全屏损伤"""
+        self.屏幕矩形 = pygame.Rect(0, 0, 宽度, 高度)
+        self.添加全屏()
+
+    def 添加(self, 矩形):
+        """报告一块变化的区域
+
+        参数:
+            矩形: pygame.Rect或(x, y, 宽, 高)，None表示整个屏幕
+        """
+        if 矩形 is None:
+            self.添加全屏()
+            return
+        if self._全屏:
+            return
+        矩形 = self.屏幕矩形.clip(pygame.Rect(矩形))
+        if 矩形.width > 0 and 矩形.height > 0:
+            self._待处理.append(矩形)
+
+    def 添加全屏(self):
+        """报告整个屏幕都已变化"""
+        self._全屏 = True
+        self._待处理.clear()
+
+    def 有损伤(self):
+        """本帧是否有需要重绘的区域"""
+        return self._全屏 or bool(self._待处理)
+
+    def 合并(self):
+        """返回当前累计损伤合并后的矩形列表，不清空累计状态
+
+        返回:
+            list: 互不相交且互不相邻的矩形
+        """
+        if self._全屏:
+            return [self.屏幕矩形.copy()]
+        if not self._待处理:
+            return []
+
+        结果 = []
+        for 矩形 in sorted(self._待处理, key=lambda r: (r.y, r.x)):
+            矩形 = 矩形.copy()
+            # 合并后的矩形可能又与之前已合并的矩形相交，重复直到稳定
+            while True:
+                扩展 = 矩形.inflate(self.合并间距 * 2, self.合并间距 * 2)
+                序号 = 扩展.collidelist(结果)
+                if 序号 < 0:
+                    break
+                矩形.union_ip(结果.pop(序号))
+            结果.append(矩形)
+
+        面积 = sum(r.width * r.height for r in 结果)
+        if (len(结果) > self.最大矩形数
+                or 面积 >= self.屏幕矩形.width * self.屏幕矩形.height * self.全屏比例):
+            self.添加全屏()
+            return [self.屏幕矩形.copy()]
+        self._待处理 = [r.copy() for r in 结果]
+        return 结果
+
+    def 结束帧(self):
+        """合并本帧损伤、记录统计并清空累计状态
+
+        返回:
+            list: 需要提交到显示器的矩形
+        """
+        矩形列表 = self.合并()
+        像素 = sum(r.width * r.height for r in 矩形列表)
+        self.帧数 += 1
+        self.总像素 += 像素
+        self.上帧像素 = 像素
+        self.每帧像素.append(像素)
+        self._待处理.clear()
+        self._全屏 = False
+        return 矩形列表
+
+    def 统计(self):
+        """返回像素统计
+
+        返回:
+            dict: 帧数、总像素、上帧像素、平均每帧像素和最近帧中的空帧比例
+        """
+        最近 = self.每帧像素
+        return {
+            "帧数": self.帧数,
+            "总像素": self.总像素,
+            "上帧像素": self.上帧像素,
+            "平均每帧像素": self.总像素 / self.帧数 if self.帧数 else 0.0,
+            "空帧比例": sum(1 for p in 最近 if p == 0) / len(最近) if 最近 else 0.0,
+        }
+
+    def 重置统计(self):
+        """清空像素统计"""
+        self.帧数 = 0
+        self.总像素 = 0
+        self.上帧像素 = 0
+        self.每帧像素.clear()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+字体解析、字体注册表和文本表面缓存
+字体名到字体文件的解析结果保存在缓存文件中，之后运行时直接按路径加载，
+不再枚举系统字体；找不到指定字体时退回到能显示中文的字体。
+同一字体在进程内只加载一次，渲染过的文本按 (文本, 字体, 颜色, 抗锯齿) 缓存，
+文本不变的帧不需要再加载字体或光栅化字形。
+"""
+
+import json
+import os
+import sys
+
+import pygame
+
+from gui_cache import 表面缓存
+
+# 能显示中文的系统字体名（pygame简化后的形式），按优先顺序尝试
+中文字体候选 = (
+    "simhei", "microsoftyahei", "notosanscjksc", "notosanssc", "sourcehansanssc",
+    "wenquanyizenhei", "wenquanyimicrohei", "pingfangsc", "heitisc", "stheiti",
+    "arialunicodems", "droidsansfallback",
+)
+
+# 系统字体列表中查不到时（例如没有fc-list），直接在字体目录里找这些文件
+中文字体文件 = (
+    "simhei.ttf", "msyh.ttc", "msyh.ttf", "notosanscjk-regular.ttc", "notosanscjksc-regular.otf",
+    "notosanssc-regular.otf", "sourcehansanssc-regular.otf", "wqy-zenhei.ttc", "wqy-microhei.ttc",
+    "pingfang.ttc", "stheiti medium.ttc", "arial unicode.ttf", "droidsansfallbackfull.ttf",
+)
+
+# 解析结果的缓存文件
+字体缓存路径 = os.path.join("data", "font_cache.json")
+字体缓存版本 = 1
+
+# 界面用到的 (字体名, 字号, 粗体)，创建窗口时预加载，避免首帧卡顿
+界面字体规格 = (
+    ("simhei", 42, True), ("simhei", 48, False), ("simhei", 24, False),
+    ("simhei", 18, False), ("simhei", 16, False),
+) + tuple((None, 字号, False) for 字号 in (16, 20, 24, 28, 32, 36, 48))
+
+# (字体名, 字号, 粗体) -> pygame字体
+_字体注册表 = {}
+字体加载次数 = 0
+
+
+def _系统字体目录():
+    """返回当前平台的字体目录"""
+    if sys.platform == "win32":
+        目录列表 = [os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts")]
+        if os.environ.get("LOCALAPPDATA"):
+            目录列表.append(os.path.join(os.environ["LOCALAPPDATA"], "Microsoft", "Windows", "Fonts"))
+        return 目录列表
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts",
+            os.path.expanduser("~/.fonts"), os.path.expanduser("~/.local/share/fonts")]
+
+
+class 字体解析器:
+    """把字体名解析为字体文件路径，结果保存在缓存文件中供之后运行使用
+
+    缓存记录了字体目录的修改时间，安装或删除字体后整个缓存作废重新解析；
+    缓存中的文件不存在时单独重新解析该项。没找到字体的结果不写入缓存：
+    字体可能装在子目录里，不会改变字体目录本身的修改时间。
+    """
+
+    def __init__(self, 缓存路径=字体缓存路径, 字体目录=None):
+        """初始化字体解析器
+
+        参数:
+            缓存路径(str): 缓存文件路径，None表示不读写缓存文件
+            字体目录(list): 直接查找中文字体文件的目录，None表示当前平台的系统字体目录
+        """
+        self.缓存路径 = 缓存路径
+        self.字体目录 = 字体目录 if 字体目录 is not None else _系统字体目录()
+        # "字体名|粗体" -> [字体文件路径或None, 是否需要模拟粗体]
+        self._路径表 = None
+        self._指纹 = None
+        self._已提示缺少中文字体 = False
+        self._扫描结果 = False
+        self.查找次数 = 0
+
+    def _目录指纹(self):
+        """字体目录的修改时间，用于判断缓存是否过期"""
+        指纹 = []
+        for 目录 in self.字体目录:
+            try:
+                指纹.append([目录, os.stat(目录).st_mtime_ns])
+            except OSError:
+                指纹.append([目录, None])
+        return 指纹
+
+    def _读取缓存(self):
+        """读取缓存文件，文件缺失、损坏或过期时返回空表"""
+        if self.缓存路径:
+            try:
+                with open(self.缓存路径, "r", encoding="utf-8") as f:
+                    缓存 = json.load(f)
+                if (缓存.get("版本") == 字体缓存版本 and 缓存.get("指纹") == self._指纹
+                        and isinstance(缓存.get("字体"), dict)):
+                    return 缓存["字体"]
+            except (OSError, ValueError, AttributeError):
+                pass
+        return {}
+
+    def _写入缓存(self):
+        """写入缓存文件；缓存只是加速，写入失败时只打印提示"""
+        if not self.缓存路径:
+            return
+        try:
+            目录 = os.path.dirname(self.缓存路径)
+            if 目录:
+                os.makedirs(目录, exist_ok=True)
+            with open(self.缓存路径, "w", encoding="utf-8") as f:
+                找到的 = {键: 项 for 键, 项 in self._路径表.items() if 项[0] is not None}
+                json.dump({"版本": 字体缓存版本, "指纹": self._指纹, "字体": 找到的},
+                          f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"写入字体缓存失败: {e}")
+
+    def 解析(self, 字体名=None, 粗体=False):
+        """解析字体文件路径
+
+        参数:
+            字体名(str): 系统字体名，None表示默认字体（优先使用中文字体）
+            粗体(bool): 是否粗体
+
+        返回:
+            tuple: (字体文件路径, 是否需要模拟粗体)，找不到合适字体时路径为None，
+                   由调用方使用pygame默认字体
+        """
+        if self._路径表 is None:
+            self._指纹 = self._目录指纹()
+            self._路径表 = self._读取缓存()
+
+        键 = f"{字体名 or ''}|{int(粗体)}"
+        项 = self._路径表.get(键)
+        if 项 is None or (项[0] is not None and not os.path.exists(项[0])):
+            项 = list(self._查找(字体名, 粗体))
+            self._路径表[键] = 项
+            if 项[0] is not None:
+                self._写入缓存()
+
+        if 项[0] is None and self._需要中文(字体名) and not self._已提示缺少中文字体:
+            self._已提示缺少中文字体 = True
+            print("未找到中文字体，中文文字将无法正常显示；可以安装黑体、微软雅黑或思源黑体")
+        return 项[0], 项[1]
+
+    @staticmethod
+    def _需要中文(字体名):
+        return 字体名 is None or 字体名.lower().replace(" ", "") in 中文字体候选
+
+    def _查找(self, 字体名, 粗体):
+        """枚举系统字体查找字体文件，返回 (路径, 是否需要模拟粗体)"""
+        self.查找次数 += 1
+        名称列表 = [字体名] if 字体名 else []
+        if self._需要中文(字体名):
+            名称列表 += [名称 for 名称 in 中文字体候选 if 名称 not in 名称列表]
+        if not 名称列表:
+            return None, 粗体
+
+        try:
+            常规路径 = pygame.font.match_font(名称列表)
+            路径 = pygame.font.match_font(名称列表, bold=粗体) if 粗体 else 常规路径
+        except Exception:
+            常规路径 = 路径 = None
+        if 路径:
+            # 没有单独的粗体文件时match_font返回常规字体，需要模拟粗体
+            return 路径, 粗体 and 路径 == 常规路径
+
+        if self._需要中文(字体名):
+            路径 = self._扫描字体目录()
+            if 路径:
+                return 路径, 粗体
+        return None, 粗体
+
+    def _扫描字体目录(self):
+        """在字体目录中按文件名查找中文字体，返回优先级最高的一个；每个进程只扫描一次"""
+        if self._扫描结果 is not False:
+            return self._扫描结果
+        找到 = {}
+        for 目录 in self.字体目录:
+            for 根目录, _, 文件列表 in os.walk(目录):
+                for 文件 in 文件列表:
+                    小写 = 文件.lower()
+                    if 小写 in 中文字体文件 and 小写 not in 找到:
+                        找到[小写] = os.path.join(根目录, 文件)
+        self._扫描结果 = next((找到[文件] for 文件 in 中文字体文件 if 文件 in 找到), None)
+        return self._扫描结果
+
+
+# 进程内共享的默认字体解析器
+默认字体解析器 = 字体解析器()
+
+
+def 获取字体(字体名=None, 字号=28, 粗体=False):
+    """获取共享的字体对象
+
+    参数:
+        字体名(str): 系统字体名，None表示默认字体（优先使用中文字体，没有时为pygame默认字体）
+        字号(int): 字体大小
+        粗体(bool): 是否粗体
+
+    返回:
+        pygame.font.Font: 字体对象
+    """
+    global 字体加载次数
+    键 = (字体名, 字号, 粗体)
+    字体 = _字体注册表.get(键)
+    if 字体 is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        路径, 模拟粗体 = 默认字体解析器.解析(字体名, 粗体)
+        try:
+            字体 = pygame.font.Font(路径, 字号)
+        except (OSError, pygame.error):
+            字体 = pygame.font.Font(None, 字号)
+            模拟粗体 = 粗体
+        字体.set_bold(模拟粗体)
+        _字体注册表[键] = 字体
+        字体加载次数 += 1
+    return 字体
+
+
+class 文本缓存(表面缓存):
+    """有容量上限的LRU文本表面缓存
+
+    返回的表面由缓存共享，调用方不能修改它；需要改透明度等属性时先复制。
+    """
+
+    def 渲染(self, 文本, 颜色=(255, 255, 255), 字号=28, 字体名=None, 粗体=False, 抗锯齿=True, 字体=None):
+        """渲染文本，命中缓存时直接返回之前的表面
+
+        参数:
+            文本(str): 要渲染的文本
+            颜色(tuple): 文本颜色
+            字号(int): 字体大小
+            字体名(str): 系统字体名，None表示默认字体
+            粗体(bool): 是否粗体
+            抗锯齿(bool): 是否抗锯齿
+            字体(pygame.font.Font): 直接指定字体对象，指定时忽略字号、字体名和粗体
+
+        返回:
+            pygame.Surface: 文本表面
+        """
+        if 字体 is None:
+            键 = (文本, 字体名, 字号, 粗体, tuple(颜色), 抗锯齿)
+        else:
+            键 = (文本, 字体, tuple(颜色), 抗锯齿)
+
+        表面 = self.查找(键)
+        if 表面 is not None:
+            return 表面
+
+        if 字体 is None:
+            字体 = 获取字体(字体名, 字号, 粗体)
+        return self.放入(键, 字体.render(文本, 抗锯齿, 颜色))
+
+    def 统计(self):
+        """返回缓存统计
+
+        返回:
+            dict: 条目数、容量、命中、未命中、命中率和字体加载次数
+        """
+        return dict(super().统计(), 字体加载次数=字体加载次数)
+
+
+# 进程内共享的默认缓存
+默认文本缓存 = 文本缓存()
+
+
+def 预加载字体(规格=界面字体规格):
+    """提前加载界面会用到的字体，把解析和加载的耗时放在启动阶段
+
+    参数:
+        规格: (字体名, 字号, 粗体) 的序列
+    """
+    for 字体名, 字号, 粗体 in 规格:
+        获取字体(字体名, 字号, 粗体)
+
+
+def 渲染文本(文本, 颜色=(255, 255, 255), 字号=28, 字体名=None, 粗体=False, 抗锯齿=True, 字体=None):
+    """使用默认缓存渲染文本，参数见文本缓存.渲染"""
+    return 默认文本缓存.渲染(文本, 颜色, 字号, 字体名, 粗体, 抗锯齿, 字体)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import pygame
+from gui_fonts import 渲染文本
 from gui_base import 界面基类
 
 class 主菜单界面(界面基类):
@@ -83,14 +83,12 @@ class 主菜单界面(界面基类):
             return
         
         # 绘制标题
-        标题字体 = pygame.font.Font(None, 72)
-        标题文本 = 标题字体.render("时光记忆", True, (255, 255, 255))
+        标题文本 = 渲染文本("时光记忆", (255, 255, 255), 72)
         标题位置 = ((屏幕.get_width() - 标题文本.get_width()) // 2, 50)
         屏幕.blit(标题文本, 标题位置)
         
         # 绘制副标题
-        副标题字体 = pygame.font.Font(None, 36)
-        副标题文本 = 副标题字体.render("探索童年的回忆", True, (200, 200, 200))
+        副标题文本 = 渲染文本("探索童年的回忆", (200, 200, 200), 36)
         副标题位置 = ((屏幕.get_width() - 副标题文本.get_width()) // 2, 120)
         屏幕.blit(副标题文本, 副标题位置)
         
@@ -1,20 +1,54 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from gui_modules.gui_base import GUI基础类
-from gui_modules.gui_manager import GUI管理器
-from gui_modules.gui_main_menu import 主菜单界面
-from gui_modules.gui_collection import 收藏品界面
-from gui_modules.gui_attributes import 属性界面
-from gui_modules.gui_events import 事件界面
-from gui_modules.gui_time import 时间界面
-from gui_modules.gui_input import 输入界面
+import importlib
+
+# 导出名称 -> 所在子模块；第一次访问时才导入，导入本包不会加载pygame和各个界面
+_导出模块 = {
+    "GUI基础类": "gui_modules.gui_base",
+    "GUI管理器": "gui_modules.gui_manager",
+    "主菜单界面": "gui_modules.gui_main_menu",
+    "收藏品界面": "gui_modules.gui_collection",
+    "属性界面": "gui_modules.gui_attributes",
+    "事件界面": "gui_modules.gui_events",
+    "时间界面": "gui_modules.gui_time",
+    "输入界面": "gui_modules.gui_input",
+}
+
+# 创建图形界面时登记的界面：(名称, 导出名称, 别名)，第一次切换到时才创建
+_界面列表 = (
+    ("主菜单", "主菜单界面", ()),
+    ("收藏品", "收藏品界面", ("收藏品界面",)),
+    ("属性", "属性界面", ("属性界面", "角色属性")),
+    ("事件", "事件界面", ("事件界面",)),
+    ("时间", "时间界面", ("时间界面",)),
+    ("输入", "输入界面", ("输入界面",)),
+)
+
+__all__ = list(_导出模块) + ["创建图形界面"]
+
+
+def __getattr__(名称):
+    模块名 = _导出模块.get(名称)
+    if 模块名 is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {名称!r}")
+    值 = getattr(importlib.import_module(模块名), 名称)
+    globals()[名称] = 值
+    return 值
+
 
 # 创建GUI界面的工厂函数
 def 创建图形界面():
     """创建图形界面实例
-    
+
+    各个界面只登记模块和类名，第一次切换到时才导入和创建，
+    某个界面模块缺失只在切换到它时报告。
+
     返回:
         GUI管理器: 界面管理器实例
     """
-    return GUI管理器() 
\ No newline at end of file
+    from gui_modules.gui_manager import GUI管理器
+    管理器 = GUI管理器()
+    for 名称, 类名, 别名 in _界面列表:
+        管理器.注册延迟界面(名称, _导出模块[类名], 类名, 别名)
+    return 管理器
@@ -8,6 +8,17 @@ import random
 import math
 from typing import Any, List, Dict, Tuple, Optional, Callable
 
+from gui_assets import 缩放图片, 图片区域
+from gui_cache import 表面缓存
+from gui_fonts import 获取字体, 渲染文本, 预加载字体
+from gui_particles import 粒子系统, NUMPY_AVAILABLE
+
+
+# 进程内共享的按钮精灵缓存，所有界面共用；
+# 按钮等控件的每种外观（文本、尺寸、状态）只渲染一次，之后每帧只需一次blit
+按钮精灵 = 表面缓存(256)
+
+
 class GUI界面:
     """GUI界面基类，所有具体界面都应继承此类"""
     
@@ -23,7 +34,6 @@ class GUI界面:
         self.按钮列表: List[Dict] = []
         self.脏矩形列表: List[pygame.Rect] = []
         self.主缓冲区: Optional[pygame.Surface] = None
-        self.字体缓存: Dict[Tuple[str, int], pygame.font.Font] = {}
     
     def 设置管理器(self, 管理器):
         """设置界面管理器
@@ -82,6 +92,17 @@ class GUI界面:
         # 清除脏矩形列表
         self.脏矩形列表.clear()
     
+    def 绘制快照(self, 表面: pygame.Surface):
+        """把界面的完整画面绘制到表面上，用于切换动画
+        
+        与绘制到表面不同，这里不依赖也不清除脏矩形列表。
+        
+        参数:
+            表面: 目标pygame表面
+        """
+        if self.主缓冲区:
+            表面.blit(self.主缓冲区, (0, 0))
+    
     def 关闭(self):
         """关闭界面，释放资源"""
         pass
@@ -129,19 +150,29 @@ class GUI界面:
             # 选择按钮颜色
             颜色 = 按钮['hover_color'] if 按钮['hovered'] else 按钮['color']
             
-            # 绘制按钮背景
-            pygame.draw.rect(self.主缓冲区, 颜色, 按钮['rect'])
-            pygame.draw.rect(self.主缓冲区, (0, 0, 0), 按钮['rect'], 2)  # 边框
-            
-            # 绘制按钮文本
-            字体 = self._获取字体('simhei', 按钮['font_size'])
-            文本表面 = 字体.render(按钮['text'], True, 按钮['text_color'])
-            文本位置 = 文本表面.get_rect(center=按钮['rect'].center)
-            self.主缓冲区.blit(文本表面, 文本位置)
+            # 每种外观只渲染一次，悬停变化只是换一张缓存的表面
+            矩形 = 按钮['rect']
+            键 = ('界面按钮', 按钮['text'], 矩形.size, tuple(颜色), tuple(按钮['text_color']), 按钮['font_size'])
+            精灵 = 按钮精灵.获取(键, lambda: self._渲染按钮精灵(按钮, 颜色))
+            self.主缓冲区.blit(精灵, 矩形)
             
             # 添加到脏矩形列表
             self.脏矩形列表.append(按钮['rect'])
     
+    @staticmethod
+    def _渲染按钮精灵(按钮: Dict, 颜色: Tuple[int, int, int]) -> pygame.Surface:
+        """把按钮的背景、边框和文本渲染到一张与按钮同尺寸的表面上"""
+        表面 = pygame.Surface(按钮['rect'].size)
+        if pygame.display.get_surface() is not None:
+            表面 = 表面.convert()
+        区域 = 表面.get_rect()
+        pygame.draw.rect(表面, 颜色, 区域)
+        pygame.draw.rect(表面, (0, 0, 0), 区域, 2)  # 边框
+        
+        文本表面 = 渲染文本(按钮['text'], 按钮['text_color'], 按钮['font_size'], 'simhei')
+        表面.blit(文本表面, 文本表面.get_rect(center=区域.center))
+        return 表面
+    
     def 绘制文本(self, 文本: str, 位置: Tuple[int, int], 颜色: Tuple[int, int, int] = (0, 0, 0), 
                字体名: str = 'simhei', 字体大小: int = 24, 居中: bool = False):
         """在界面上绘制文本
@@ -157,8 +188,7 @@ class GUI界面:
         返回:
             文本的矩形区域
         """
-        字体 = self._获取字体(字体名, 字体大小)
-        文本表面 = 字体.render(文本, True, 颜色)
+        文本表面 = 渲染文本(文本, 颜色, 字体大小, 字体名)
         
         if 居中:
             文本位置 = 文本表面.get_rect(center=位置)
@@ -195,7 +225,7 @@ class GUI界面:
                 break
     
     def _获取字体(self, 字体名: str, 字体大小: int) -> pygame.font.Font:
-        """获取字体对象，使用缓存提高性能
+        """获取字体对象，使用进程内共享的字体注册表
         
         参数:
             字体名: 字体名称
@@ -204,15 +234,7 @@ class GUI界面:
         返回:
             字体对象
         """
-        字体键 = (字体名, 字体大小)
-        
-        if 字体键 not in self.字体缓存:
-            try:
-                self.字体缓存[字体键] = pygame.font.SysFont(字体名, 字体大小)
-            except:
-                self.字体缓存[字体键] = pygame.font.Font(None, 字体大小)
-        
-        return self.字体缓存[字体键]
+        return 获取字体(字体名, 字体大小)
 
 class GUI基础类:
     """基于pygame的图形界面基础类，提供基本绘制功能"""
@@ -240,10 +262,10 @@ class GUI基础类:
         # 初始化脏矩形列表（用于追踪需要更新的区域）
         self.脏矩形列表 = []
         
-        # 加载背景图片
+        # 加载背景图片（资源管理器中解码和缩放各只做一次）
+        self.背景图片路径 = "picture/back_ground_picture.png"
         try:
-            self.背景图片 = pygame.image.load("picture/back_ground_picture.png")
-            self.背景图片 = pygame.transform.scale(self.背景图片, (self.屏幕宽度, self.屏幕高度))
+            self.背景图片 = 缩放图片(self.背景图片路径, (self.屏幕宽度, self.屏幕高度))
         except Exception as e:
             print(f"无法加载背景图片：{e}，将使用默认背景")
             self.背景图片 = None
@@ -258,25 +280,32 @@ class GUI基础类:
         self.属性栏颜色 = (114, 184, 240)  # 属性栏颜色
         self.属性栏边框色 = (150, 200, 255)  # 属性栏边框颜色
         
-        # 加载字体
-        pygame.font.init()
-        self.标题字体 = pygame.font.SysFont('simhei', 42, bold=True)
-        self.正文字体 = pygame.font.SysFont('simhei', 24)
-        self.小字体 = pygame.font.SysFont('simhei', 18)
-        
-        # 创建背景元素
-        self.背景粒子 = []
-        for i in range(30):  # 减少粒子数量，因为有背景图片
-            self.背景粒子.append({
-                'x': random.randint(0, self.屏幕宽度),
-                'y': random.randint(0, self.屏幕高度),
-                'size': random.randint(1, 3),
-                'speed': random.uniform(0.1, 0.5),
-                'color': (random.randint(200, 255), random.randint(200, 255), random.randint(200, 255), random.randint(50, 120))
-            })
-        
-        # 游戏时钟
+        # 加载字体；其余界面用到的字号一并预加载，避免首帧卡顿
+        预加载字体()
+        self.标题字体 = 获取字体('simhei', 42, 粗体=True)
+        self.正文字体 = 获取字体('simhei', 24)
+        self.小字体 = 获取字体('simhei', 18)
+        
+        # 创建背景元素：缓慢下落的半透明粒子（需要numpy）
+        self.背景粒子 = None
+        if NUMPY_AVAILABLE:
+            self.背景粒子 = 粒子系统(容量=64, 环绕区域=(self.屏幕宽度, self.屏幕高度))
+            数量 = 30  # 减少粒子数量，因为有背景图片
+            self.背景粒子.批量发射(
+                [random.randint(0, self.屏幕宽度) for _ in range(数量)],
+                [random.randint(0, self.屏幕高度) for _ in range(数量)],
+                [(random.randint(200, 255), random.randint(200, 255), random.randint(200, 255), random.randint(50, 120))
+                 for _ in range(数量)],
+                [random.randint(1, 3) for _ in range(数量)],
+                [None] * 数量,
+                [0.0] * 数量,
+                # 原来每帧下落0.1-0.5像素，按60帧/秒换算
+                [random.uniform(0.1, 0.5) * 60 for _ in range(数量)],
+            )
+        
+        # 游戏时钟；获取时间返回毫秒，测试和基准可以替换成确定性的时钟
         self.时钟 = pygame.time.Clock()
+        self.获取时间 = pygame.time.get_ticks
         self.帧计数 = 0
         
         # 当前界面状态
@@ -300,31 +329,11 @@ class GUI基础类:
         
         # 绘制少量半透明粒子作为装饰
         self.帧计数 += 1
-        for 粒子 in self.背景粒子:
-            # 移动粒子
-            粒子['y'] += 粒子['speed']
-            if 粒子['y'] > self.屏幕高度:
-                粒子['y'] = 0
-                粒子['x'] = random.randint(0, self.屏幕宽度)
-            
-            # 绘制半透明粒子
-            size = 粒子['size']
-            x, y = int(粒子['x']), int(粒子['y'])
-            intensity = (math.sin(self.帧计数 * 0.05 + x * 0.1) + 1) * 0.3 + 0.4
-            
-            # 创建一个带透明度的表面
-            particle_surface = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-            color = list(粒子['color'])
-            if len(color) == 3:  # 如果没有透明度，添加透明度
-                color.append(100)  # 半透明
-            pygame.draw.circle(particle_surface, color, (size, size), size)
-            
-            # 记录脏矩形
-            粒子矩形 = pygame.Rect(x-size, y-size, size*2, size*2)
-            self.脏矩形列表.append(粒子矩形)
-            
-            # 绘制到主缓冲区
-            self.主缓冲区.blit(particle_surface, (x-size, y-size))
+        if self.背景粒子 is not None:
+            self.背景粒子.更新(1000 / 60)
+            粒子矩形 = self.背景粒子.绘制(self.主缓冲区)
+            if 粒子矩形:
+                self.脏矩形列表.append(粒子矩形)
     
     def 绘制文本(self, 文本, x, y, 颜色=None, 字体=None, 居中=False, 阴影=False):
         """在屏幕上绘制文本，可选是否有阴影效果
@@ -347,7 +356,7 @@ class GUI基础类:
             字体 = self.正文字体
         
         # 绘制主文本并获取其矩形区域
-        文本渲染 = 字体.render(文本, True, 颜色)
+        文本渲染 = 渲染文本(文本, 颜色, 字体=字体)
         文本矩形 = 文本渲染.get_rect()
         
         if 居中:
@@ -358,7 +367,7 @@ class GUI基础类:
         # 如果需要阴影效果
         if 阴影:
             阴影颜色 = (30, 30, 30)
-            阴影文本 = 字体.render(文本, True, 阴影颜色)
+            阴影文本 = 渲染文本(文本, 阴影颜色, 字体=字体)
             阴影矩形 = 文本矩形.copy()
             阴影矩形.x += 2
             阴影矩形.y += 2
@@ -404,39 +413,17 @@ class GUI基础类:
         # 记录脏矩形
         self.脏矩形列表.append(扩展按钮矩形)
         
-        # 绘制按钮阴影
-        阴影矩形 = pygame.Rect(x+3, y+3, 宽度, 高度)
-        pygame.draw.rect(self.主缓冲区, (20, 20, 20), 阴影矩形, border_radius=8)
-        
-        # 绘制按钮主体
         if 高亮:
-            按钮颜色 = self.高亮色
+            状态, 按钮颜色 = "高亮", self.高亮色
         elif 悬停:
-            按钮颜色 = self.按钮悬停色
-            # 绘制悬停时的光晕效果
-            扩展矩形 = pygame.Rect(x-2, y-2, 宽度+4, 高度+4)
-            pygame.draw.rect(self.主缓冲区, (255, 255, 255, 30), 扩展矩形, border_radius=10, width=2)
+            状态, 按钮颜色 = "悬停", self.按钮悬停色
         else:
-            按钮颜色 = self.按钮色
-        
-        pygame.draw.rect(self.主缓冲区, 按钮颜色, 按钮矩形, border_radius=8)
-        
-        # 添加内部光泽效果
-        光泽高度 = 高度 // 3
-        光泽矩形 = pygame.Rect(x+4, y+4, 宽度-8, 光泽高度)
-        渐变色 = (min(255, 按钮颜色[0] + 30), min(255, 按钮颜色[1] + 30), min(255, 按钮颜色[2] + 30), 90)
-        渐变表面 = pygame.Surface((宽度-8, 光泽高度), pygame.SRCALPHA)
-        渐变表面.fill(渐变色)
-        self.主缓冲区.blit(渐变表面, 光泽矩形)
-        
-        # 绘制按钮文本（带阴影）
-        按钮文本 = self.正文字体.render(文本, True, (20, 20, 20))
-        文本矩形 = 按钮文本.get_rect(center=(按钮矩形.centerx+1, 按钮矩形.centery+1))
-        self.主缓冲区.blit(按钮文本, 文本矩形)
+            状态, 按钮颜色 = "正常", self.按钮色
         
-        按钮文本 = self.正文字体.render(文本, True, (255, 255, 255))
-        文本矩形 = 按钮文本.get_rect(center=按钮矩形.center)
-        self.主缓冲区.blit(按钮文本, 文本矩形)
+        # 阴影、光晕、主体、光泽和文本按 (文本, 尺寸, 状态) 预渲染，每帧只需一次blit
+        键 = ('基础按钮', 文本, 宽度, 高度, 状态, 按钮颜色, self.正文字体)
+        精灵 = 按钮精灵.获取(键, lambda: self._渲染按钮精灵(文本, 宽度, 高度, 状态, 按钮颜色))
+        self.主缓冲区.blit(精灵, 扩展按钮矩形)
         
         # 存储按钮信息
         按钮信息 = {
@@ -449,6 +436,50 @@ class GUI基础类:
         
         return 按钮矩形
         
+    def _渲染按钮精灵(self, 文本, 宽度, 高度, 状态, 按钮颜色):
+        """渲染一个按钮精灵，尺寸比按钮四周各大5像素以容纳阴影和光晕
+        
+        参数:
+            文本(str): 按钮文本
+            宽度(int): 按钮宽度
+            高度(int): 按钮高度
+            状态(str): "正常"、"悬停"或"高亮"
+            按钮颜色(tuple): 按钮主体颜色
+            
+        返回:
+            pygame.Surface: 带透明通道的按钮表面
+        """
+        精灵 = pygame.Surface((宽度 + 10, 高度 + 10), pygame.SRCALPHA)
+        按钮矩形 = pygame.Rect(5, 5, 宽度, 高度)
+        
+        # 绘制按钮阴影
+        pygame.draw.rect(精灵, (20, 20, 20), 按钮矩形.move(3, 3), border_radius=8)
+        
+        # 绘制悬停时的光晕效果；主缓冲区不透明，原来的半透明白色实际画出来就是纯白
+        if 状态 == "悬停":
+            pygame.draw.rect(精灵, (255, 255, 255), 按钮矩形.inflate(4, 4), border_radius=10, width=2)
+        
+        # 绘制按钮主体
+        pygame.draw.rect(精灵, 按钮颜色, 按钮矩形, border_radius=8)
+        
+        # 添加内部光泽效果
+        光泽高度 = 高度 // 3
+        渐变色 = (min(255, 按钮颜色[0] + 30), min(255, 按钮颜色[1] + 30), min(255, 按钮颜色[2] + 30), 90)
+        渐变表面 = pygame.Surface((宽度-8, 光泽高度), pygame.SRCALPHA)
+        渐变表面.fill(渐变色)
+        精灵.blit(渐变表面, (9, 9))
+        
+        # 绘制按钮文本（带阴影）
+        按钮文本 = 渲染文本(文本, (20, 20, 20), 字体=self.正文字体)
+        精灵.blit(按钮文本, 按钮文本.get_rect(center=(按钮矩形.centerx+1, 按钮矩形.centery+1)))
+        
+        按钮文本 = 渲染文本(文本, (255, 255, 255), 字体=self.正文字体)
+        精灵.blit(按钮文本, 按钮文本.get_rect(center=按钮矩形.center))
+        
+        if pygame.display.get_surface() is not None:
+            精灵 = 精灵.convert_alpha()
+        return 精灵
+        
     def 显示标题(self):
         """显示游戏标题和装饰元素"""
         # 绘制标题栏背景
@@ -495,7 +526,7 @@ class GUI基础类:
         self.脏矩形列表.append(消息背景)
         
         self.消息 = 文本
-        self.消息计时器 = pygame.time.get_ticks()
+        self.消息计时器 = self.获取时间()
         self.绘制文本(文本, self.屏幕宽度//2, self.屏幕高度 - 35, self.高亮色, self.正文字体, True)
         
         # 将主缓冲区内容更新到屏幕
@@ -511,7 +542,7 @@ class GUI基础类:
         
         # 使用背景图片或颜色填充底部区域
         if self.背景图片:
-            区域背景 = self.背景图片.subsurface(底部区域)
+            区域背景 = 图片区域(self.背景图片路径, 底部区域, (self.屏幕宽度, self.屏幕高度))
             self.主缓冲区.blit(区域背景, 底部区域)
         else:
             pygame.draw.rect(self.主缓冲区, self.背景色, 底部区域)
@@ -531,16 +562,14 @@ class GUI基础类:
         self.屏幕.blit(self.主缓冲区, (0, 0))
         pygame.display.update(self.脏矩形列表)
         
-        等待中 = True
-        while 等待中:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    等待中 = False
-            
-            self.时钟.tick(30)
+        # 画面在等待期间不变，阻塞等待事件而不是轮询
+        while True:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                break
     
     def 处理事件(self):
         """处理pygame事件"""
@@ -563,7 +592,7 @@ class GUI基础类:
         self.帧计数 += 1
         
         # 处理消息超时
-        当前时间 = pygame.time.get_ticks()
+        当前时间 = self.获取时间()
         if self.消息 and 当前时间 - self.消息计时器 > 3000:
             self.消息 = ""
             # 确保消息区域被标记为脏矩形，以便重绘
@@ -571,7 +600,7 @@ class GUI基础类:
             self.脏矩形列表.append(消息区域)
             # 重绘该区域（使用背景）
             if self.背景图片:
-                区域背景 = self.背景图片.subsurface(消息区域)
+                区域背景 = 图片区域(self.背景图片路径, 消息区域, (self.屏幕宽度, self.屏幕高度))
                 self.主缓冲区.blit(区域背景, 消息区域)
                 
         # 将主缓冲区内容更新到屏幕
@@ -73,6 +73,14 @@ class GUI界面(object):
         """绘制到表面的具体实现，子类需要重写此方法"""
         pass
         
+    def 绘制快照(self, 表面):
+        """将界面的完整画面绘制到表面，用于切换动画
+        
+        参数:
+            表面: pygame Surface对象
+        """
+        self._绘制到表面实现(表面)
+        
     def 切换完成(self):
         """当切换到此界面的动画完成时调用"""
         self._切换完成实现()
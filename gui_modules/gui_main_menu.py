@@ -5,6 +5,7 @@ import pygame
 import sys
 from typing import Any, Optional
 
+from gui_assets import 缩放图片
 from gui_modules.gui_base import GUI界面
 
 class 主菜单界面(GUI界面):
@@ -31,8 +32,7 @@ class 主菜单界面(GUI界面):
         
         # 加载背景图片
         try:
-            self.背景 = pygame.image.load(self.背景路径).convert_alpha()
-            self.背景 = pygame.transform.scale(self.背景, self.主缓冲区.get_size())
+            self.背景 = 缩放图片(self.背景路径, self.主缓冲区.get_size(), 透明=True)
         except Exception as e:
             print(f"无法加载背景图片: {e}")
             self.背景 = None
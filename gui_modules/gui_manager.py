@@ -4,7 +4,53 @@
 import pygame
 import sys
 from gui_modules.gui_base import GUI基础类
-from typing import Dict, Optional, Any, List
+from gui_profiler import 帧分析器
+from gui_registry import 界面注册表, 预热延迟, 预热间隔
+from typing import Dict, Optional, Any, List, Tuple
+
+# 缩放切换动画预先缩放的级数，覆盖最小缩放比例到1.0
+缩放级数 = 8
+最小缩放比例 = 0.8
+
+
+class 表面池:
+    """按尺寸复用的pygame表面池，避免动画期间反复分配整屏表面"""
+    
+    def __init__(self, 每种尺寸上限: int = 4):
+        """初始化表面池
+        
+        参数:
+            每种尺寸上限: 每种尺寸最多保留的空闲表面数
+        """
+        self.每种尺寸上限 = 每种尺寸上限
+        self._空闲: Dict[Tuple[int, int], List[pygame.Surface]] = {}
+        self.分配次数 = 0
+        self.复用次数 = 0
+    
+    def 借出(self, 尺寸: Tuple[int, int]) -> pygame.Surface:
+        """取一个指定尺寸的表面，内容未定义
+        
+        参数:
+            尺寸: (宽, 高)
+        """
+        空闲 = self._空闲.get(tuple(尺寸))
+        if 空闲:
+            self.复用次数 += 1
+            return 空闲.pop()
+        self.分配次数 += 1
+        return pygame.Surface(尺寸).convert()
+    
+    def 归还(self, 表面: pygame.Surface):
+        """把表面还回池中
+        
+        参数:
+            表面: 之前借出的表面
+        """
+        表面.set_alpha(None)
+        空闲 = self._空闲.setdefault(表面.get_size(), [])
+        if len(空闲) < self.每种尺寸上限:
+            空闲.append(表面)
+
 
 class GUI管理器(GUI基础类):
     """GUI管理器类，负责管理不同界面并处理界面切换"""
@@ -20,11 +66,9 @@ class GUI管理器(GUI基础类):
         # 调用父类初始化
         super().__init__(屏幕宽度, 屏幕高度, 标题)
         
-        # 界面字典
-        self.界面字典 = {}
-        
         # 当前活动界面
         self.当前界面 = None
+        self.当前界面名称: Optional[str] = None
         
         # 界面历史记录（用于返回上一个界面）
         self.界面历史 = []
@@ -39,10 +83,38 @@ class GUI管理器(GUI基础类):
             "类型": "淡入淡出"  # 淡入淡出, 滑动, 缩放
         }
         
-        self.界面注册表: Dict[str, Any] = {}  # 存储所有已注册的界面
+        # 切换动画使用的快照表面
+        self.表面池 = 表面池()
+        self._切换快照: Dict[str, pygame.Surface] = {}
+        self._缩放级缓存: Dict[Tuple[str, int], pygame.Surface] = {}
+        
+        # 存储所有已注册的界面，延迟注册的界面第一次切换到时才导入和创建
+        self.界面注册表 = 界面注册表(self._创建界面)
         self.界面栈: List[Any] = []  # 界面栈，用于返回上一界面
         self.正在运行 = True
         
+        # 空闲时在主菜单上逐个预热其他界面，设为False关闭
+        self.空闲预热 = True
+        self._最后输入时间 = 0
+        self._上次预热时间 = 0
+        
+        # 帧性能分析器，调用启用性能分析后才会创建
+        self.分析器: Optional[帧分析器] = None
+    
+    def 启用性能分析(self, CSV路径: Optional[str] = None, 容量: int = 600) -> 帧分析器:
+        """开始按阶段记录每帧耗时，并在屏幕左上角显示帧耗时分位数
+        
+        参数:
+            CSV路径: 主循环退出时导出CSV的路径，None表示不导出
+            容量: 保留最近多少帧的记录
+        
+        返回:
+            帧分析器实例
+        """
+        # 使用界面的时钟，替换成确定性时钟后叠加层的刷新也随之确定
+        self.分析器 = 帧分析器(容量, CSV路径, lambda: self.获取时间())
+        return self.分析器
+        
     def 注册界面(self, 界面实例):
         """注册一个界面到管理器
         
@@ -50,24 +122,47 @@ class GUI管理器(GUI基础类):
             界面实例: 实现了GUI界面接口的实例
         """
         界面实例.设置管理器(self)
-        界面名称 = 界面实例.名称
-        self.界面注册表[界面名称] = 界面实例
+        self.界面注册表.注册(界面实例.名称, 实例=界面实例)
+    
+    def 注册延迟界面(self, 名称: str, 模块名: str, 类名: str, 别名: Tuple[str, ...] = ()):
+        """登记一个界面，第一次切换到它时才导入模块并创建
+        
+        模块缺失或出错只在切换到这个界面时报告，不影响其他界面。
         
-    def 切换到界面(self, 界面名称: str, 参数: Any = None, 保存当前界面: bool = True):
+        参数:
+            名称: 界面名称
+            模块名: 界面类所在的模块
+            类名: 界面类名，创建时不传参数
+            别名: 也可以用来切换到这个界面的其他名称
+        """
+        self.界面注册表.注册(名称, 模块名, 类名, 别名=别名)
+    
+    def _创建界面(self, 界面类):
+        """创建界面实例并设置管理器，由界面注册表在第一次用到时调用"""
+        界面实例 = 界面类()
+        界面实例.设置管理器(self)
+        return 界面实例
+        
+    def 切换到界面(self, 界面名称: str, 参数: Any = None, 保存当前界面: bool = True,
+               动画: Optional[str] = None):
         """切换到指定名称的界面
         
         参数:
             界面名称: 要切换到的界面名称
             参数: 传递给新界面的参数
             保存当前界面: 是否将当前界面保存到栈中
+            动画: 切换动画类型（淡入淡出、滑动、缩放），None表示直接切换
         
         返回:
             切换是否成功
         """
-        if 界面名称 not in self.界面注册表:
-            print(f"错误: 界面'{界面名称}'未注册")
+        目标界面 = self.界面注册表.获取(界面名称)
+        if 目标界面 is None:
             return False
+        界面名称 = self.界面注册表.规范名称(界面名称)
             
+        源界面名称 = self.当前界面名称 if self.当前界面 else None
+        
         # 关闭当前界面
         if self.当前界面:
             if 保存当前界面:
@@ -75,7 +170,8 @@ class GUI管理器(GUI基础类):
             self.当前界面.关闭()
             
         # 切换到新界面
-        self.当前界面 = self.界面注册表[界面名称]
+        self.当前界面 = 目标界面
+        self.当前界面名称 = 界面名称
         
         # 如果界面未初始化，先初始化
         if not self.当前界面.已初始化:
@@ -83,6 +179,9 @@ class GUI管理器(GUI基础类):
             
         # 准备界面
         self.当前界面.准备(参数)
+        
+        if 动画:
+            self.开始切换动画(源界面名称, 界面名称, 动画)
         return True
         
     def 返回上一界面(self, 参数: Any = None):
@@ -104,6 +203,7 @@ class GUI管理器(GUI基础类):
             
         # 切换到栈中最上层的界面
         self.当前界面 = self.界面栈.pop()
+        self.当前界面名称 = self.当前界面.名称
         
         # 准备界面
         self.当前界面.准备(参数)
@@ -112,14 +212,24 @@ class GUI管理器(GUI基础类):
     def 运行(self):
         """运行GUI管理器主循环"""
         while self.正在运行:
+            分析器 = self.分析器
+            if 分析器:
+                分析器.开始帧(getattr(self.当前界面, "名称", ""))
+            
             # 处理事件
             self._处理事件()
+            if 分析器:
+                分析器.记录("处理事件")
             
             # 更新当前界面
             self._更新界面()
+            self._空闲预热()
             
             # 控制帧率
             self.时钟.tick(60)
+        
+        if self.分析器:
+            self.分析器.导出CSV()
     
     def _处理事件(self):
         """处理所有输入事件"""
@@ -128,14 +238,31 @@ class GUI管理器(GUI基础类):
                 pygame.quit()
                 sys.exit()
             
+            if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                self._最后输入时间 = self.获取时间()
+            
             # 如果有切换动画正在进行，不处理其他事件
             if self.切换动画["进行中"]:
                 continue
                 
             # 将事件传递给当前界面
             if self.当前界面:
-                当前界面实例 = self.界面字典[self.当前界面]
-                当前界面实例.处理事件(event)
+                self.当前界面.处理事件(event)
+    
+    def _空闲预热(self):
+        """停在主菜单且一段时间没有输入时，每隔预热间隔创建并初始化一个尚未创建的界面"""
+        现在 = self.获取时间()
+        if (not self.空闲预热 or self.切换动画["进行中"] or self.当前界面名称 != "主菜单"
+                or 现在 - self._最后输入时间 < 预热延迟 or 现在 - self._上次预热时间 < 预热间隔):
+            return
+        名称 = self.界面注册表.预热一个()
+        if 名称 is None:
+            return
+        self._上次预热时间 = 现在
+        if self.界面注册表.已创建(名称):
+            界面 = self.界面注册表.获取(名称)
+            if not 界面.已初始化:
+                界面.初始化()
                 
     def _更新界面(self):
         """更新并绘制当前界面"""
@@ -146,7 +273,7 @@ class GUI管理器(GUI基础类):
             
         # 正常更新当前界面
         if self.当前界面:
-            当前界面实例 = self.界面字典[self.当前界面]
+            当前界面实例 = self.当前界面
             
             # 清空按钮列表（因为每个界面有自己的按钮）
             self.按钮列表 = []
@@ -154,32 +281,92 @@ class GUI管理器(GUI基础类):
             # 更新并绘制界面
             当前界面实例.更新()
             
+            分析器 = self.分析器
+            if 分析器:
+                # 界面在更新中直接画到自己的缓冲区，这部分都算作更新
+                分析器.记录("更新")
+                叠加层矩形 = 分析器.绘制叠加层(self.主缓冲区)
+                if 叠加层矩形:
+                    self.脏矩形列表.append(叠加层矩形)
+                分析器.记录("绘制")
+            
             # 进行屏幕更新
             self.更新()
+            if 分析器:
+                分析器.记录("提交")
             
+    def 开始切换动画(self, 源界面名称: Optional[str], 目标界面名称: str, 类型: str = "淡入淡出"):
+        """开始界面切换动画
+        
+        源界面和目标界面各捕获一次快照，动画期间每帧只合成快照，不再重绘界面。
+        
+        参数:
+            源界面名称: 切换前的界面名称，None表示从空白背景切入
+            目标界面名称: 切换后的界面名称，需要已经准备好
+            类型: 动画类型，淡入淡出、滑动或缩放
+        """
+        self._释放切换快照()
+        self.切换动画.update({
+            "进行中": True,
+            "开始时间": self.获取时间(),
+            "源界面": 源界面名称,
+            "目标界面": 目标界面名称,
+            "类型": 类型,
+        })
+        源界面 = None if 源界面名称 is None else self.界面注册表.获取(源界面名称)
+        self._切换快照 = {
+            "背景": self._捕获快照(None),
+            "源": self._捕获快照(源界面),
+            "目标": self._捕获快照(self.界面注册表.获取(目标界面名称)),
+        }
+        # 缩放动画的各级预缩放表面，按需生成：(快照名, 级别) -> 表面
+        self._缩放级缓存 = {}
+    
+    def _捕获快照(self, 界面) -> pygame.Surface:
+        """把背景和界面的完整画面绘制到一个池中的表面上
+        
+        参数:
+            界面: 界面实例，None表示只绘制背景
+        """
+        快照 = self.表面池.借出((self.屏幕宽度, self.屏幕高度))
+        if self.背景图片:
+            快照.blit(self.背景图片, (0, 0))
+        else:
+            快照.fill(self.背景色)
+        if 界面 is not None:
+            # 绘制期间不让界面的按钮混入管理器的按钮列表
+            旧按钮列表 = self.按钮列表
+            self.按钮列表 = []
+            界面.绘制快照(快照)
+            self.按钮列表 = 旧按钮列表
+        return 快照
+    
+    def _释放切换快照(self):
+        """把切换动画用过的表面还回池中"""
+        for 快照 in getattr(self, "_切换快照", {}).values():
+            self.表面池.归还(快照)
+        for 表面 in getattr(self, "_缩放级缓存", {}).values():
+            self.表面池.归还(表面)
+        self._切换快照 = {}
+        self._缩放级缓存 = {}
+    
     def _处理界面切换动画(self):
         """处理界面切换动画"""
-        当前时间 = pygame.time.get_ticks()
+        当前时间 = self.获取时间()
         动画开始时间 = self.切换动画["开始时间"]
-        动画持续时间 = self.切换动画["持续时间"]
+        动画持续时间 = self.切换动画["持续时间"] * 1000  # 秒转毫秒
         动画类型 = self.切换动画["类型"]
-        源界面名称 = self.切换动画["源界面"]
-        目标界面名称 = self.切换动画["目标界面"]
         
         # 计算动画进度 (0.0 到 1.0)
         进度 = min(1.0, (当前时间 - 动画开始时间) / 动画持续时间)
         
-        # 获取源界面和目标界面实例
-        源界面 = None if 源界面名称 is None else self.界面字典[源界面名称]
-        目标界面 = self.界面字典[目标界面名称]
-        
-        # 根据动画类型执行不同的切换效果
-        if 动画类型 == "淡入淡出":
-            self._淡入淡出切换(源界面, 目标界面, 进度)
-        elif 动画类型 == "滑动":
-            self._滑动切换(源界面, 目标界面, 进度)
+        # 根据动画类型合成快照
+        if 动画类型 == "滑动":
+            self._滑动切换(进度)
         elif 动画类型 == "缩放":
-            self._缩放切换(源界面, 目标界面, 进度)
+            self._缩放切换(进度)
+        else:
+            self._淡入淡出切换(进度)
         
         # 更新屏幕
         pygame.display.flip()
@@ -187,163 +374,80 @@ class GUI管理器(GUI基础类):
         # 动画完成
         if 进度 >= 1.0:
             self.切换动画["进行中"] = False
+            self._释放切换快照()
             # 通知目标界面已经完成切换
-            目标界面.切换完成()
+            目标界面 = self.界面注册表.获取(self.切换动画["目标界面"])
+            if hasattr(目标界面, "切换完成"):
+                目标界面.切换完成()
     
-    def _淡入淡出切换(self, 源界面, 目标界面, 进度):
-        """执行淡入淡出切换动画
+    def _淡入淡出切换(self, 进度):
+        """执行淡入淡出切换动画：源快照上叠加逐渐不透明的目标快照
         
         参数:
-            源界面: 源界面实例
-            目标界面: 目标界面实例
             进度(float): 动画进度 (0.0 到 1.0)
         """
-        # 清除屏幕
-        self.清屏()
-        
-        # 如果有源界面，先绘制源界面
-        if 源界面:
-            源表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-            # 首先清空按钮列表
-            旧按钮列表 = self.按钮列表.copy()
-            self.按钮列表 = []
-            # 更新源界面到表面
-            源界面.绘制到表面(源表面)
-            # 恢复按钮列表
-            self.按钮列表 = 旧按钮列表
-            
-            # 设置源表面的透明度
-            源透明度 = int(255 * (1 - 进度))
-            源表面.set_alpha(源透明度)
-            self.主缓冲区.blit(源表面, (0, 0))
-        
-        # 绘制目标界面
-        目标表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-        # 首先清空按钮列表
-        旧按钮列表 = self.按钮列表.copy()
-        self.按钮列表 = []
-        # 更新目标界面到表面
-        目标界面.绘制到表面(目标表面)
-        # 恢复按钮列表
-        self.按钮列表 = 旧按钮列表
-        
-        # 设置目标表面的透明度
-        目标透明度 = int(255 * 进度)
-        目标表面.set_alpha(目标透明度)
-        self.主缓冲区.blit(目标表面, (0, 0))
-        
-        # 更新整个屏幕
-        self.屏幕.blit(self.主缓冲区, (0, 0))
-        
-    def _滑动切换(self, 源界面, 目标界面, 进度):
-        """执行滑动切换动画
+        目标快照 = self._切换快照["目标"]
+        self.屏幕.blit(self._切换快照["源"], (0, 0))
+        目标快照.set_alpha(int(255 * 进度))
+        self.屏幕.blit(目标快照, (0, 0))
+        目标快照.set_alpha(None)
+        
+    def _滑动切换(self, 进度):
+        """执行滑动切换动画：源快照向左滑出，目标快照从右侧滑入
         
         参数:
-            源界面: 源界面实例
-            目标界面: 目标界面实例
             进度(float): 动画进度 (0.0 到 1.0)
         """
-        # 清除屏幕
-        self.清屏()
-        
-        # 计算偏移量
-        偏移量 = int(self.屏幕宽度 * (1 - 进度))
-        
-        # 如果有源界面，先绘制源界面
-        if 源界面:
-            源表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-            # 首先清空按钮列表
-            旧按钮列表 = self.按钮列表.copy()
-            self.按钮列表 = []
-            # 更新源界面到表面
-            源界面.绘制到表面(源表面)
-            # 恢复按钮列表
-            self.按钮列表 = 旧按钮列表
-            
-            # 绘制源表面（向左滑出）
-            self.主缓冲区.blit(源表面, (-偏移量, 0))
-        
-        # 绘制目标界面
-        目标表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-        # 首先清空按钮列表
-        旧按钮列表 = self.按钮列表.copy()
-        self.按钮列表 = []
-        # 更新目标界面到表面
-        目标界面.绘制到表面(目标表面)
-        # 恢复按钮列表
-        self.按钮列表 = 旧按钮列表
-        
-        # 绘制目标表面（从右侧滑入）
-        self.主缓冲区.blit(目标表面, (self.屏幕宽度 - 偏移量, 0))
+        偏移量 = int(self.屏幕宽度 * 进度)
+        self.屏幕.blit(self._切换快照["源"], (-偏移量, 0))
+        self.屏幕.blit(self._切换快照["目标"], (self.屏幕宽度 - 偏移量, 0))
         
-        # 更新整个屏幕
-        self.屏幕.blit(self.主缓冲区, (0, 0))
-        
-    def _缩放切换(self, 源界面, 目标界面, 进度):
-        """执行缩放切换动画
+    def _缩放切换(self, 进度):
+        """执行缩放切换动画：前半段源界面缩小，后半段目标界面放大
         
         参数:
-            源界面: 源界面实例
-            目标界面: 目标界面实例
             进度(float): 动画进度 (0.0 到 1.0)
         """
-        # 清除屏幕
-        self.清屏()
-        
-        # 如果有源界面，先绘制源界面
-        if 源界面 and 进度 < 0.5:
-            源表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-            # 首先清空按钮列表
-            旧按钮列表 = self.按钮列表.copy()
-            self.按钮列表 = []
-            # 更新源界面到表面
-            源界面.绘制到表面(源表面)
-            # 恢复按钮列表
-            self.按钮列表 = 旧按钮列表
-            
-            # 计算缩放比例 (1.0 -> 0.8)
-            缩放比例 = 1.0 - (进度 * 0.4)
-            缩放宽度 = int(self.屏幕宽度 * 缩放比例)
-            缩放高度 = int(self.屏幕高度 * 缩放比例)
-            
-            # 缩放源表面
-            缩放表面 = pygame.transform.smoothscale(源表面, (缩放宽度, 缩放高度))
-            
-            # 计算中心位置
-            x = (self.屏幕宽度 - 缩放宽度) // 2
-            y = (self.屏幕高度 - 缩放高度) // 2
-            
-            # 绘制缩放后的表面
-            self.主缓冲区.blit(缩放表面, (x, y))
-            
-        # 绘制目标界面
-        if 进度 >= 0.5:
-            目标表面 = pygame.Surface((self.屏幕宽度, self.屏幕高度))
-            # 首先清空按钮列表
-            旧按钮列表 = self.按钮列表.copy()
-            self.按钮列表 = []
-            # 更新目标界面到表面
-            目标界面.绘制到表面(目标表面)
-            # 恢复按钮列表
-            self.按钮列表 = 旧按钮列表
-            
-            # 计算缩放比例 (0.8 -> 1.0)
-            缩放比例 = 0.8 + ((进度 - 0.5) * 0.4 * 2)
-            缩放宽度 = int(self.屏幕宽度 * 缩放比例)
-            缩放高度 = int(self.屏幕高度 * 缩放比例)
-            
-            # 缩放目标表面
-            缩放表面 = pygame.transform.smoothscale(目标表面, (缩放宽度, 缩放高度))
-            
-            # 计算中心位置
-            x = (self.屏幕宽度 - 缩放宽度) // 2
-            y = (self.屏幕高度 - 缩放高度) // 2
-            
-            # 绘制缩放后的表面
-            self.主缓冲区.blit(缩放表面, (x, y))
-            
-        # 更新整个屏幕
-        self.屏幕.blit(self.主缓冲区, (0, 0))
+        if 进度 < 0.5:
+            名称 = "源"
+            缩放比例 = 1.0 - 进度 * 0.4  # 1.0 -> 0.8
+        else:
+            名称 = "目标"
+            缩放比例 = 0.8 + (进度 - 0.5) * 0.4  # 0.8 -> 1.0
+        
+        缩放表面 = self._缩放级(名称, 缩放比例)
+        if 缩放表面.get_size() != (self.屏幕宽度, self.屏幕高度):
+            self.屏幕.blit(self._切换快照["背景"], (0, 0))
+        
+        # 居中绘制
+        x = (self.屏幕宽度 - 缩放表面.get_width()) // 2
+        y = (self.屏幕高度 - 缩放表面.get_height()) // 2
+        self.屏幕.blit(缩放表面, (x, y))
+    
+    def _缩放级(self, 名称, 缩放比例):
+        """取最接近缩放比例的预缩放快照，每一级只平滑缩放一次
+        
+        参数:
+            名称(str): 快照名，"源"或"目标"
+            缩放比例(float): 0.8 到 1.0 之间的缩放比例
+        
+        返回:
+            pygame.Surface: 缩放后的快照
+        """
+        级别 = round((缩放比例 - 最小缩放比例) / (1.0 - 最小缩放比例) * (缩放级数 - 1))
+        级别 = max(0, min(缩放级数 - 1, 级别))
+        if 级别 == 缩放级数 - 1:
+            return self._切换快照[名称]
+        
+        键 = (名称, 级别)
+        表面 = self._缩放级缓存.get(键)
+        if 表面 is None:
+            比例 = 最小缩放比例 + (1.0 - 最小缩放比例) * 级别 / (缩放级数 - 1)
+            尺寸 = (int(self.屏幕宽度 * 比例), int(self.屏幕高度 * 比例))
+            表面 = self.表面池.借出(尺寸)
+            pygame.transform.smoothscale(self._切换快照[名称], 尺寸, 表面)
+            self._缩放级缓存[键] = 表面
+        return 表面
 
     def 显示消息(self, 消息, 持续时间=3):
         """显示一条临时消息
@@ -353,7 +457,7 @@ class GUI管理器(GUI基础类):
             持续时间(float): 显示时间（秒）
         """
         self.显示文本(消息)
-        self.消息计时器 = pygame.time.get_ticks()
+        self.消息计时器 = self.获取时间()
         # 持续时间转为毫秒存储
         self.消息持续时间 = 持续时间 * 1000 
 
@@ -369,4 +473,5 @@ class GUI管理器(GUI基础类):
             界面.关闭()
             
         self.界面栈.clear()
-        self.当前界面 = None 
\ No newline at end of file
+        self.当前界面 = None
+        self.当前界面名称 = None 
\ No newline at end of file
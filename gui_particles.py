@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+粒子引擎
+粒子的位置、速度、寿命和颜色按列存放在NumPy数组中，更新用向量运算完成，
+死亡粒子通过一次布尔索引压缩移除。绘制时从按 (颜色, 大小, 透明度档位)
+预先渲染的精灵缓存中取图，用一次blits调用批量绘制。
+"""
+
+import pygame
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 透明度分档数，同一档位的粒子共用一个精灵
+透明度档位数 = 16
+
+
+class 粒子系统:
+    """结构数组式粒子引擎"""
+
+    def __init__(self, 容量=16384, 环绕区域=None):
+        """初始化粒子系统
+
+        参数:
+            容量(int): 初始容量，粒子数超过时自动扩容
+            环绕区域(tuple): (宽, 高)，指定时粒子从底部移出后回到顶部的随机位置，
+                            用于不会消亡的背景粒子
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("粒子系统需要numpy库")
+        self.数量 = 0
+        self.环绕区域 = 环绕区域
+        self._分配(容量)
+
+        # 调色板：颜色(RGBA) -> 序号
+        self._调色板 = {}
+        self._颜色列表 = []
+        # (颜色序号, 大小, 透明度档位) -> 精灵表面
+        self._精灵缓存 = {}
+
+    def _分配(self, 容量):
+        """分配（或扩容）各列数组"""
+        旧数量 = self.数量
+        新数组 = {
+            "x": np.zeros(容量, np.float32),
+            "y": np.zeros(容量, np.float32),
+            "速度x": np.zeros(容量, np.float32),
+            "速度y": np.zeros(容量, np.float32),
+            "寿命": np.zeros(容量, np.float32),
+            "剩余寿命": np.zeros(容量, np.float32),
+            "大小": np.zeros(容量, np.int16),
+            "颜色": np.zeros(容量, np.int32),
+        }
+        for 名称, 数组 in 新数组.items():
+            if 旧数量:
+                数组[:旧数量] = getattr(self, 名称)[:旧数量]
+            setattr(self, 名称, 数组)
+        self.容量 = 容量
+
+    def _颜色序号(self, 颜色):
+        颜色 = tuple(颜色)
+        if len(颜色) == 3:
+            颜色 = 颜色 + (255,)
+        序号 = self._调色板.get(颜色)
+        if 序号 is None:
+            序号 = self._调色板[颜色] = len(self._颜色列表)
+            self._颜色列表.append(颜色)
+        return 序号
+
+    def 发射(self, x, y, 颜色, 大小, 寿命, 速度x=0.0, 速度y=0.0):
+        """添加一个粒子
+
+        参数:
+            x, y: 粒子位置
+            颜色: RGB或RGBA颜色
+            大小: 粒子半径
+            寿命: 粒子寿命（毫秒），None表示不会消亡
+            速度x, 速度y: 粒子速度（像素/秒）
+        """
+        self.批量发射([x], [y], [颜色], [大小], [寿命], [速度x], [速度y])
+
+    def 批量发射(self, x, y, 颜色, 大小, 寿命, 速度x, 速度y):
+        """一次添加多个粒子，参数为等长序列，含义同发射
+
+        颜色可以是单个颜色或颜色序列；寿命中的None表示不会消亡。
+        """
+        n = len(x)
+        if n == 0:
+            return
+        if self.数量 + n > self.容量:
+            self._分配(max(self.容量 * 2, self.数量 + n))
+
+        if len(颜色) and isinstance(颜色[0], (int, float)):
+            颜色序号 = self._颜色序号(颜色)
+        else:
+            颜色序号 = [self._颜色序号(c) for c in 颜色]
+        寿命 = [float("inf") if t is None else t for t in 寿命]
+
+        区间 = slice(self.数量, self.数量 + n)
+        self.x[区间] = x
+        self.y[区间] = y
+        self.速度x[区间] = 速度x
+        self.速度y[区间] = 速度y
+        self.寿命[区间] = 寿命
+        self.剩余寿命[区间] = 寿命
+        self.大小[区间] = 大小
+        self.颜色[区间] = 颜色序号
+        self.数量 += n
+
+    def 清空(self):
+        """移除所有粒子"""
+        self.数量 = 0
+
+    def 更新(self, 时间增量):
+        """推进所有粒子
+
+        参数:
+            时间增量: 上一帧到当前帧的时间间隔（毫秒）
+        """
+        n = self.数量
+        if n == 0:
+            return
+        秒 = 时间增量 / 1000
+        self.x[:n] += self.速度x[:n] * 秒
+        self.y[:n] += self.速度y[:n] * 秒
+        self.剩余寿命[:n] -= 时间增量
+
+        if self.环绕区域 is not None:
+            宽, 高 = self.环绕区域
+            移出 = self.y[:n] > 高
+            if 移出.any():
+                self.y[:n][移出] = 0
+                self.x[:n][移出] = np.random.randint(0, 宽 + 1, int(移出.sum()))
+
+        存活 = self.剩余寿命[:n] > 0
+        if not 存活.all():
+            剩余数量 = int(存活.sum())
+            for 数组 in (self.x, self.y, self.速度x, self.速度y,
+                       self.寿命, self.剩余寿命, self.大小, self.颜色):
+                数组[:剩余数量] = 数组[:n][存活]
+            self.数量 = 剩余数量
+
+    def _精灵(self, 颜色序号, 大小, 档位):
+        键 = (颜色序号, 大小, 档位)
+        精灵 = self._精灵缓存.get(键)
+        if 精灵 is None:
+            r, g, b, a = self._颜色列表[颜色序号]
+            透明度 = round(a * 档位 / (透明度档位数 - 1))
+            精灵 = pygame.Surface((大小 * 2, 大小 * 2), pygame.SRCALPHA)
+            pygame.draw.circle(精灵, (r, g, b, 透明度), (大小, 大小), 大小)
+            self._精灵缓存[键] = 精灵
+        return 精灵
+
+    def 绘制(self, 表面):
+        """把所有粒子绘制到表面上
+
+        参数:
+            表面: 目标pygame表面
+
+        返回:
+            pygame.Rect: 包含所有粒子的矩形，没有粒子时返回None
+        """
+        n = self.数量
+        if n == 0:
+            return None
+
+        比例 = np.ones(n, np.float32)
+        有限 = np.isfinite(self.寿命[:n])
+        np.divide(self.剩余寿命[:n], self.寿命[:n], out=比例, where=有限)
+        档位 = np.clip((比例 * (透明度档位数 - 1)).round(), 0, 透明度档位数 - 1).astype(np.int32)
+
+        大小 = self.大小[:n]
+        左 = self.x[:n].astype(np.int32) - 大小
+        上 = self.y[:n].astype(np.int32) - 大小
+
+        # 把 (颜色, 大小, 档位) 合成一个整数键，每种精灵只查一次缓存
+        最大大小 = int(大小.max()) + 1
+        组合键 = (self.颜色[:n].astype(np.int64) * 最大大小 + 大小) * 透明度档位数 + 档位
+        唯一键, 反查 = np.unique(组合键, return_inverse=True)
+        精灵表 = np.empty(len(唯一键), dtype=object)
+        for i, 键 in enumerate(唯一键.tolist()):
+            颜色和大小, 档 = divmod(键, 透明度档位数)
+            颜色序号, 尺寸 = divmod(颜色和大小, 最大大小)
+            精灵表[i] = self._精灵(颜色序号, 尺寸, 档)
+
+        表面.blits(zip(精灵表[反查].tolist(), zip(左.tolist(), 上.tolist())), doreturn=False)
+
+        直径 = 大小 * 2
+        x0 = int(左.min())
+        y0 = int(上.min())
+        return pygame.Rect(x0, y0, int((左 + 直径).max()) - x0, int((上 + 直径).max()) - y0)
+
+    def 统计(self):
+        """返回粒子数和精灵缓存大小"""
+        return {"粒子数": self.数量, "容量": self.容量, "精灵数": len(self._精灵缓存)}
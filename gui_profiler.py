@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+帧性能分析
+按阶段（处理事件、更新、绘制、提交）用纳秒计时器记录每一帧的耗时，
+最近若干帧保存在固定大小的环形缓冲区中，可以在屏幕角落显示帧耗时分位数，
+退出时导出为CSV。默认不启用，未启用时主循环只多一次属性判断。
+"""
+
+import csv
+import time
+from array import array
+
+import pygame
+
+from gui_fonts import 渲染文本
+
+# 一帧中依次计时的阶段
+阶段列表 = ("处理事件", "更新", "绘制", "提交")
+
+# 没有中文字体时叠加层退回pygame默认字体，它没有中文字形，阶段名用英文显示
+阶段显示名 = {"处理事件": "events", "更新": "update", "绘制": "draw", "提交": "present"}
+
+# 叠加层的刷新间隔（毫秒），避免每帧排序和渲染文本
+叠加层刷新间隔 = 500
+
+
+def 分位数(有序数据, 百分比):
+    """从已排序的数据中取分位数"""
+    if not 有序数据:
+        return 0
+    return 有序数据[min(len(有序数据) - 1, int(len(有序数据) * 百分比 / 100))]
+
+
+class 帧分析器:
+    """记录最近若干帧各阶段耗时的环形缓冲区"""
+
+    def __init__(self, 容量=600, CSV路径=None, 获取时间=None):
+        """初始化帧分析器
+
+        参数:
+            容量(int): 环形缓冲区保存的帧数
+            CSV路径(str): 退出时导出CSV的路径，None表示不导出
+            获取时间(callable): 返回毫秒的时钟，决定叠加层的刷新时机，
+                None表示pygame.time.get_ticks
+        """
+        self.容量 = 容量
+        self.CSV路径 = CSV路径
+        self.获取时间 = 获取时间 or pygame.time.get_ticks
+        self.显示叠加层 = True
+
+        # 每个阶段一列纳秒耗时，另有帧序号和界面名
+        self._耗时 = {阶段: array("q", bytes(8 * 容量)) for 阶段 in 阶段列表}
+        self._帧序号 = array("q", bytes(8 * 容量))
+        self._界面 = [""] * 容量
+        self.帧数 = 0
+
+        self._位置 = -1
+        self._上次计时 = 0
+        self._叠加层表面 = None
+        self._叠加层刷新时间 = -叠加层刷新间隔
+
+    def 开始帧(self, 界面名=""):
+        """开始记录新的一帧
+
+        参数:
+            界面名(str): 本帧的当前界面，用于按界面统计
+        """
+        位置 = self.帧数 % self.容量
+        for 列 in self._耗时.values():
+            列[位置] = 0
+        self._帧序号[位置] = self.帧数
+        self._界面[位置] = 界面名
+        self._位置 = 位置
+        self.帧数 += 1
+        self._上次计时 = time.perf_counter_ns()
+
+    def 记录(self, 阶段):
+        """把从上次计时到现在的时间计入本帧的某个阶段
+
+        参数:
+            阶段(str): 阶段名，见阶段列表
+        """
+        if self._位置 < 0:
+            return
+        现在 = time.perf_counter_ns()
+        self._耗时[阶段][self._位置] += 现在 - self._上次计时
+        self._上次计时 = 现在
+
+    def _有效位置(self):
+        """按时间顺序返回缓冲区中已记录帧的位置"""
+        if self.帧数 <= self.容量:
+            return range(self.帧数)
+        起点 = self.帧数 % self.容量
+        return [(起点 + i) % self.容量 for i in range(self.容量)]
+
+    def 帧耗时(self, 界面名=None):
+        """返回最近各帧的总耗时（纳秒）
+
+        参数:
+            界面名(str): 只统计这个界面的帧，None表示全部
+        """
+        列 = [self._耗时[阶段] for 阶段 in 阶段列表]
+        return [sum(c[i] for c in 列) for i in self._有效位置()
+                if 界面名 is None or self._界面[i] == 界面名]
+
+    def 统计(self):
+        """按界面和阶段汇总最近各帧的耗时
+
+        返回:
+            dict: {界面名: {"帧数", "p50", "p95", "p99", 各阶段平均}}，
+                  耗时单位为毫秒，键"全部"汇总所有界面
+        """
+        分组 = {"全部": list(self._有效位置())}
+        for i in 分组["全部"]:
+            分组.setdefault(self._界面[i], []).append(i)
+
+        结果 = {}
+        for 名称, 位置 in 分组.items():
+            总耗时 = sorted(sum(self._耗时[阶段][i] for 阶段 in 阶段列表) for i in 位置)
+            项 = {
+                "帧数": len(位置),
+                "p50": 分位数(总耗时, 50) / 1e6,
+                "p95": 分位数(总耗时, 95) / 1e6,
+                "p99": 分位数(总耗时, 99) / 1e6,
+            }
+            for 阶段 in 阶段列表:
+                项[阶段] = sum(self._耗时[阶段][i] for i in 位置) / max(1, len(位置)) / 1e6
+            结果[名称] = 项
+        return 结果
+
+    def 绘制叠加层(self, 表面, 位置=(8, 8)):
+        """在表面左上角绘制帧耗时分位数
+
+        参数:
+            表面: 目标pygame表面
+            位置: 叠加层左上角坐标
+
+        返回:
+            pygame.Rect: 叠加层所占区域，未显示时返回None
+        """
+        if not self.显示叠加层 or self.帧数 == 0:
+            return None
+
+        现在 = self.获取时间()
+        if self._叠加层表面 is None or 现在 - self._叠加层刷新时间 >= 叠加层刷新间隔:
+            self._叠加层表面 = self._生成叠加层()
+            self._叠加层刷新时间 = 现在
+        return 表面.blit(self._叠加层表面, 位置)
+
+    def _生成叠加层(self):
+        总耗时 = sorted(self.帧耗时())
+        行列表 = [
+            f"frame p50 {分位数(总耗时, 50) / 1e6:.2f}  p95 {分位数(总耗时, 95) / 1e6:.2f}"
+            f"  p99 {分位数(总耗时, 99) / 1e6:.2f} ms",
+        ]
+        位置 = list(self._有效位置())
+        for 阶段 in 阶段列表:
+            列 = self._耗时[阶段]
+            平均 = sum(列[i] for i in 位置) / max(1, len(位置)) / 1e6
+            行列表.append(f"{阶段显示名[阶段]:<8} {平均:.2f} ms")
+
+        文本列表 = [渲染文本(行, (255, 255, 0), 20) for 行 in 行列表]
+        宽度 = max(t.get_width() for t in 文本列表) + 12
+        行高 = 文本列表[0].get_height() + 2
+        叠加层 = pygame.Surface((宽度, 行高 * len(文本列表) + 8))
+        叠加层.fill((0, 0, 0))
+        for i, 文本 in enumerate(文本列表):
+            叠加层.blit(文本, (6, 4 + i * 行高))
+        return 叠加层
+
+    def 导出CSV(self, 路径=None):
+        """把缓冲区中的帧写入CSV文件
+
+        参数:
+            路径(str): 输出路径，None表示使用CSV路径
+
+        返回:
+            str: 写入的路径，没有路径时返回None
+        """
+        路径 = 路径 or self.CSV路径
+        if not 路径:
+            return None
+        with open(路径, "w", newline="", encoding="utf-8") as f:
+            写入器 = csv.writer(f)
+            写入器.writerow(["帧", "界面"] + [f"{阶段}_ns" for 阶段 in 阶段列表] + ["总计_ns"])
+            for i in self._有效位置():
+                耗时 = [self._耗时[阶段][i] for 阶段 in 阶段列表]
+                写入器.writerow([self._帧序号[i], self._界面[i]] + 耗时 + [sum(耗时)])
+        return 路径
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+界面注册表
+按名称登记界面所在的模块和类，第一次切换到界面时才导入模块并创建实例，
+启动时只为第一个界面付出代价。模块缺失或出错只在切换到该界面时报告，
+不影响其他界面。空闲时可以逐个预热尚未创建的界面。
+"""
+
+import importlib
+
+# 空闲预热：停在主菜单且这么久（毫秒）没有输入时开始创建其他界面，每隔预热间隔创建一个
+预热延迟 = 1000
+预热间隔 = 100
+
+
+class 界面注册表:
+    """延迟导入和创建界面的注册表"""
+
+    def __init__(self, 创建函数):
+        """初始化界面注册表
+
+        参数:
+            创建函数: 接收界面类、返回可以使用的界面实例的函数，
+                      由GUI或GUI管理器提供（传入自身、设置管理器、初始化等）
+        """
+        self._创建函数 = 创建函数
+        # 名称 -> (模块名, 类名)
+        self._定义 = {}
+        # 别名 -> 名称
+        self._别名 = {}
+        # 名称 -> 已创建的实例
+        self._实例 = {}
+        # 名称 -> 导入或创建失败时的异常，之后不再重试
+        self._失败 = {}
+
+    def 注册(self, 名称, 模块名=None, 类名=None, 实例=None, 别名=()):
+        """登记一个界面
+
+        参数:
+            名称(str): 界面名称
+            模块名(str): 界面类所在的模块，第一次使用时才导入
+            类名(str): 界面类名
+            实例: 已经创建好的界面实例，指定时忽略模块名和类名
+            别名(tuple): 也可以用来切换到这个界面的其他名称
+        """
+        if 实例 is not None:
+            self._实例[名称] = 实例
+        else:
+            self._定义[名称] = (模块名, 类名)
+            self._实例.pop(名称, None)
+        self._失败.pop(名称, None)
+        for 其他名称 in 别名:
+            self._别名[其他名称] = 名称
+
+    def 规范名称(self, 名称):
+        """把别名换成登记时的名称"""
+        return self._别名.get(名称, 名称)
+
+    def __contains__(self, 名称):
+        名称 = self.规范名称(名称)
+        return 名称 in self._定义 or 名称 in self._实例
+
+    def 已创建(self, 名称):
+        """界面是否已经创建"""
+        return self.规范名称(名称) in self._实例
+
+    def 获取(self, 名称):
+        """获取界面实例，第一次获取时导入模块并创建
+
+        参数:
+            名称(str): 界面名称或别名
+
+        返回:
+            界面实例；未登记或加载失败时打印原因并返回None
+        """
+        名称 = self.规范名称(名称)
+        实例 = self._实例.get(名称)
+        if 实例 is not None:
+            return 实例
+
+        if 名称 not in self._定义:
+            print(f"错误：界面'{名称}'不存在")
+            return None
+        if 名称 not in self._失败:
+            实例 = self._创建(名称)
+            if 实例 is not None:
+                return 实例
+        print(f"错误：界面'{名称}'无法加载：{self._失败[名称]}")
+        return None
+
+    def _创建(self, 名称):
+        """导入模块并创建界面，失败时记录异常并返回None"""
+        模块名, 类名 = self._定义[名称]
+        try:
+            界面类 = getattr(importlib.import_module(模块名), 类名)
+            实例 = self._创建函数(界面类)
+        except Exception as e:
+            self._失败[名称] = e
+            return None
+        self._实例[名称] = 实例
+        return 实例
+
+    def 待创建(self):
+        """返回已登记、尚未创建也没有失败过的界面名称"""
+        return [名称 for 名称 in self._定义 if 名称 not in self._实例 and 名称 not in self._失败]
+
+    def 预热一个(self):
+        """创建一个尚未创建的界面，供空闲时调用；失败不打印，切换到该界面时才报告
+
+        返回:
+            str: 这次尝试创建的界面名称，没有待创建的界面时返回None
+        """
+        for 名称 in self.待创建():
+            self._创建(名称)
+            return 名称
+        return None
+
+    def 实例列表(self):
+        """返回已创建的界面实例"""
+        return list(self._实例.values())
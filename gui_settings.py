@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import pygame
+from gui_fonts import 渲染文本
 from gui_base import 界面基类
 
 class 设置界面(界面基类):
@@ -128,8 +128,7 @@ class 设置界面(界面基类):
         屏幕宽度 = 屏幕.get_width()
         
         # 绘制标题
-        标题字体 = pygame.font.Font(None, 48)
-        标题文本 = 标题字体.render("游戏设置", True, (255, 255, 255))
+        标题文本 = 渲染文本("游戏设置", (255, 255, 255), 48)
         标题位置 = ((屏幕宽度 - 标题文本.get_width()) // 2, 20)
         屏幕.blit(标题文本, 标题位置)
         
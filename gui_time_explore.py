@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import pygame
+from gui_assets import 缩放图片
 from gui_base import 界面基类
 from gui_components import 按钮, 文本标签, 图像标签
 
@@ -52,8 +52,7 @@ class 时间探索界面(界面基类):
         
         # 创建时间线图
         try:
-            时间线图 = pygame.image.load("picture/timeline.png")
-            时间线图 = pygame.transform.scale(时间线图, (700, 120))
+            时间线图 = 缩放图片("picture/timeline.png", (700, 120))
             时间线标签 = 图像标签(
                 self.gui,
                 时间线图,
@@ -1,18 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import bisect
 import datetime
 import random
+import importlib.util
 import json
 import os
+from contextlib import contextmanager
 
-try:
-    from chinese_calendar import is_holiday, get_holiday_detail
-    CHINESE_CALENDAR_AVAILABLE = True
-except ImportError:
-    CHINESE_CALENDAR_AVAILABLE = False
-    print("警告：未找到chinese_calendar库，节日功能将使用模拟数据")
-    print("尝试：pip install chinese-calendar")
+# chinese_calendar在第一次生成节日表时才导入，启动时只检查是否安装
+农历库规格 = importlib.util.find_spec("chinese_calendar")
+CHINESE_CALENDAR_AVAILABLE = 农历库规格 is not None
+_已提示缺少农历库 = False
+
+
+def _提示缺少农历库():
+    """第一次用到节日数据时提示没有chinese_calendar库，每个进程只提示一次"""
+    global _已提示缺少农历库
+    if not _已提示缺少农历库:
+        _已提示缺少农历库 = True
+        print("警告：未找到chinese_calendar库，节日功能将使用模拟数据")
+        print("尝试：pip install chinese-calendar")
 
 # 农历春节日期映射表（公历日期，1996-2010）
 春节日期表 = {
@@ -149,22 +158,143 @@ except ImportError:
     2020: ["小品《走过场》", "歌曲《爱是桥梁》", "小品《父子情深》"]
 }
 
+class 节日日历:
+    """节日查询表，按年份惰性生成 日期序数 -> 节日名 的映射"""
+    
+    def __init__(self, 使用农历库=CHINESE_CALENDAR_AVAILABLE):
+        """初始化节日日历
+        
+        参数:
+            使用农历库(bool): 是否用chinese_calendar补充内置表中没有的节日
+        """
+        self.使用农历库 = 使用农历库
+        self._年份表 = {}
+        self._有序日期 = {}
+    
+    def _生成年份(self, 年份):
+        """生成一年的节日表，优先级与逐项判断时一致：春节、节日表顺序、农历库"""
+        表 = {}
+        if 年份 in 春节日期表:
+            月, 日 = 春节日期表[年份]
+            表[datetime.date(年份, 月, 日).toordinal()] = "春节"
+        
+        for 节日名, 日期信息 in 节日表.items():
+            if isinstance(日期信息, dict):
+                日期信息 = 日期信息.get(年份)
+                if 日期信息 is None:
+                    continue
+            月, 日 = 日期信息
+            表.setdefault(datetime.date(年份, 月, 日).toordinal(), 节日名)
+        
+        if self.使用农历库:
+            self._补充农历库节日(年份, 表)
+        elif not CHINESE_CALENDAR_AVAILABLE:
+            _提示缺少农历库()
+        
+        self._年份表[年份] = 表
+        self._有序日期[年份] = sorted(表)
+        return 表
+    
+    @staticmethod
+    def _补充农历库节日(年份, 表):
+        """用chinese_calendar补充法定节假日（不含没有节日名的普通周末）"""
+        try:
+            from chinese_calendar import is_holiday, get_holiday_detail
+        except ImportError:
+            _提示缺少农历库()
+            return
+        日期 = datetime.date(年份, 1, 1)
+        一天 = datetime.timedelta(days=1)
+        try:
+            while 日期.year == 年份:
+                if is_holiday(日期):
+                    节日名 = get_holiday_detail(日期)[1]
+                    if 节日名:
+                        表.setdefault(日期.toordinal(), 节日名)
+                日期 += 一天
+        except (NotImplementedError, ValueError):
+            # 超出chinese_calendar支持的年份范围
+            pass
+    
+    def 预置(self, 年份表):
+        """导入预先生成的节日表（如热启动快照中的），已生成的年份保持不变
+        
+        参数:
+            年份表(dict): 年份 -> {日期序数: 节日名}，须与本日历的使用农历库设置一致
+        """
+        for 年份, 表 in 年份表.items():
+            if 年份 not in self._年份表:
+                self._年份表[年份] = 表
+                self._有序日期[年份] = sorted(表)
+    
+    def 获取年份(self, 年份):
+        """获取一年的节日表
+        
+        返回:
+            dict: 日期序数 -> 节日名
+        """
+        表 = self._年份表.get(年份)
+        if 表 is None:
+            表 = self._生成年份(年份)
+        return 表
+    
+    def 查询(self, 日期):
+        """查询某天的节日
+        
+        参数:
+            日期(date): 日期
+            
+        返回:
+            str: 节日名，不是节日时返回None
+        """
+        return self.获取年份(日期.year).get(日期.toordinal())
+    
+    def 下一个节日(self, 日期, 包含当天=False):
+        """查询指定日期之后最近的节日
+        
+        参数:
+            日期(date): 起始日期
+            包含当天(bool): 起始日期本身是节日时是否返回它
+            
+        返回:
+            tuple: (节日日期, 节日名)
+        """
+        序数 = 日期.toordinal()
+        年份 = 日期.year
+        # 每年都有元旦，最多查到下一年
+        while True:
+            表 = self.获取年份(年份)
+            有序日期 = self._有序日期[年份]
+            位置 = (bisect.bisect_left if 包含当天 else bisect.bisect_right)(有序日期, 序数)
+            if 位置 < len(有序日期):
+                节日序数 = 有序日期[位置]
+                return datetime.date.fromordinal(节日序数), 表[节日序数]
+            年份 += 1
+
+
 class 节日系统:
     """节日系统类，处理各类节日事件和效果"""
     
+    # 节日日历只依赖静态数据，所有实例共用
+    日历 = 节日日历()
+    
     def __init__(self, 数据保存路径="data"):
         """初始化节日系统
         
         参数:
-            数据保存路径(str): 节日数据保存路径
+            数据保存路径(str): 节日数据保存路径，为None时只在内存中保存（用于无头模拟）
         """
         self.数据保存路径 = 数据保存路径
         self._确保目录存在()
         self.节日数据 = self._加载节日数据()
+        self._有未保存修改 = False
+        self._批量深度 = 0
         self.当前区域 = "北方"  # 默认区域
         
     def _确保目录存在(self):
         """确保数据目录存在"""
+        if self.数据保存路径 is None:
+            return
         if not os.path.exists(self.数据保存路径):
             os.makedirs(self.数据保存路径)
     
@@ -174,16 +304,25 @@ class 节日系统:
         返回:
             dict: 节日数据字典
         """
-        节日数据文件 = os.path.join(self.数据保存路径, "holiday_events.json")
+        if self.数据保存路径 is not None:
+            节日数据文件 = os.path.join(self.数据保存路径, "holiday_events.json")
+            
+            if os.path.exists(节日数据文件):
+                try:
+                    with open(节日数据文件, "r", encoding="utf-8") as f:
+                        return json.load(f)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    print("节日数据文件损坏，使用默认数据")
         
-        if os.path.exists(节日数据文件):
-            try:
-                with open(节日数据文件, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                print("节日数据文件损坏，使用默认数据")
+        return self._默认节日数据()
+    
+    @staticmethod
+    def _默认节日数据():
+        """生成空白的节日数据
         
-        # 默认节日数据
+        返回:
+            dict: 节日数据字典
+        """
         return {
             "已触发节日": [],
             "收集的春联": [],
@@ -193,11 +332,62 @@ class 节日系统:
         }
     
     def _保存节日数据(self):
-        """保存节日数据"""
+        """记录节日数据已修改，不在批量修改中时立即写入文件"""
+        self._有未保存修改 = True
+        if self._批量深度 == 0:
+            self.刷新()
+    
+    @contextmanager
+    def 批量修改(self):
+        """批量修改节日数据，结束时只写入一次文件
+        
+        可以嵌套使用，最外层结束时才写入。
+        """
+        self._批量深度 += 1
+        try:
+            yield self
+        finally:
+            self._批量深度 -= 1
+            if self._批量深度 == 0:
+                self.刷新()
+    
+    def 刷新(self):
+        """把未保存的修改写入文件
+        
+        写入临时文件后替换原文件，一次修改只需一次fsync。
+        
+        返回:
+            bool: 是否写入了文件
+        """
+        if not self._有未保存修改:
+            return False
+        self._有未保存修改 = False
+        if self.数据保存路径 is None:
+            return False
         节日数据文件 = os.path.join(self.数据保存路径, "holiday_events.json")
+        临时文件 = 节日数据文件 + ".tmp"
+        
+        with open(临时文件, "w", encoding="utf-8") as f:
+            json.dump(self.节日数据, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(临时文件, 节日数据文件)
+        return True
+    
+    def 重置节日数据(self):
+        """清空所有节日记录，用于开始新的一局"""
+        self.节日数据 = self._默认节日数据()
+        self._保存节日数据()
+    
+    def 载入节日数据(self, 节日数据):
+        """用存档中的节日记录替换当前数据
         
-        with open(节日数据文件, "w", encoding="utf-8") as f:
-            json.dump(self.节日数据, f, ensure_ascii=False, indent=4)
+        参数:
+            节日数据(dict): 节日数据字典
+        """
+        self.节日数据 = self._默认节日数据()
+        self.节日数据.update(节日数据)
+        self._保存节日数据()
     
     def 设置区域(self, 区域):
         """设置玩家所在区域（影响节日习俗）
@@ -245,32 +435,22 @@ class 节日系统:
         返回:
             tuple: (是否节日, 节日名称)
         """
-        # 检查春节
-        if self.是否春节(年份, 月, 日):
-            return (True, "春节")
+        节日名 = self.日历.查询(datetime.date(年份, 月, 日))
+        if 节日名 is None:
+            return (False, None)
+        return (True, 节日名)
+    
+    def 下一个节日(self, 日期, 包含当天=False):
+        """查询指定日期之后最近的节日
         
-        # 检查其他节日
-        for 节日名, 日期信息 in 节日表.items():
-            if isinstance(日期信息, tuple):
-                节日月, 节日日 = 日期信息
-                if 月 == 节日月 and 日 == 节日日:
-                    return (True, 节日名)
-            elif isinstance(日期信息, dict) and 年份 in 日期信息:
-                节日月, 节日日 = 日期信息[年份]
-                if 月 == 节日月 and 日 == 节日日:
-                    return (True, 节日名)
-                    
-        # 使用chinese_calendar库（如果可用）
-        if CHINESE_CALENDAR_AVAILABLE:
-            try:
-                日期 = datetime.date(年份, 月, 日)
-                if is_holiday(日期):
-                    节日名 = get_holiday_detail(日期)[1]
-                    return (True, 节日名)
-            except:
-                pass
-                
-        return (False, None)
+        参数:
+            日期(date): 起始日期
+            包含当天(bool): 起始日期本身是节日时是否返回它
+            
+        返回:
+            tuple: (节日日期, 节日名)
+        """
+        return self.日历.下一个节日(日期, 包含当天)
     
     def 计算压岁钱(self, 年份, 亲戚数量=10):
         """计算指定年份的压岁钱总额
@@ -9,9 +9,7 @@
 import os
 import sys
 import argparse
-import pygame
 from game_engine import 游戏引擎
-from gui import GUI
 
 def main():
     """程序主入口点"""
@@ -23,20 +21,29 @@ def main():
                         help='禁用游戏音效')
     parser.add_argument('--图形界面', action='store_true', default=False,
                         help='使用图形界面模式(需要pygame库)')
+    parser.add_argument('--性能分析', nargs='?', const='frame_profile.csv', default=None,
+                        metavar='CSV路径',
+                        help='显示帧耗时叠加层(F3切换)，退出时导出CSV(默认frame_profile.csv)')
     args = parser.parse_args()
     
     try:
         # 创建游戏引擎
         引擎 = 游戏引擎(使用高级界面=args.高级界面, 使用图形界面=args.图形界面)
         
-        # 初始化GUI
-        gui = GUI(宽度=800, 高度=600)
+        # 初始化GUI；文本模式不导入gui和pygame，启动更快
+        gui = None
+        if args.图形界面:
+            from gui import GUI
+            gui = GUI(宽度=800, 高度=600)
+            if args.性能分析:
+                gui.启用性能分析(args.性能分析)
         
         # 启动游戏
         引擎.启动游戏()
         
         # 运行GUI主循环
-        gui.运行()
+        if gui is not None:
+            gui.运行()
     except KeyboardInterrupt:
         print("\n游戏被中断")
     except Exception as e:
@@ -44,8 +51,9 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
-        # 确保程序正常退出
-        pygame.quit()
+        # 确保程序正常退出；只有导入过pygame时才需要关闭
+        if "pygame" in sys.modules:
+            sys.modules["pygame"].quit()
         sys.exit(0)
 
 if __name__ == "__main__":
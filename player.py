@@ -1,8 +1,142 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from collections.abc import Sequence
+
 import config
 
+
+class 名称编号表:
+    """把名称映射为从0开始的整数编号，位集合中的第i位表示编号为i的名称"""
+    
+    def __init__(self):
+        self._编号 = {}
+        self._名称 = []
+    
+    def 编号(self, 名称):
+        """获取名称的编号，第一次出现时分配新编号"""
+        编号 = self._编号.get(名称)
+        if 编号 is None:
+            编号 = self._编号[名称] = len(self._名称)
+            self._名称.append(名称)
+        return 编号
+    
+    def 批量编号(self, 名称列表):
+        """获取一组名称的编号，新名称依次分配编号
+        
+        参数:
+            名称列表(list): 名称
+            
+        返回:
+            list: 对应的编号
+        """
+        try:
+            return list(map(self._编号.__getitem__, 名称列表))
+        except KeyError:
+            return [self.编号(名称) for 名称 in 名称列表]
+    
+    def 查找(self, 名称):
+        """获取名称的编号，没有登记过时返回None，不分配新编号"""
+        return self._编号.get(名称)
+    
+    def 名称(self, 编号):
+        """获取编号对应的名称"""
+        return self._名称[编号]
+
+
+# 进程内共享的编号表，玩家进度只保存编号位集合，存档和pickle中仍然保存名称
+事件编号表 = 名称编号表()
+收藏品编号表 = 名称编号表()
+
+
+def _构建位集合(编号列表):
+    """一次构建包含所有编号的位集合(bytearray)，编号不能重复"""
+    if not 编号列表:
+        return bytearray()
+    掩码 = sum(map((1).__lshift__, 编号列表))
+    return bytearray(掩码.to_bytes(max(编号列表) // 8 + 1, "little"))
+
+
+def _测试位(位集合, 编号):
+    """位集合(bytearray)中编号对应的位是否为1"""
+    字节 = 编号 >> 3
+    return 字节 < len(位集合) and 位集合[字节] >> (编号 & 7) & 1 == 1
+
+
+def _置位(位集合, 编号):
+    """把位集合(bytearray)中编号对应的位置1，长度不够时补零"""
+    字节 = 编号 >> 3
+    if 字节 >= len(位集合):
+        位集合.extend(bytes(字节 + 1 - len(位集合)))
+    位集合[字节] |= 1 << (编号 & 7)
+
+
+class 名称视图(Sequence):
+    """用位集合记录的一组不重复名称，按添加顺序作为只读序列使用，in判断直接查位集合
+    
+    是玩家数据的实时视图，需要独立的列表时使用copy()或list()。
+    """
+    
+    def __init__(self, 编号表, 名称列表=()):
+        """一次性为所有名称编号，重复的名称只保留第一次出现
+        
+        位集合在第一次查询或添加时一次构建，读档时只有编号的开销。
+        
+        参数:
+            编号表(名称编号表): 名称所属的编号表
+            名称列表: 初始名称
+        """
+        self._编号表 = 编号表
+        编号列表 = 编号表.批量编号(list(名称列表))
+        if len(set(编号列表)) != len(编号列表):
+            编号列表 = list(dict.fromkeys(编号列表))
+        self._顺序 = 编号列表
+        self._位集合 = None
+    
+    def _位(self):
+        """位集合，第一次使用时构建"""
+        if self._位集合 is None:
+            self._位集合 = _构建位集合(self._顺序)
+        return self._位集合
+    
+    def _添加(self, 名称):
+        """添加名称，已存在时返回False"""
+        编号 = self._编号表.编号(名称)
+        位集合 = self._位()
+        if _测试位(位集合, 编号):
+            return False
+        _置位(位集合, 编号)
+        self._顺序.append(编号)
+        return True
+    
+    def __len__(self):
+        return len(self._顺序)
+    
+    def __getitem__(self, 下标):
+        if isinstance(下标, slice):
+            return list(map(self._编号表._名称.__getitem__, self._顺序[下标]))
+        return self._编号表.名称(self._顺序[下标])
+    
+    def __iter__(self):
+        return map(self._编号表._名称.__getitem__, self._顺序)
+    
+    def __contains__(self, 名称):
+        编号 = self._编号表.查找(名称)
+        return 编号 is not None and _测试位(self._位(), 编号)
+    
+    def __eq__(self, 其他):
+        if isinstance(其他, (list, tuple, 名称视图)):
+            return list(self) == list(其他)
+        return NotImplemented
+    
+    def __repr__(self):
+        return repr(list(self))
+    
+    def copy(self):
+        """返回名称列表"""
+        return list(self)
+
+
 class 玩家角色:
     """玩家角色类，管理玩家的属性、收藏品和历史选择"""
     
@@ -16,6 +150,40 @@ class 玩家角色:
         self.历史选择 = {}
         self._更新章节()
     
+    @property
+    def 收藏品(self):
+        """按获得顺序排列的收藏品名称视图"""
+        return self._收藏品
+    
+    @收藏品.setter
+    def 收藏品(self, 名称列表):
+        self._收藏品 = 名称视图(收藏品编号表, 名称列表)
+    
+    @property
+    def 已触发事件(self):
+        """按触发顺序排列的事件名称视图"""
+        return self._已触发事件
+    
+    @已触发事件.setter
+    def 已触发事件(self, 名称列表):
+        self._已触发事件 = 名称视图(事件编号表, 名称列表)
+    
+    def __getstate__(self):
+        """pickle时保存名称列表而不是编号，编号只在当前进程内有效"""
+        状态 = {键: 值 for 键, 值 in self.__dict__.items() if 键 not in ("_收藏品", "_已触发事件")}
+        状态["收藏品"] = list(self.收藏品)
+        状态["已触发事件"] = list(self.已触发事件)
+        return 状态
+    
+    def __setstate__(self, 状态):
+        """从pickle恢复，旧版本保存的收藏品和已触发事件列表同样适用"""
+        状态 = dict(状态)
+        收藏品 = 状态.pop("收藏品", [])
+        已触发事件 = 状态.pop("已触发事件", [])
+        self.__dict__.update(状态)
+        self.收藏品 = 收藏品
+        self.已触发事件 = 已触发事件
+    
     def _更新章节(self):
         """根据当前年份更新学习/工作章节"""
         年龄 = self.当前年份 - config.BIRTH_YEAR
@@ -62,10 +230,7 @@ class 玩家角色:
         返回:
             bool: 是否成功添加（如果已存在则返回False）
         """
-        if 收藏品名 not in self.收藏品:
-            self.收藏品.append(收藏品名)
-            return True
-        return False
+        return self._收藏品._添加(收藏品名)
     
     def 记录事件选择(self, 事件名, 选择):
         """记录玩家在特定事件中做出的选择
@@ -82,8 +247,7 @@ class 玩家角色:
         参数:
             事件名(str): 事件名称
         """
-        if 事件名 not in self.已触发事件:
-            self.已触发事件.append(事件名)
+        self._已触发事件._添加(事件名)
     
     def 获取属性进度条(self, 属性名):
         """获取属性的进度条可视化
@@ -120,8 +284,8 @@ class 玩家角色:
             "当前年份": self.当前年份,
             "当前章节": self.当前章节,
             "年龄": 年龄,
-            "收藏品数量": len(self.收藏品),
-            "已触发事件数": len(self.已触发事件)
+            "收藏品数量": len(self._收藏品),
+            "已触发事件数": len(self._已触发事件)
         }
         
     def 获取收藏品列表(self):
@@ -130,7 +294,7 @@ class 玩家角色:
         返回:
             list: 收藏品列表
         """
-        return self.收藏品.copy()
+        return list(self.收藏品)
     
     def 获取未触发事件(self, 年份事件列表):
         """获取给定年份中未触发过的事件
@@ -141,4 +305,6 @@ class 玩家角色:
         返回:
             list: 未触发过的事件列表
         """
-        return [事件 for 事件 in 年份事件列表 if 事件 not in self.已触发事件] 
\ No newline at end of file
+        # 已触发事件视图的in判断查位集合，每个事件O(1)
+        已触发事件 = self.已触发事件
+        return [事件 for 事件 in 年份事件列表 if 事件 not in 已触发事件] 
\ No newline at end of file
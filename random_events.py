@@ -4,8 +4,251 @@
 import random
 import math
 import datetime
+import importlib.util
 from collections import defaultdict
 
+# numpy只有批量接口使用，导入较慢，启动时只检查是否安装，用到时再导入
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# 年份到年代区间的查找表
+ERA_RANGES = {
+    '1996-2000': (1996, 2000),
+    '2001-2005': (2001, 2005),
+    '2006-2010': (2006, 2010),
+}
+ERA_BY_YEAR = {year: era
+               for era, (first_year, last_year) in ERA_RANGES.items()
+               for year in range(first_year, last_year + 1)}
+
+
+class FenwickSampler:
+    """
+    树状数组（Fenwick树）加权采样器
+    
+    支持O(log n)的单点权重修改和按累计权重查找，事件被标记为已触发时
+    只需把权重置零，不必重建候选列表。
+    """
+    
+    def __init__(self, weights):
+        """初始化采样器
+        
+        Args:
+            weights: 初始权重列表
+        """
+        self.size = len(weights)
+        self.weights = [0.0] * self.size
+        self.tree = [0.0] * (self.size + 1)
+        self.active = 0  # 权重大于0的项数
+        for index, weight in enumerate(weights):
+            self.update(index, weight)
+    
+    def update(self, index, weight):
+        """设置某一项的权重
+        
+        Args:
+            index: 项的下标
+            weight: 新权重
+        """
+        delta = weight - self.weights[index]
+        if delta == 0:
+            return
+        self.active += (weight > 0) - (self.weights[index] > 0)
+        self.weights[index] = weight
+        position = index + 1
+        while position <= self.size:
+            self.tree[position] += delta
+            position += position & -position
+    
+    def total(self):
+        """返回全部权重之和
+        
+        Returns:
+            float: 权重总和
+        """
+        # 全部项被置零后，浮点残差不应再被当作可抽取的权重
+        if not self.active:
+            return 0.0
+        result = 0.0
+        position = self.size
+        while position > 0:
+            result += self.tree[position]
+            position -= position & -position
+        return result
+    
+    def find(self, value):
+        """查找累计权重首次超过value的项
+        
+        Args:
+            value: [0, total)范围内的累计权重
+            
+        Returns:
+            int: 项的下标，没有权重大于0的项时返回None
+        """
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self.tree[next_position] <= value:
+                position = next_position
+                value -= self.tree[next_position]
+            step >>= 1
+        
+        # 浮点累计误差可能使结果落在末尾或零权重项上，先向前找最近的有效项，
+        # 前面没有时再向后找
+        landing = min(position, self.size - 1)
+        for index in range(landing, -1, -1):
+            if self.weights[index] > 0:
+                return index
+        for index in range(landing + 1, self.size):
+            if self.weights[index] > 0:
+                return index
+        return None
+
+
+class EventCatalogue:
+    """
+    编译后的事件目录
+    
+    按(年代, 季节, 类型)索引事件，预先计算季节修正后的基础权重。每个
+    (年代, 季节)维护一个FenwickSampler：没有属性要求的事件权重固定，
+    放在采样器中；有属性要求的事件权重取决于玩家，每次选择时单独计算。
+    """
+    
+    def __init__(self, event_system):
+        """编译事件目录
+        
+        Args:
+            event_system: RandomEventSystem实例，提供事件池和季节修正
+        """
+        self.event_system = event_system
+        self.pools_version = event_system._pools_version()
+        self.events = []
+        self.position = {}  # 事件ID -> 下标
+        self.local_position = {}  # 下标 -> 在所属年代采样器中的下标
+        self.index = defaultdict(list)  # (年代, 季节, 类型) -> 下标列表
+        self.era_events = defaultdict(list)  # 年代 -> 下标列表
+        
+        for event_type, era_events in event_system.event_pools.items():
+            for era, events in era_events.items():
+                for event in events:
+                    self.position[event['id']] = len(self.events)
+                    self.local_position[len(self.events)] = len(self.era_events[era])
+                    self.era_events[era].append(len(self.events))
+                    self.events.append(event)
+        
+        self.seasons = list(event_system.season_modifiers)
+        self.samplers = {}  # (年代, 季节) -> (采样器, 下标列表, 基础权重)
+        self.dynamic = {}  # 年代 -> 有属性要求的事件下标列表
+        for era, indices in self.era_events.items():
+            self.dynamic[era] = [i for i in indices
+                                 if self.events[i].get('attribute_requirements')]
+            for season in self.seasons:
+                modifiers = event_system.season_modifiers[season]
+                base_weights = []
+                for i in indices:
+                    event = self.events[i]
+                    weight = event['base_probability'] * modifiers.get(event['type'], 1.0)
+                    base_weights.append(max(0.01, min(0.95, weight)))
+                    self.index[(era, season, event['type'])].append(i)
+                static_weights = [0.0 if self.events[i].get('attribute_requirements') else weight
+                                  for i, weight in zip(indices, base_weights)]
+                self.samplers[(era, season)] = (FenwickSampler(static_weights), indices,
+                                                base_weights)
+        
+        self.triggered = set()
+        self.remaining = {era: len(indices) for era, indices in self.era_events.items()}  # 年代 -> 未触发事件数
+        for event_id in event_system.triggered_events:
+            self.remove(event_id)
+    
+    def get_events(self, era, season, event_type):
+        """获取指定年代、季节和类型的事件
+        
+        Args:
+            era: 年代区间
+            season: 季节
+            event_type: 事件类型
+            
+        Returns:
+            list: 事件字典列表
+        """
+        return [self.events[i] for i in self.index.get((era, season, event_type), [])]
+    
+    def remove(self, event_id):
+        """把已触发的事件移出所有采样器
+        
+        Args:
+            event_id: 事件ID
+        """
+        if event_id in self.triggered or event_id not in self.position:
+            return
+        self.triggered.add(event_id)
+        index = self.position[event_id]
+        era = self.events[index]['era']
+        self.remaining[era] -= 1
+        for season in self.seasons:
+            sampler, _, _ = self.samplers[(era, season)]
+            sampler.update(self.local_position[index], 0.0)
+    
+    def restore(self):
+        """恢复所有已移除的事件"""
+        for era, indices in self.era_events.items():
+            for season in self.seasons:
+                sampler, _, base_weights = self.samplers[(era, season)]
+                for local, i in enumerate(indices):
+                    if not self.events[i].get('attribute_requirements'):
+                        sampler.update(local, base_weights[local])
+            self.remaining[era] = len(indices)
+        self.triggered.clear()
+    
+    def select(self, era, player, current_season, rng=random):
+        """按实际触发概率加权抽取一个未触发事件
+        
+        抽取分布与RandomEventSystem.select_event相同，但固定权重部分只需
+        O(log n)。
+        
+        Args:
+            era: 年代区间
+            player: 玩家对象
+            current_season: 当前季节
+            rng: 提供random()的随机数源
+            
+        Returns:
+            dict: 选中的事件，没有可选事件时返回None
+        """
+        key = (era, current_season)
+        if key not in self.samplers:
+            return None
+        sampler, indices, _ = self.samplers[key]
+        
+        static_total = sampler.total()
+        dynamic = []
+        dynamic_total = 0.0
+        for i in self.dynamic[era]:
+            event = self.events[i]
+            if event['id'] in self.triggered:
+                continue
+            weight = self.event_system.calculate_event_probability(event, player, current_season)
+            dynamic.append((event, weight))
+            dynamic_total += weight
+        
+        total = static_total + dynamic_total
+        if total <= 0:
+            return None
+        
+        value = rng.random() * total
+        if value < static_total:
+            index = sampler.find(value)
+            if index is not None:
+                return self.events[indices[index]]
+        
+        value = max(0.0, value - static_total)
+        for event, weight in dynamic:
+            if value < weight:
+                return event
+            value -= weight
+        return dynamic[-1][0] if dynamic else None
+
+
 class RandomEventSystem:
     """
     随机事件系统
@@ -18,8 +261,12 @@ class RandomEventSystem:
     5. 自然的随机节奏：使用柏林噪声算法生成自然的随机节奏
     """
     
-    def __init__(self):
-        """初始化随机事件系统"""
+    def __init__(self, event_pools=None):
+        """初始化随机事件系统
+        
+        Args:
+            event_pools: 预先构建好的事件池（如热启动快照中的），为None时重新构建
+        """
         # 时间切片，决定事件触发频率
         self.time_slots = {
             'daily': 1,      # 每日检查一次
@@ -30,9 +277,15 @@ class RandomEventSystem:
         # 噪声种子，用于生成柏林噪声
         self.noise_seed = random.randint(1, 10000)
         
+        # 事件池变化计数，事件池被替换或增删事件时增加，事件目录据此判断是否重建
+        self._pool_changes = 0
+        
         # 事件池，按类型和年代分类
         self.event_pools = {}
-        self.initialize_event_pools()
+        if event_pools is not None:
+            self.event_pools = event_pools
+        else:
+            self.initialize_event_pools()
         
         # 事件触发阈值，噪声值超过此阈值时触发事件
         self.threshold = 0.7
@@ -40,6 +293,9 @@ class RandomEventSystem:
         # 已触发事件记录，防止重复触发
         self.triggered_events = set()
         
+        # 编译后的事件目录，首次选择事件时构建
+        self._catalogue = None
+        
         # 季节修正因子，不同季节影响事件概率
         self.season_modifiers = {
             '春': {
@@ -398,6 +654,33 @@ class RandomEventSystem:
             return 'weekly'
         return 'daily'
     
+    def is_event_window(self, ordinal):
+        """判断某天是否处于随机事件窗口
+        
+        噪声随日期连续变化，超过阈值的日子才会检查随机事件。
+        
+        Args:
+            ordinal: 日期序数（date.toordinal()）
+            
+        Returns:
+            bool: 是否处于随机事件窗口
+        """
+        return abs(math.sin(ordinal * 0.1 + self.noise_seed)) > self.threshold
+    
+    def event_window_days(self, first, last):
+        """列出一段日期中处于随机事件窗口的日子，与逐日调用is_event_window结果相同
+        
+        Args:
+            first: 起始日期序数（含）
+            last: 结束日期序数（含）
+            
+        Returns:
+            list: 处于窗口内的日期序数
+        """
+        sin, seed, threshold = math.sin, self.noise_seed, self.threshold
+        return [ordinal for ordinal in range(first, last + 1)
+                if abs(sin(ordinal * 0.1 + seed)) > threshold]
+    
     def get_noise_value(self, date):
         """使用柏林噪声算法获取噪声值
         
@@ -461,6 +744,240 @@ class RandomEventSystem:
         # 确保概率在合理范围内
         return max(0.01, min(0.95, probability))
     
+    def _compile_batch_arrays(self):
+        """把事件池编译为批量计算使用的NumPy数组，结果缓存到事件池变化为止
+        
+        Returns:
+            dict: 事件列表、基础概率、年代索引、季节修正矩阵和属性要求矩阵
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("批量计算需要numpy库，请执行：pip install numpy")
+        import numpy as np
+        
+        cached = getattr(self, '_batch_arrays', None)
+        if cached is not None and cached['version'] == self._pools_version():
+            return cached
+        
+        events = [event
+                  for era_events in self.event_pools.values()
+                  for era_list in era_events.values()
+                  for event in era_list]
+        eras = sorted({event['era'] for event in events})
+        seasons = list(self.season_modifiers)
+        
+        # 属性要求的列按首次出现顺序排列，与标量计算的乘法顺序保持一致
+        attributes = []
+        for event in events:
+            for attr in event.get('attribute_requirements', {}):
+                if attr not in attributes:
+                    attributes.append(attr)
+        
+        requirements = np.zeros((len(events), len(attributes)))
+        for i, event in enumerate(events):
+            for attr, required_value in event.get('attribute_requirements', {}).items():
+                requirements[i, attributes.index(attr)] = required_value
+        
+        cached = {
+            'version': self._pools_version(),
+            'events': events,
+            'event_ids': [event['id'] for event in events],
+            'base': np.array([event['base_probability'] for event in events], dtype=float),
+            'eras': eras,
+            'event_era': np.array([eras.index(event['era']) for event in events], dtype=np.intp),
+            'seasons': seasons,
+            # season_factor[季节, 事件]，事件类型不在修正表中时为1
+            'season_factor': np.array([[self.season_modifiers[season].get(event['type'], 1.0)
+                                        for event in events] for season in seasons]),
+            'attributes': attributes,
+            'requirements': requirements,
+        }
+        self._batch_arrays = cached
+        return cached
+    
+    @property
+    def batch_events(self):
+        """批量接口返回的概率矩阵各列对应的事件列表"""
+        return self._compile_batch_arrays()['events']
+    
+    def calculate_event_probabilities_batch(self, attributes, seasons, eras, triggered_mask=None):
+        """一次计算一批玩家对全部事件的触发概率
+        
+        与逐个调用calculate_event_probability的结果一致；不属于玩家所在年代
+        或已触发的事件概率为0。
+        
+        Args:
+            attributes: 属性名到数组(玩家数,)的字典；缺少的属性不做要求检查，
+                与标量版本中玩家没有该属性时的行为一致
+            seasons: 每个玩家当前季节的数组(玩家数,)，如'春'
+            eras: 每个玩家所在年代的数组(玩家数,)，如'1996-2000'
+            triggered_mask: 布尔数组(玩家数, 事件数)，标记各玩家已触发的事件；
+                为None时对所有玩家使用triggered_events
+            
+        Returns:
+            numpy.ndarray: 概率矩阵(玩家数, 事件数)，列顺序与batch_events相同
+        """
+        arrays = self._compile_batch_arrays()
+        import numpy as np
+        seasons = np.asarray(seasons)
+        eras = np.asarray(eras)
+        player_count = len(seasons)
+        
+        season_index = np.array([arrays['seasons'].index(season) for season in seasons],
+                                dtype=np.intp)
+        probability = arrays['base'] * arrays['season_factor'][season_index]
+        
+        # 属性要求不满足时按 当前值/要求值 降低概率
+        for column, attr in enumerate(arrays['attributes']):
+            if attr not in attributes:
+                continue
+            required = arrays['requirements'][:, column]
+            current = np.asarray(attributes[attr], dtype=float).reshape(player_count, 1)
+            has_requirement = required > 0
+            unmet = has_requirement & (current < required)
+            ratio = np.divide(current, required, out=np.ones((player_count, len(required))),
+                              where=has_requirement)
+            probability = np.where(unmet, probability * ratio, probability)
+        
+        np.clip(probability, 0.01, 0.95, out=probability)
+        
+        # 其他年代和已触发的事件不可选
+        era_lookup = {era: index for index, era in enumerate(arrays['eras'])}
+        player_era = np.array([era_lookup.get(era, -1) for era in eras], dtype=np.intp)
+        available = player_era[:, None] == arrays['event_era'][None, :]
+        if triggered_mask is None:
+            if self.triggered_events:
+                triggered = np.array([event_id in self.triggered_events
+                                      for event_id in arrays['event_ids']])
+                available &= ~triggered[None, :]
+        else:
+            available &= ~np.asarray(triggered_mask, dtype=bool)
+        
+        probability[~available] = 0.0
+        return probability
+    
+    def select_events_batch(self, attributes, seasons, eras, triggered_mask=None,
+                            random_values=None, rng=None):
+        """为一批玩家各抽取一个事件，规则与select_event的轮盘赌一致
+        
+        Args:
+            attributes, seasons, eras, triggered_mask: 同calculate_event_probabilities_batch
+            random_values: 每个玩家的[0, 1)随机数(玩家数,)，给定时结果可复现，
+                与把同一随机数用于select_event的结果一致
+            rng: numpy.random.Generator，random_values为None时用于生成随机数
+            
+        Returns:
+            tuple: (事件索引数组(玩家数,)，无可选事件时为-1；概率矩阵)
+        """
+        probability = self.calculate_event_probabilities_batch(
+            attributes, seasons, eras, triggered_mask)
+        import numpy as np
+        player_count = probability.shape[0]
+        
+        if random_values is None:
+            rng = rng if rng is not None else np.random.default_rng()
+            random_values = rng.random(player_count)
+        random_values = np.asarray(random_values, dtype=float)
+        
+        # 逐项累加，与标量版本的求和顺序一致
+        total = np.cumsum(probability, axis=1)[:, -1] if probability.shape[1] else np.zeros(player_count)
+        has_events = total > 0
+        safe_total = np.where(has_events, total, 1.0)
+        cumulative = np.cumsum(probability / safe_total[:, None], axis=1)
+        
+        # 第一个累计概率达到随机数的可选事件
+        hit = (random_values[:, None] <= cumulative) & (probability > 0)
+        selected = np.argmax(hit, axis=1)
+        selected[~(has_events & hit.any(axis=1))] = -1
+        return selected, probability
+    
+    @property
+    def catalogue(self):
+        """编译后的事件目录，事件池变化后自动重建"""
+        if self._catalogue is None or self._catalogue.pools_version != self._pools_version():
+            self._catalogue = EventCatalogue(self)
+        return self._catalogue
+    
+    @property
+    def event_pools(self):
+        """事件池，按类型和年代分类；整体替换后事件目录会重建"""
+        return self._event_pools
+    
+    @event_pools.setter
+    def event_pools(self, event_pools):
+        self._event_pools = event_pools
+        self._pool_changes += 1
+    
+    def _pools_version(self):
+        """事件池的版本标识，事件池被替换或增删事件后改变"""
+        return self._pool_changes
+    
+    def add_events(self, events):
+        """向事件池追加事件（如内容扩展包中的事件）
+        
+        Args:
+            events: 事件字典列表，每个事件必须包含'era'和'type'
+        """
+        for event in events:
+            self.event_pools.setdefault(event['type'], {}).setdefault(event['era'], []).append(event)
+        self._pool_changes += len(events)
+    
+    def remove_events(self, event_ids):
+        """从事件池移除事件（如卸载的内容扩展包中的事件）
+        
+        Args:
+            event_ids: 要移除的事件ID
+            
+        Returns:
+            int: 实际移除的事件数
+        """
+        event_ids = set(event_ids)
+        removed = 0
+        for era_events in self.event_pools.values():
+            for era, events in era_events.items():
+                kept = [event for event in events if event['id'] not in event_ids]
+                removed += len(events) - len(kept)
+                era_events[era] = kept
+        self._pool_changes += removed
+        return removed
+    
+    def get_era(self, year):
+        """获取年份所属的年代区间
+        
+        Args:
+            year: 年份
+            
+        Returns:
+            str: 年代区间，如'1996-2000'，超出范围时为'未知年代'
+        """
+        return ERA_BY_YEAR.get(year, '未知年代')
+    
+    def select_event_for_era(self, era, player, current_season):
+        """从指定年代的未触发事件中按实际概率加权选择一个事件
+        
+        与对get_applicable_event_pools的结果调用select_event等价，但使用
+        编译后的事件目录，选择开销不随事件总数线性增长。
+        
+        Args:
+            era: 年代区间
+            player: 玩家对象
+            current_season: 当前季节
+            
+        Returns:
+            dict: 选中的事件，如果没有合适的事件则返回None
+        """
+        return self.catalogue.select(era, player, current_season)
+    
+    def has_available_events(self, era):
+        """判断指定年代是否还有未触发的事件
+        
+        Args:
+            era: 年代区间
+            
+        Returns:
+            bool: 是否还有未触发的事件
+        """
+        return self.catalogue.remaining.get(era, 0) > 0
+    
     def get_applicable_event_pools(self, year, player):
         """获取适用于当前年份的事件池
         
@@ -472,14 +989,7 @@ class RandomEventSystem:
             dict: 按类型分类的适用事件池
         """
         # 确定当前年代
-        if 1996 <= year <= 2000:
-            era = '1996-2000'
-        elif 2001 <= year <= 2005:
-            era = '2001-2005'
-        elif 2006 <= year <= 2010:
-            era = '2006-2010'
-        else:
-            era = '未知年代'
+        era = self.get_era(year)
         
         # 聚合适用的事件
         applicable_pools = {}
@@ -540,6 +1050,17 @@ class RandomEventSystem:
         # 如果没有选中任何事件，返回None
         return None
     
+    def reset(self, noise_seed=None):
+        """重置已触发事件记录和噪声种子，用于开始新的一局
+        
+        Args:
+            noise_seed: 新的噪声种子，为None时随机生成
+        """
+        self.triggered_events.clear()
+        self.noise_seed = noise_seed if noise_seed is not None else random.randint(1, 10000)
+        if self._catalogue is not None:
+            self._catalogue.restore()
+    
     def trigger_event(self, event_id):
         """标记事件为已触发
         
@@ -547,6 +1068,8 @@ class RandomEventSystem:
             event_id: 事件ID
         """
         self.triggered_events.add(event_id)
+        if self._catalogue is not None:
+            self._catalogue.remove(event_id)
     
     def get_season(self, month):
         """根据月份获取当前季节
@@ -0,0 +1,496 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+紧凑二进制存档格式
+
+文件布局（第2版，小端序）:
+    文件头   魔数 b"N90S" | 格式版本 u16 | 保留 u16
+    元数据   名字 | 当前年份 u16 | 当前章节        （列存档时只需读到这里）
+    计数     当前日期序数 u32（0表示未记录） | 事件数 u16 | 收藏品数 u16 |
+             额外字符串数 u16 | 选择数 u16 | 属性数 u8 | 标志 u8 | 字符串字节长度 u32
+    字符串   已触发事件、收藏品、额外字符串依次以空字符连接的UTF-8文本
+    数值     属性字符串ID u16 × 属性数 | 属性值 i32 × 属性数 |
+             选择事件字符串ID u16 × 选择数（标志1时省略）|
+             选择类型 u8 × 选择数（仅标志2）| 选择值 i8或i32（标志4）× 选择数
+    扩展数据 长度 u32 | UTF-8 JSON对象（为空时长度为0）
+
+名字和章节为 长度 u16 + UTF-8字节。字符串ID 0起依次指向固定的属性名常量、
+已触发事件、收藏品和额外字符串，所以事件和收藏品本身不需要ID；历史选择的
+事件顺序与已触发事件相同时（通常如此）也不保存ID。数值部分用一次struct
+调用整体读写。
+
+第1版把所有名称（包括属性名）放在每个存档自己的字符串表中，事件和收藏品
+也逐个保存ID，比pickle更大也更慢，仍可读取。旧的pickle存档视为第0版，
+通过迁移表升级到当前版本。
+"""
+
+import datetime
+import functools
+import itertools
+import json
+import pickle
+import struct
+
+from player import 玩家角色
+
+魔数 = b"N90S"
+当前版本 = 2
+
+_文件头 = struct.Struct("<4sHH")
+_u16 = struct.Struct("<H")
+_u32 = struct.Struct("<I")
+
+# 历史选择值的类型标记
+_选择类型_整数 = 0
+_选择类型_字符串 = 1
+
+# 第2版的名称常量，字符串ID 0起指向这里，不写入存档；只能在末尾追加
+_常量名称 = ("学业值", "零花钱", "家庭关系", "健康值", "爱国值", "人际关系")
+_常量ID = {名称: 编号 for 编号, 名称 in enumerate(_常量名称)}
+
+_计数 = struct.Struct("<IHHHHBBI")
+
+# 计数中的标志位
+_标志_选择顺序同事件 = 1
+_标志_选择含字符串 = 2
+_标志_选择值i32 = 4
+
+
+class 存档格式错误(ValueError):
+    """存档文件无法识别或已损坏"""
+
+
+def 提取存档数据(玩家):
+    """把玩家对象转换为只含基本类型的存档数据字典
+
+    参数:
+        玩家(玩家角色): 玩家对象
+
+    返回:
+        dict: 当前版本的存档数据
+    """
+    当前日期 = getattr(玩家, "当前日期", None)
+    return {
+        "名字": 玩家.名字,
+        "当前年份": 玩家.当前年份,
+        "当前章节": 玩家.当前章节,
+        "当前日期": 当前日期.toordinal() if 当前日期 else 0,
+        "属性": dict(玩家.属性),
+        "收藏品": list(玩家.收藏品),
+        "已触发事件": list(玩家.已触发事件),
+        "历史选择": dict(玩家.历史选择),
+        "扩展": {},
+    }
+
+
+def 还原玩家(数据):
+    """根据存档数据重建玩家对象
+
+    先用当前的玩家类构造默认对象再覆盖存档中的字段，类新增的属性会
+    自动获得默认值。
+
+    参数:
+        数据(dict): 当前版本的存档数据
+
+    返回:
+        玩家角色: 玩家对象
+    """
+    玩家 = 玩家角色(数据["名字"])
+    玩家.当前年份 = 数据["当前年份"]
+    玩家._更新章节()
+    玩家.属性.update(数据["属性"])
+    # 赋值时与添加收藏品/记录已触发事件一致地去重
+    玩家.收藏品 = 数据["收藏品"]
+    玩家.已触发事件 = 数据["已触发事件"]
+    玩家.历史选择 = dict(数据["历史选择"])
+    if 数据["当前日期"]:
+        玩家.当前日期 = datetime.date.fromordinal(数据["当前日期"])
+    return 玩家
+
+
+def _打包字符串(文本):
+    """长度前缀的UTF-8字符串"""
+    字节 = 文本.encode("utf-8")
+    return _u16.pack(len(字节)) + 字节
+
+
+def 编码存档(数据):
+    """把存档数据编码为二进制（当前版本）
+
+    参数:
+        数据(dict): 当前版本的存档数据（见提取存档数据）
+
+    返回:
+        bytes: 二进制存档内容
+    """
+    事件列表 = 数据["已触发事件"]
+    收藏品列表 = 数据["收藏品"]
+    if type(事件列表) is not list or type(收藏品列表) is not list:
+        事件列表, 收藏品列表 = list(事件列表), list(收藏品列表)
+    属性 = 数据["属性"]
+    历史选择 = 数据["历史选择"]
+    额外 = []
+    编号 = {}
+
+    def 字符串ID(名称):
+        """常量、事件、收藏品以外的名称追加到额外字符串"""
+        if not 编号:
+            编号.update(zip(itertools.chain(_常量名称, 事件列表, 收藏品列表), itertools.count()))
+        值 = 编号.get(名称)
+        if 值 is None:
+            值 = 编号[名称] = len(_常量名称) + len(事件列表) + len(收藏品列表) + len(额外)
+            额外.append(名称)
+        return 值
+
+    标志 = 0
+    属性ID = [_常量ID[名称] if 名称 in _常量ID else 字符串ID(名称) for 名称 in 属性]
+
+    选择数 = len(历史选择)
+    if 选择数 == len(事件列表) and list(历史选择) == 事件列表:
+        标志 |= _标志_选择顺序同事件
+        选择ID = []
+    else:
+        选择ID = [字符串ID(名称) for 名称 in 历史选择]
+
+    值列表 = list(历史选择.values())
+    类型列表 = []
+    属性数 = len(属性)
+    属性值 = list(map(int, 属性.values()))
+    try:
+        # 通常选择都是小整数，直接按i8打包，不逐个检查类型和范围
+        数值 = _数值结构(属性数, 选择数, 标志).pack(*属性ID, *属性值, *选择ID, *值列表)
+    except struct.error:
+        if not all(type(值) is int for 值 in 值列表):
+            标志 |= _标志_选择含字符串
+            类型列表 = [_选择类型_整数 if isinstance(值, int) else _选择类型_字符串 for 值 in 值列表]
+            值列表 = [值 if isinstance(值, int) else 字符串ID(str(值)) for 值 in 值列表]
+        if 值列表 and not -128 <= min(值列表) <= max(值列表) <= 127:
+            标志 |= _标志_选择值i32
+        数值 = _数值结构(属性数, 选择数, 标志).pack(*属性ID, *属性值, *选择ID, *类型列表, *值列表)
+
+    if len(_常量名称) + len(事件列表) + len(收藏品列表) + len(额外) > 0x10000:
+        raise 存档格式错误("字符串表超过65536项")
+    字符串数 = len(事件列表) + len(收藏品列表) + len(额外)
+    字符串字节 = "\0".join(itertools.chain(事件列表, 收藏品列表, 额外)).encode("utf-8")
+    if 字符串字节.count(b"\0") != max(字符串数 - 1, 0):
+        raise 存档格式错误("名称中不能包含空字符")
+
+    扩展 = 数据.get("扩展")
+    扩展 = json.dumps(扩展, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if 扩展 else b""
+
+    return b"".join((
+        _文件头.pack(魔数, 当前版本, 0),
+        _打包字符串(数据["名字"]),
+        _u16.pack(数据["当前年份"]),
+        _打包字符串(数据["当前章节"]),
+        _计数.pack(数据["当前日期"], len(事件列表), len(收藏品列表), len(额外), 选择数, 属性数, 标志,
+                 len(字符串字节)),
+        字符串字节,
+        数值,
+        _u32.pack(len(扩展)),
+        扩展,
+    ))
+
+
+@functools.lru_cache(maxsize=256)
+def _数值结构(属性数, 选择数, 标志):
+    """第2版数值部分的struct，常见的数量组合只编译一次"""
+    格式 = f"<{属性数}H{属性数}i"
+    if not 标志 & _标志_选择顺序同事件:
+        格式 += f"{选择数}H"
+    if 标志 & _标志_选择含字符串:
+        格式 += f"{选择数}B"
+    return struct.Struct(格式 + f"{选择数}{'i' if 标志 & _标志_选择值i32 else 'b'}")
+
+
+class _读取器:
+    """顺序读取二进制数据"""
+
+    def __init__(self, 数据):
+        self.数据 = 数据
+        self.位置 = 0
+
+    def 读取(self, 结构):
+        try:
+            值 = 结构.unpack_from(self.数据, self.位置)
+        except struct.error as e:
+            raise 存档格式错误(f"存档数据不完整: {e}") from e
+        self.位置 += 结构.size
+        return 值
+
+    def 整数(self, 结构):
+        return self.读取(结构)[0]
+
+    def 字节(self, 长度):
+        if self.位置 + 长度 > len(self.数据):
+            raise 存档格式错误("存档数据不完整")
+        值 = self.数据[self.位置:self.位置 + 长度]
+        self.位置 += 长度
+        return 值
+
+    def 字符串(self):
+        return self.字节(self.整数(_u16)).decode("utf-8")
+
+
+def _读取文件头(读取):
+    """读取文件头和元数据
+
+    返回:
+        tuple: (格式版本, 元数据字典)
+    """
+    标识, 版本, _ = 读取.读取(_文件头)
+    if 标识 != 魔数:
+        raise 存档格式错误("不是九零后时光机存档")
+    元数据 = {
+        "名字": 读取.字符串(),
+        "当前年份": 读取.整数(_u16),
+        "当前章节": 读取.字符串(),
+    }
+    return 版本, 元数据
+
+
+def _解码v1(读取, 元数据):
+    """解码第1版存档正文"""
+    数量 = 读取.整数(_u32)
+    文本 = 读取.字节(读取.整数(_u32)).decode("utf-8")
+    字符串表 = 文本.split("\0") if 数量 else []
+    if len(字符串表) != 数量:
+        raise 存档格式错误("字符串表已损坏")
+
+    def 名称列表(id列表):
+        try:
+            return list(map(字符串表.__getitem__, id列表))
+        except IndexError:
+            raise 存档格式错误("存档中有无效的字符串ID") from None
+
+    数据 = dict(元数据)
+    数据["当前日期"] = 读取.整数(_u32)
+
+    数量 = 读取.整数(_u16)
+    id与值 = 读取.读取(struct.Struct(f"<{数量}H{数量}i"))
+    数据["属性"] = dict(zip(名称列表(id与值[:数量]), id与值[数量:]))
+
+    for 键 in ("收藏品", "已触发事件"):
+        数量 = 读取.整数(_u16)
+        数据[键] = 名称列表(读取.读取(struct.Struct(f"<{数量}H")))
+
+    数量 = 读取.整数(_u16)
+    字段 = 读取.读取(struct.Struct(f"<{数量}H{数量}B{数量}i"))
+    事件名列表 = 名称列表(字段[:数量])
+    类型列表 = 字段[数量:数量 * 2]
+    选择列表 = 字段[数量 * 2:]
+    if any(类型列表):
+        选择列表 = [
+            值 if 类型 == _选择类型_整数 else 名称列表((值,))[0]
+            for 类型, 值 in zip(类型列表, 选择列表)
+        ]
+    数据["历史选择"] = dict(zip(事件名列表, 选择列表))
+
+    扩展 = 读取.字节(读取.整数(_u32))
+    数据["扩展"] = json.loads(扩展.decode("utf-8")) if 扩展 else {}
+    return 数据
+
+
+def _迁移_v0到v1(数据):
+    """把旧pickle存档的玩家对象字段转换为第1版存档数据"""
+    当前日期 = 数据.get("当前日期")
+    return {
+        "名字": 数据.get("名字", ""),
+        "当前年份": 数据["当前年份"],
+        "当前章节": 数据.get("当前章节", ""),
+        "当前日期": 当前日期.toordinal() if isinstance(当前日期, datetime.date) else 0,
+        "属性": dict(数据.get("属性", {})),
+        "收藏品": list(数据.get("收藏品", [])),
+        "已触发事件": list(数据.get("已触发事件", [])),
+        "历史选择": dict(数据.get("历史选择", {})),
+        "扩展": {},
+    }
+
+
+def _解码v2(读取, 元数据):
+    """解码第2版存档正文"""
+    当前日期, 事件数, 收藏品数, 额外数, 选择数, 属性数, 标志, 字节长度 = 读取.读取(_计数)
+    字符串数 = 事件数 + 收藏品数 + 额外数
+    文本 = 读取.字节(字节长度).decode("utf-8")
+    字符串表 = 文本.split("\0") if 字符串数 else []
+    if len(字符串表) != 字符串数:
+        raise 存档格式错误("字符串表已损坏")
+    全部名称 = [*_常量名称, *字符串表]
+
+    def 名称列表(id列表):
+        try:
+            return list(map(全部名称.__getitem__, id列表))
+        except IndexError:
+            raise 存档格式错误("存档中有无效的字符串ID") from None
+
+    字段 = 读取.读取(_数值结构(属性数, 选择数, 标志))
+    数据 = dict(元数据)
+    数据["当前日期"] = 当前日期
+    数据["属性"] = dict(zip(名称列表(字段[:属性数]), 字段[属性数:属性数 * 2]))
+    位置 = 属性数 * 2
+    事件列表 = 字符串表[:事件数]
+    数据["已触发事件"] = 事件列表
+    数据["收藏品"] = 字符串表[事件数:事件数 + 收藏品数]
+
+    if 标志 & _标志_选择顺序同事件:
+        if 选择数 != 事件数:
+            raise 存档格式错误("历史选择与已触发事件数量不一致")
+        选择事件 = 事件列表
+    else:
+        选择事件 = 名称列表(字段[位置:位置 + 选择数])
+        位置 += 选择数
+    if 标志 & _标志_选择含字符串:
+        类型列表 = 字段[位置:位置 + 选择数]
+        位置 += 选择数
+        选择列表 = [
+            值 if 类型 == _选择类型_整数 else 名称列表((值,))[0]
+            for 类型, 值 in zip(类型列表, 字段[位置:])
+        ]
+    else:
+        选择列表 = 字段[位置:]
+    数据["历史选择"] = dict(zip(选择事件, 选择列表))
+
+    扩展 = 读取.字节(读取.整数(_u32))
+    数据["扩展"] = json.loads(扩展.decode("utf-8")) if 扩展 else {}
+    return 数据
+
+
+def _迁移_v1到v2(数据):
+    """第1版和第2版的存档数据字段相同，只是编码不同"""
+    return 数据
+
+
+# 各版本正文解码器
+_解码器 = {
+    1: _解码v1,
+    2: _解码v2,
+}
+
+# 迁移表：版本号 -> 把该版本数据升级到下一版本的函数
+_迁移表 = {
+    0: _迁移_v0到v1,
+    1: _迁移_v1到v2,
+}
+
+
+def 迁移到当前版本(数据, 版本):
+    """依次应用迁移函数，把旧版本的存档数据升级到当前版本
+
+    参数:
+        数据(dict): 存档数据
+        版本(int): 数据所属的格式版本
+
+    返回:
+        dict: 当前版本的存档数据
+    """
+    if 版本 > 当前版本:
+        raise 存档格式错误(f"存档版本 {版本} 高于游戏支持的版本 {当前版本}，请升级游戏")
+    while 版本 < 当前版本:
+        数据 = _迁移表[版本](数据)
+        版本 += 1
+    return 数据
+
+
+def 解码存档(字节数据):
+    """解码二进制存档
+
+    参数:
+        字节数据(bytes): 二进制存档内容
+
+    返回:
+        dict: 当前版本的存档数据
+    """
+    读取 = _读取器(字节数据)
+    版本, 元数据 = _读取文件头(读取)
+    if 版本 > 当前版本:
+        raise 存档格式错误(f"存档版本 {版本} 高于游戏支持的版本 {当前版本}，请升级游戏")
+    if 版本 not in _解码器:
+        raise 存档格式错误(f"不支持的存档版本: {版本}")
+    return 迁移到当前版本(_解码器[版本](读取, 元数据), 版本)
+
+
+def 从pickle导入(字节数据):
+    """导入旧的pickle存档（第0版）
+
+    参数:
+        字节数据(bytes): pickle存档内容
+
+    返回:
+        dict: 当前版本的存档数据
+    """
+    try:
+        旧玩家 = pickle.loads(字节数据)
+    except Exception as e:
+        raise 存档格式错误(f"无法读取旧版存档: {e}") from e
+    # 玩家角色的pickle状态中收藏品和已触发事件是名称列表
+    状态 = 旧玩家.__getstate__() if isinstance(旧玩家, 玩家角色) else vars(旧玩家)
+    return 迁移到当前版本(dict(状态), 0)
+
+
+def 读取元数据(字节数据):
+    """只读取存档的名字、年份和章节
+
+    二进制存档只解析文件头；旧pickle存档要完整反序列化才能读到这些字段，
+    不在这里读取，只在真正加载时导入。
+
+    参数:
+        字节数据(bytes): 存档文件内容（二进制存档可以只是开头部分）
+
+    返回:
+        dict: 包含名字、当前年份、当前章节，旧pickle存档返回None
+    """
+    if not 是新格式(字节数据):
+        return None
+    return _读取文件头(_读取器(字节数据))[1]
+
+
+def 读取文件元数据(存档路径, 预读字节=512):
+    """从存档文件读取元数据，二进制存档只读取文件开头
+
+    参数:
+        存档路径(str): 存档文件路径
+        预读字节(int): 先读取的字节数，文件头更长时再读取整个文件
+
+    返回:
+        dict: 包含名字、当前年份、当前章节，旧pickle存档返回None
+    """
+    with open(存档路径, "rb") as f:
+        开头 = f.read(预读字节)
+        if not 是新格式(开头):
+            return None
+        try:
+            return 读取元数据(开头)
+        except 存档格式错误:
+            return 读取元数据(开头 + f.read())
+
+
+def 是新格式(字节数据):
+    """判断数据是否为二进制存档格式"""
+    return 字节数据[:len(魔数)] == 魔数
+
+
+def 读取存档数据(字节数据):
+    """读取任意版本的存档数据，自动识别二进制格式和旧pickle格式
+
+    参数:
+        字节数据(bytes): 存档文件内容
+
+    返回:
+        dict: 当前版本的存档数据
+    """
+    if 是新格式(字节数据):
+        return 解码存档(字节数据)
+    return 从pickle导入(字节数据)
+
+
+def 读取存档(字节数据):
+    """读取任意版本的存档，自动识别二进制格式和旧pickle格式
+
+    参数:
+        字节数据(bytes): 存档文件内容
+
+    返回:
+        玩家角色: 玩家对象
+    """
+    return 还原玩家(读取存档数据(字节数据))
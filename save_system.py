@@ -2,8 +2,16 @@
 # -*- coding: utf-8 -*-
 
 import os
-import pickle
+import json
 import datetime
+import tempfile
+import threading
+
+import save_format
+
+# 存档索引文件，保存每个存档的名字、年份、章节、修改时间和大小
+索引文件名 = "save_index.json"
+索引版本 = 1
 
 class 存档系统:
     """游戏存档管理系统"""
@@ -15,6 +23,11 @@ class 存档系统:
             存档目录(str): 存档文件保存目录
         """
         self.存档目录 = 存档目录
+        self.索引路径 = os.path.join(存档目录, 索引文件名)
+        self._索引 = None
+        # 自动存档在后台线程写入，索引的读写需要加锁；存档文件通过替换写入，
+        # 编码和写盘不持有锁，不会让读取存档和列出存档等待磁盘I/O
+        self._锁 = threading.RLock()
         self._确保目录存在()
     
     def _确保目录存在(self):
@@ -22,26 +35,65 @@ class 存档系统:
         if not os.path.exists(self.存档目录):
             os.makedirs(self.存档目录)
     
-    def 保存游戏(self, 玩家, 存档名=None):
+    def 保存游戏(self, 玩家, 存档名=None, 扩展=None):
         """保存游戏状态
         
         参数:
             玩家(Player): 玩家对象
             存档名(str): 自定义存档名，若未指定则使用默认格式
+            扩展(dict): 随存档保存的其他系统数据（如节日数据）
             
         返回:
             str: 存档文件路径
         """
-        self._确保目录存在()
-        
         if 存档名 is None:
             当前时间 = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             存档名 = f"{玩家.名字}_{当前时间}.save"
         
+        数据 = save_format.提取存档数据(玩家)
+        if 扩展:
+            数据["扩展"] = 扩展
+        return self.写入存档数据(数据, 存档名)
+    
+    def 写入存档数据(self, 数据, 存档名):
+        """编码并写入存档数据
+        
+        先写入临时文件再替换原存档，写入中途崩溃不会留下截断的存档。
+        只有更新索引时持有锁。
+        
+        参数:
+            数据(dict): 存档数据（见save_format.提取存档数据）
+            存档名(str): 存档文件名
+            
+        返回:
+            str: 存档文件路径
+        """
+        内容 = save_format.编码存档(数据)
         存档路径 = os.path.join(self.存档目录, 存档名)
         
-        with open(存档路径, "wb") as f:
-            pickle.dump(玩家, f)
+        with self._锁:
+            self._确保目录存在()
+            # 写入会改变目录修改时间，要在写入之前检查索引
+            索引是最新的 = self._索引是最新的()
+        
+        文件描述符, 临时路径 = tempfile.mkstemp(dir=self.存档目录, suffix=".tmp")
+        try:
+            with os.fdopen(文件描述符, "wb") as f:
+                f.write(内容)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(临时路径, 存档路径)
+        except OSError:
+            try:
+                os.remove(临时路径)
+            except OSError:
+                pass
+            raise
+        
+        with self._锁:
+            if 索引是最新的:
+                self._索引["存档"][存档名] = self._生成索引项(存档路径, 数据)
+                self._写入索引()
         
         return 存档路径
     
@@ -54,6 +106,18 @@ class 存档系统:
         返回:
             Player: 玩家对象，加载失败则返回None
         """
+        数据 = self.加载存档数据(存档名)
+        return save_format.还原玩家(数据) if 数据 else None
+    
+    def 加载存档数据(self, 存档名):
+        """读取存档数据，包括扩展数据
+        
+        参数:
+            存档名(str): 存档文件名或路径
+            
+        返回:
+            dict: 存档数据，加载失败则返回None
+        """
         # 如果只提供文件名，添加目录路径
         if os.path.dirname(存档名) == "":
             存档路径 = os.path.join(self.存档目录, 存档名)
@@ -62,10 +126,21 @@ class 存档系统:
             
         try:
             with open(存档路径, "rb") as f:
-                return pickle.load(f)
-        except (FileNotFoundError, pickle.PickleError) as e:
+                内容 = f.read()
+            # 自动识别二进制格式，旧的pickle存档会被迁移后读入
+            数据 = save_format.读取存档数据(内容)
+        except (FileNotFoundError, save_format.存档格式错误) as e:
             print(f"加载存档失败: {e}")
             return None
+        
+        # 存档目录中的旧pickle存档改写为二进制格式，同时更新索引中的名字和年份
+        if (not save_format.是新格式(内容)
+                and os.path.dirname(os.path.abspath(存档路径)) == os.path.abspath(self.存档目录)):
+            try:
+                self.写入存档数据(数据, os.path.basename(存档路径))
+            except (OSError, save_format.存档格式错误) as e:
+                print(f"转换旧存档失败: {e}")
+        return 数据
     
     def 列出存档(self):
         """列出所有可用的存档文件
@@ -73,25 +148,141 @@ class 存档系统:
         返回:
             list: 存档文件信息列表，每项包含 (文件名, 修改时间, 大小)
         """
-        self._确保目录存在()
-        存档列表 = []
+        return [
+            (信息["文件名"], 信息["修改时间"], 信息["大小"] // 1024)  # KB
+            for 信息 in self.列出存档信息()
+        ]
+    
+    def 列出存档信息(self):
+        """从存档索引列出存档及其元数据，不需要打开存档文件
+        
+        返回:
+            list: 按修改时间排序（最新的在前）的字典列表，每项包含
+                  文件名、名字、年份、章节、修改时间（字符串）、大小（字节）
+        """
+        with self._锁:
+            self._确保目录存在()
+            if not self._索引是最新的():
+                self._重建索引()
+            
+            # 按修改时间排序，最新的在前
+            索引项 = sorted(self._索引["存档"].items(),
+                          key=lambda 条目: 条目[1]["修改时间"], reverse=True)
+        return [
+            {
+                "文件名": 文件名,
+                "名字": 项["名字"],
+                "年份": 项["年份"],
+                "章节": 项["章节"],
+                "修改时间": datetime.datetime.fromtimestamp(
+                    项["修改时间"] / 1e9
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+                "大小": 项["大小"],
+            }
+            for 文件名, 项 in 索引项
+        ]
+    
+    def 刷新索引(self):
+        """核对每个存档的修改时间和大小，重新读取改动过的存档
+        
+        游戏内的保存和删除会同步更新索引；在游戏外就地替换存档文件不会改变
+        目录的修改时间，这时需要调用本方法（如存档列表中的“刷新”）。
+        """
+        with self._锁:
+            self._确保目录存在()
+            self._重建索引(self._索引是最新的())
+    
+    @staticmethod
+    def _是存档文件(文件名):
+        return 文件名.endswith(".save") or 文件名.endswith(".pkl")
+    
+    def _目录修改时间(self):
+        return os.stat(self.存档目录).st_mtime_ns
+    
+    def _索引是最新的(self):
+        """检查索引是否与存档目录一致
         
-        for 文件名 in os.listdir(self.存档目录):
-            if 文件名.endswith(".save") or 文件名.endswith(".pkl"):
-                文件路径 = os.path.join(self.存档目录, 文件名)
-                修改时间 = datetime.datetime.fromtimestamp(
-                    os.path.getmtime(文件路径)
-                ).strftime("%Y-%m-%d %H:%M:%S")
-                大小 = os.path.getsize(文件路径) // 1024  # KB
-                
-                存档列表.append((文件名, 修改时间, 大小))
+        在游戏外增删存档文件会改变目录的修改时间，此时需要重建索引。
+        """
+        if self._索引 is None:
+            self._索引 = self._读取索引()
+        try:
+            return self._索引["目录修改时间"] == self._目录修改时间()
+        except OSError:
+            return False
+    
+    def _读取索引(self):
+        """读取索引文件，文件缺失或损坏时返回空索引"""
+        try:
+            with open(self.索引路径, "r", encoding="utf-8") as f:
+                索引 = json.load(f)
+            if 索引.get("版本") == 索引版本 and isinstance(索引.get("存档"), dict):
+                return 索引
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"版本": 索引版本, "目录修改时间": None, "存档": {}}
+    
+    def _写入索引(self):
+        """写入索引文件
         
-        # 按修改时间排序，最新的在前
-        存档列表.sort(key=lambda x: os.path.getmtime(
-            os.path.join(self.存档目录, x[0])
-        ), reverse=True)
+        索引只是缓存，损坏时会自动重建，因此直接覆盖写入而不是替换文件，
+        这样覆盖已有索引不会改变目录的修改时间。首次创建索引文件会改变目录
+        修改时间，所以写完后再检查一次。
+        """
+        for _ in range(2):
+            self._索引["目录修改时间"] = self._目录修改时间()
+            try:
+                with open(self.索引路径, "w", encoding="utf-8") as f:
+                    json.dump(self._索引, f, ensure_ascii=False, separators=(",", ":"))
+            except OSError as e:
+                print(f"写入存档索引失败: {e}")
+                return
+            if self._索引["目录修改时间"] == self._目录修改时间():
+                return
+    
+    def _生成索引项(self, 存档路径, 元数据):
+        """根据存档元数据和文件状态生成索引项"""
+        状态 = os.stat(存档路径)
+        return {
+            "名字": 元数据["名字"],
+            "年份": 元数据["当前年份"],
+            "章节": 元数据["当前章节"],
+            "修改时间": 状态.st_mtime_ns,
+            "大小": 状态.st_size,
+        }
+    
+    def _重建索引(self, 目录未变=False):
+        """扫描存档目录，只重新读取新增或改动过的存档
+        
+        参数:
+            目录未变(bool): 目录修改时间与索引一致，此时没有存档改动就不写入索引
+        """
+        旧索引 = self._索引["存档"]
+        新索引 = {}
+        有改动 = not 目录未变
+        with os.scandir(self.存档目录) as 条目列表:
+            for 条目 in 条目列表:
+                if not self._是存档文件(条目.name) or not 条目.is_file():
+                    continue
+                状态 = 条目.stat()
+                旧项 = 旧索引.get(条目.name)
+                if (旧项 and 旧项["修改时间"] == 状态.st_mtime_ns
+                        and 旧项["大小"] == 状态.st_size):
+                    新索引[条目.name] = 旧项
+                    continue
+                try:
+                    元数据 = save_format.读取文件元数据(条目.path)
+                except (OSError, save_format.存档格式错误):
+                    元数据 = {"名字": "", "当前年份": 0, "当前章节": "存档已损坏"}
+                if 元数据 is None:
+                    # 旧pickle存档不在列表时反序列化，加载时才导入并转换为二进制格式
+                    元数据 = {"名字": "", "当前年份": 0, "当前章节": "旧存档"}
+                新索引[条目.name] = self._生成索引项(条目.path, 元数据)
+                有改动 = True
         
-        return 存档列表
+        self._索引["存档"] = 新索引
+        if 有改动 or len(新索引) != len(旧索引):
+            self._写入索引()
     
     def 删除存档(self, 存档名):
         """删除指定存档文件
@@ -105,7 +296,12 @@ class 存档系统:
         存档路径 = os.path.join(self.存档目录, 存档名)
         
         try:
-            os.remove(存档路径)
+            with self._锁:
+                索引是最新的 = self._索引是最新的()
+                os.remove(存档路径)
+                if 索引是最新的:
+                    self._索引["存档"].pop(存档名, None)
+                    self._写入索引()
             return True
         except FileNotFoundError:
             print(f"存档文件不存在: {存档名}")
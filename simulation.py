@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+无头批量模拟
+不经过任何界面，用可替换的选择策略驱动游戏引擎完成1996-2010年的完整人生，
+用于事件平衡调整和覆盖率统计
+"""
+
+import argparse
+import datetime
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+import config
+from game_engine import 游戏引擎
+from holidays_system import 节日系统
+from player import 玩家角色
+
+
+class 选择策略:
+    """选择策略基类，决定模拟玩家在每个选项处的选择"""
+
+    def 选择(self, 选项列表, 提示, 选项数据=None):
+        """从选项中做出选择
+
+        参数:
+            选项列表(list): 选项文本列表
+            提示(str): 提示文本
+            选项数据(list): 选项对应的原始事件数据，非事件选择时为None
+
+        返回:
+            int: 选项索引（从0开始）
+        """
+        raise NotImplementedError
+
+
+class 随机策略(选择策略):
+    """等概率随机选择"""
+
+    def 选择(self, 选项列表, 提示, 选项数据=None):
+        return random.randrange(len(选项列表))
+
+
+class 属性贪心策略(选择策略):
+    """总是选择使指定属性增加最多的选项，非事件选择时选第一项"""
+
+    def __init__(self, 属性名="学业值"):
+        """初始化贪心策略
+
+        参数:
+            属性名(str): 要最大化的玩家属性
+        """
+        self.属性名 = 属性名
+
+    def 选择(self, 选项列表, 提示, 选项数据=None):
+        if not 选项数据:
+            return 0
+
+        最佳索引 = 0
+        最佳收益 = None
+        for 索引, 选项 in enumerate(选项数据):
+            # 历史/节日事件使用"属性变化"，随机事件使用"attribute_changes"
+            变化 = 选项.get("属性变化") or 选项.get("attribute_changes") or {}
+            收益 = 变化.get(self.属性名, 0)
+            if 最佳收益 is None or 收益 > 最佳收益:
+                最佳索引, 最佳收益 = 索引, 收益
+        return 最佳索引
+
+
+class 脚本策略(选择策略):
+    """按预先给定的索引序列依次选择，序列用完后交给后备策略"""
+
+    def __init__(self, 脚本, 后备策略=None):
+        """初始化脚本策略
+
+        参数:
+            脚本(list): 选项索引序列，超出选项范围的索引按最后一项处理
+            后备策略(选择策略): 脚本用完后使用的策略，默认总选第一项
+        """
+        self.脚本 = list(脚本)
+        self.后备策略 = 后备策略
+        self.位置 = 0
+
+    def 重置(self):
+        """回到脚本开头"""
+        self.位置 = 0
+
+    def 选择(self, 选项列表, 提示, 选项数据=None):
+        if self.位置 < len(self.脚本):
+            索引 = self.脚本[self.位置]
+            self.位置 += 1
+            return max(0, min(索引, len(选项列表) - 1))
+        if self.后备策略:
+            return self.后备策略.选择(选项列表, 提示, 选项数据)
+        return 0
+
+
+# 命令行可用的策略
+策略表 = {
+    "随机": 随机策略,
+    "贪心": 属性贪心策略,
+    "脚本": 脚本策略,
+}
+
+
+def _忽略(*参数, **关键字参数):
+    """空操作，无头模式下吞掉所有显示调用"""
+    return None
+
+
+class 无头界面:
+    """不做任何输出的界面，所有选择交给策略决定"""
+
+    def __init__(self, 策略):
+        """初始化无头界面
+
+        参数:
+            策略(选择策略): 选择策略
+        """
+        self.策略 = 策略
+
+    def 输入选择(self, 选项列表, 提示="请选择:", 选项数据=None):
+        """把选择委托给策略"""
+        return self.策略.选择(选项列表, 提示, 选项数据)
+
+    def 获取输入(self, 提示):
+        """无头模式没有文字输入，返回空字符串使用默认值"""
+        return ""
+
+    清屏 = 显示文本 = 显示标题 = 显示ASCII艺术 = staticmethod(_忽略)
+    显示属性 = 显示收藏品 = 显示属性变化 = staticmethod(_忽略)
+    显示事件 = 显示事件结果 = 显示节日 = 显示年代特色 = staticmethod(_忽略)
+    显示加载成功 = 显示保存成功 = 显示时间推进 = staticmethod(_忽略)
+    等待按键 = 播放音效 = staticmethod(_忽略)
+
+
+class 模拟器:
+    """无头模拟器，重复使用同一个游戏引擎实例跑完多局游戏"""
+
+    def __init__(self, 策略=None, 步长=0):
+        """初始化模拟器
+
+        参数:
+            策略(选择策略): 选择策略，默认随机策略
+            步长(int): 每次推进的天数，0表示每次跳到下一个可能发生事件的日期
+        """
+        self.策略 = 策略 or 随机策略()
+        self.步长 = 步长
+        self.步数 = 0
+        self.界面 = 无头界面(self.策略)
+        self.引擎 = 游戏引擎(界面=self.界面)
+        # 模拟不落盘，节日数据只保存在内存中
+        self.引擎.节日系统 = 节日系统(数据保存路径=None)
+        self.开始日期 = datetime.date(config.STARTING_YEAR, 1, 1)
+        self.结束日期 = datetime.date(config.ENDING_YEAR, 12, 31)
+
+    def 重置(self, 种子=None, 噪声种子=None):
+        """为新的一局重置引擎状态
+
+        参数:
+            种子(int): 随机种子，为None时不重新播种
+            噪声种子(int): 随机事件系统的噪声种子，为None时随机生成
+        """
+        if 种子 is not None:
+            random.seed(种子)
+        if isinstance(self.策略, 脚本策略):
+            self.策略.重置()
+
+        引擎 = self.引擎
+        引擎.玩家 = 玩家角色("模拟玩家")
+        引擎.当前日期 = self.开始日期
+        引擎._预判随机事件日期 = None
+        引擎._已预判日期 = None
+        引擎._调度器 = None
+        引擎.节日系统.重置节日数据()
+        引擎.random_event_system.reset(噪声种子)
+        引擎.运行中 = True
+
+    def 运行一局(self, 种子=None, 噪声种子=None):
+        """完整模拟一局游戏
+
+        参数:
+            种子(int): 随机种子
+            噪声种子(int): 随机事件系统的噪声种子
+
+        返回:
+            玩家角色: 结束时的玩家对象
+        """
+        self.重置(种子, 噪声种子)
+        引擎 = self.引擎
+
+        self.步数 = 0
+        while True:
+            引擎.处理当日事件()
+            引擎.探索当前时间()
+            self.步数 += 1
+            if 引擎.当前日期 >= self.结束日期:
+                break
+            if self.步长:
+                引擎.推进日期(self.步长)
+            elif 引擎.跳到下一个事件() is None:
+                break
+
+        引擎.运行中 = False
+        return 引擎.玩家
+
+    def 批量运行(self, 局数, 种子=None):
+        """连续模拟多局游戏
+
+        参数:
+            局数(int): 模拟局数
+            种子(int): 起始随机种子，第i局使用 种子+i
+
+        返回:
+            list: 每局结束时的玩家对象
+        """
+        结果 = []
+        for i in range(局数):
+            结果.append(self.运行一局(None if 种子 is None else 种子 + i))
+        return 结果
+
+
+class 模拟统计:
+    """多局模拟结果的直方图统计，可跨进程合并"""
+
+    def __init__(self):
+        """初始化空统计"""
+        self.局数 = 0
+        self.属性分布 = {}  # 属性名 -> Counter(最终值 -> 局数)
+        self.收藏品数量分布 = Counter()  # 收藏品数量 -> 局数
+        self.收藏品频次 = Counter()  # 收藏品名 -> 获得该收藏品的局数
+        self.事件频次 = Counter()  # 历史事件名 -> 触发局数
+        self.随机事件频次 = Counter()  # 随机事件ID -> 触发局数
+        self.节日频次 = Counter()  # 节日名 -> 触发次数
+
+    def 记录(self, 引擎):
+        """记录一局结束时的引擎状态
+
+        参数:
+            引擎(游戏引擎): 刚跑完一局的引擎
+        """
+        玩家 = 引擎.玩家
+        self.局数 += 1
+        for 属性名, 值 in 玩家.属性.items():
+            self.属性分布.setdefault(属性名, Counter())[值] += 1
+        self.收藏品数量分布[len(玩家.收藏品)] += 1
+        self.收藏品频次.update(玩家.收藏品)
+        self.事件频次.update(玩家.已触发事件)
+        self.随机事件频次.update(引擎.random_event_system.triggered_events)
+        # 触发标记形如"1997-春节"
+        self.节日频次.update(标记.split("-", 1)[1] for 标记 in 引擎.节日系统.节日数据["已触发节日"])
+
+    def 合并(self, 其他):
+        """把另一份统计合并进来
+
+        参数:
+            其他(模拟统计): 要合并的统计
+
+        返回:
+            模拟统计: 自身，便于链式调用
+        """
+        self.局数 += 其他.局数
+        for 属性名, 分布 in 其他.属性分布.items():
+            self.属性分布.setdefault(属性名, Counter()).update(分布)
+        self.收藏品数量分布.update(其他.收藏品数量分布)
+        self.收藏品频次.update(其他.收藏品频次)
+        self.事件频次.update(其他.事件频次)
+        self.随机事件频次.update(其他.随机事件频次)
+        self.节日频次.update(其他.节日频次)
+        return self
+
+    def 生成报告(self, 显示条数=10):
+        """生成文字报告
+
+        参数:
+            显示条数(int): 每类频次最多列出的条目数
+
+        返回:
+            str: 报告文本
+        """
+        if not self.局数:
+            return "没有模拟数据"
+
+        行列表 = [f"【模拟统计】共 {self.局数} 局", "", "最终属性（均值 / 最小 / 最大）:"]
+        for 属性名, 分布 in self.属性分布.items():
+            均值 = sum(值 * 次数 for 值, 次数 in 分布.items()) / self.局数
+            行列表.append(f"  {属性名}: {均值:.1f} / {min(分布)} / {max(分布)}")
+
+        行列表.append("")
+        行列表.append("收藏品数量分布:")
+        for 数量, 次数 in sorted(self.收藏品数量分布.items()):
+            行列表.append(f"  {数量}件: {次数 / self.局数:.1%}")
+
+        for 标题, 频次 in (("收藏品", self.收藏品频次), ("历史事件", self.事件频次),
+                           ("随机事件", self.随机事件频次), ("节日", self.节日频次)):
+            行列表.append("")
+            行列表.append(f"{标题}触发频次（前{显示条数}）:")
+            if not 频次:
+                行列表.append("  无")
+            for 名称, 次数 in 频次.most_common(显示条数):
+                行列表.append(f"  {名称}: {次数} ({次数 / self.局数:.2f}/局)")
+
+        return "\n".join(行列表)
+
+
+def _模拟分片(分片参数):
+    """进程池工作函数，在独立进程中跑完一个分片
+
+    参数:
+        分片参数(tuple): (策略名, 属性名, 脚本, 步长, 分片种子, 局数)
+
+    返回:
+        模拟统计: 该分片的统计结果
+    """
+    策略名, 属性名, 脚本, 步长, 分片种子, 局数 = 分片参数
+    模拟 = 模拟器(创建策略(策略名, 属性名, 脚本), 步长=步长)
+    # 每个分片有自己确定的噪声种子，使随机事件节奏在分片之间不同且可复现
+    噪声种子 = random.Random(分片种子).randint(1, 10000)
+
+    统计 = 模拟统计()
+    for i in range(局数):
+        模拟.运行一局(分片种子 + i, 噪声种子)
+        统计.记录(模拟.引擎)
+    return 统计
+
+
+def 并行模拟(局数, 进程数=None, 种子=0, 策略名="随机", 属性名="学业值", 脚本=None, 步长=0):
+    """把多局模拟分片到进程池中运行并合并统计
+
+    参数:
+        局数(int): 总局数
+        进程数(int): 工作进程数，默认使用全部CPU核心
+        种子(int): 基础种子，相同种子和分片数给出相同结果
+        策略名(str): 选择策略名称
+        属性名(str): 贪心策略要最大化的属性
+        脚本(list): 脚本策略的选项索引序列
+        步长(int): 每次推进的天数
+
+    返回:
+        模拟统计: 合并后的统计结果
+    """
+    进程数 = 进程数 or os.cpu_count() or 1
+    分片数 = max(1, min(进程数, 局数))
+
+    # 由基础种子确定性地派生每个分片的种子
+    主随机 = random.Random(种子)
+    分片列表 = []
+    for 分片索引 in range(分片数):
+        分片局数 = 局数 // 分片数 + (1 if 分片索引 < 局数 % 分片数 else 0)
+        分片种子 = 主随机.randrange(2 ** 32)
+        分片列表.append((策略名, 属性名, 脚本 or [], 步长, 分片种子, 分片局数))
+
+    总统计 = 模拟统计()
+    if 进程数 == 1:
+        for 分片参数 in 分片列表:
+            总统计.合并(_模拟分片(分片参数))
+        return 总统计
+
+    with multiprocessing.Pool(进程数) as 进程池:
+        for 统计 in 进程池.imap_unordered(_模拟分片, 分片列表):
+            总统计.合并(统计)
+    return 总统计
+
+
+def 创建策略(策略名, 属性名="学业值", 脚本=None):
+    """根据名称创建选择策略
+
+    参数:
+        策略名(str): "随机"、"贪心"或"脚本"
+        属性名(str): 贪心策略要最大化的属性
+        脚本(list): 脚本策略的选项索引序列
+
+    返回:
+        选择策略: 策略实例
+    """
+    if 策略名 == "贪心":
+        return 属性贪心策略(属性名)
+    if 策略名 == "脚本":
+        return 脚本策略(脚本 or [], 后备策略=随机策略())
+    return 随机策略()
+
+
+def main():
+    """命令行入口，报告模拟吞吐量"""
+    parser = argparse.ArgumentParser(description="九零后时光机 - 无头批量模拟")
+    parser.add_argument('--局数', type=int, default=1000, help='模拟局数')
+    parser.add_argument('--策略', choices=list(策略表), default="随机", help='选择策略')
+    parser.add_argument('--属性', default="学业值", help='贪心策略要最大化的属性')
+    parser.add_argument('--脚本', default="", help='脚本策略的选项索引，逗号分隔')
+    parser.add_argument('--步长', type=int, default=0, help='每次推进的天数，0表示按事件跳转')
+    parser.add_argument('--种子', type=int, default=None, help='起始随机种子')
+    parser.add_argument('--进程数', type=int, default=0,
+                        help='并行进程数，0表示单进程不统计，-1表示使用全部CPU核心')
+    args = parser.parse_args()
+
+    脚本 = [int(x) for x in args.脚本.split(",") if x.strip()]
+
+    开始 = time.perf_counter()
+    if args.进程数:
+        统计 = 并行模拟(args.局数, None if args.进程数 < 0 else args.进程数, args.种子 or 0,
+                      args.策略, args.属性, 脚本, args.步长)
+    else:
+        统计 = None
+        模拟 = 模拟器(创建策略(args.策略, args.属性, 脚本), 步长=args.步长)
+        模拟.批量运行(args.局数, args.种子)
+    用时 = time.perf_counter() - 开始
+
+    if 统计:
+        print(统计.生成报告())
+        print()
+
+    每秒局数 = args.局数 / 用时 if 用时 > 0 else float("inf")
+    print(f"完成 {args.局数} 局模拟，用时 {用时:.2f} 秒")
+    print(f"吞吐量: {每秒局数:.0f} 局/秒 ({每秒局数 * 60:.0f} 局/分钟)")
+
+
+if __name__ == "__main__":
+    main()
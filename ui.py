@@ -4,6 +4,7 @@
 import time
 import sys
 import os
+import importlib.util
 
 try:
     import curses
@@ -13,12 +14,9 @@ except ImportError:
     CURSES_AVAILABLE = False
     print("警告：未找到curses库，将使用简易文本界面")
 
-try:
-    import pygame
-
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+# pygame只用于音效，导入需要几百毫秒，启动时只检查是否安装，播放音效时再导入
+PYGAME_AVAILABLE = importlib.util.find_spec("pygame") is not None
+if not PYGAME_AVAILABLE:
     print("警告：未找到pygame库，音效功能不可用")
 
 
@@ -66,12 +64,13 @@ class 简易界面:
         """
         print(文本)
 
-    def 输入选择(self, 选项列表, 提示="请选择:"):
+    def 输入选择(self, 选项列表, 提示="请选择:", 选项数据=None):
         """提供选项列表，获取用户选择
         
         参数:
             选项列表(list): 选项文本列表
             提示(str): 提示文本
+            选项数据(list): 选项对应的原始事件数据，供自动选择策略参考，文本界面忽略
             
         返回:
             int: 用户选择的选项索引（从0开始）
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热启动快照
+把引擎启动时构建的只读数据（随机事件池、各年份节日表）
+用marshal保存到一个文件中，下次启动直接反序列化，不再重新构建，装有
+chinese_calendar时也不必导入它逐日生成节日表。快照以源数据模块内容的哈希
+为键，任何一个模块改动后自动作废重建。
+"""
+
+import marshal
+import os
+import sys
+import tempfile
+
+import holidays_system
+
+# 快照内容来自这些模块，内容改变时快照作废
+源数据模块 = ("events_data.py", "holiday_events.py", "random_events.py", "holidays_system.py")
+
+快照路径 = os.path.join("data", "warm_start.bin")
+快照版本 = 1
+
+_源码目录 = os.path.dirname(os.path.abspath(__file__))
+
+# 进程内缓存：快照路径 -> 序列化字节，同一进程多次创建引擎时不再读文件
+_进程缓存 = {}
+
+
+def _环境标识():
+    """与源数据无关但会影响快照的因素：快照格式、Python和marshal版本、农历库"""
+    标识 = [快照版本, list(sys.version_info[:2]), marshal.version]
+    # 装有chinese_calendar时节日表包含它的数据，库升级后也要作废
+    规格 = holidays_system.农历库规格
+    if 规格 is not None and 规格.origin:
+        try:
+            标识 += [规格.origin, os.stat(规格.origin).st_mtime_ns]
+        except OSError:
+            pass
+    return 标识
+
+
+def _源数据状态():
+    """源数据模块的大小和修改时间，与快照中记录的一致时不必计算哈希"""
+    状态 = _环境标识()
+    for 模块 in 源数据模块:
+        信息 = os.stat(os.path.join(_源码目录, 模块))
+        状态 += [模块, 信息.st_size, 信息.st_mtime_ns]
+    return 状态
+
+
+def 源数据指纹():
+    """计算源数据模块内容的哈希
+
+    返回:
+        str: 十六进制指纹，同时包含环境标识
+    """
+    # hashlib导入要几毫秒，只有源数据模块的修改时间变化时才需要
+    import hashlib
+    哈希 = hashlib.blake2b(repr(_环境标识()).encode(), digest_size=16)
+    for 模块 in 源数据模块:
+        with open(os.path.join(_源码目录, 模块), "rb") as f:
+            哈希.update(模块.encode() + b"\0" + f.read())
+    return 哈希.hexdigest()
+
+
+def 构建快照():
+    """从源数据模块重新构建快照内容
+
+    返回:
+        dict: {"事件池", "节日表"}，只包含marshal支持的内置类型
+    """
+    from random_events import ERA_BY_YEAR, RandomEventSystem
+
+    日历 = holidays_system.节日日历()
+    return {
+        "事件池": RandomEventSystem().event_pools,
+        "节日表": {年份: 日历.获取年份(年份) for 年份 in sorted(ERA_BY_YEAR)},
+    }
+
+
+def 加载快照(路径=快照路径):
+    """读取快照文件
+
+    先比较源数据模块的大小和修改时间，不一致时（如重新检出代码）再比较内容哈希。
+
+    参数:
+        路径(str): 快照文件路径
+
+    返回:
+        dict: 快照内容，每次调用都是新反序列化的对象，可以随意修改；
+              文件缺失、损坏或已过期时返回None
+    """
+    数据 = _进程缓存.get(路径)
+    try:
+        if 数据 is None:
+            with open(路径, "rb") as f:
+                数据 = f.read()
+        头, 内容 = marshal.loads(数据)
+        状态一致 = 头["状态"] == _源数据状态()
+        if not 状态一致 and 头["指纹"] != 源数据指纹():
+            return None
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+    if 状态一致:
+        _进程缓存[路径] = 数据
+    else:
+        # 内容没变只是修改时间变了，更新记录的状态，下次启动不必再计算哈希
+        保存快照(内容, 路径)
+    return 内容
+
+
+def 保存快照(内容, 路径=快照路径):
+    """写入快照文件，先写临时文件再替换；快照只是加速，写入失败时只打印提示
+
+    参数:
+        内容(dict): 构建快照()的返回值
+        路径(str): 快照文件路径
+    """
+    头 = {"状态": _源数据状态(), "指纹": 源数据指纹()}
+    数据 = marshal.dumps((头, 内容))
+    try:
+        目录 = os.path.dirname(路径)
+        if 目录:
+            os.makedirs(目录, exist_ok=True)
+        # 每次写入使用独立的临时文件，几个进程同时重建快照时不会互相覆盖
+        文件描述符, 临时路径 = tempfile.mkstemp(dir=目录 or None, suffix=".tmp")
+        try:
+            with os.fdopen(文件描述符, "wb") as f:
+                f.write(数据)
+            os.replace(临时路径, 路径)
+        except OSError:
+            os.remove(临时路径)
+            raise
+    except OSError as e:
+        print(f"写入热启动快照失败: {e}")
+        return
+    _进程缓存[路径] = 数据
+
+
+def 热启动(路径=快照路径):
+    """加载快照，没有可用快照时重新构建并保存
+
+    参数:
+        路径(str): 快照文件路径
+
+    返回:
+        dict: 快照内容，见构建快照
+    """
+    内容 = 加载快照(路径)
+    if 内容 is None:
+        内容 = 构建快照()
+        保存快照(内容, 路径)
+    return 内容